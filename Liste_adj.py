@@ -2,13 +2,31 @@
 import arxiv
 import time
 import pandas as pd
-from collections import deque
 import json # Pour écrire au format JSON
+import numpy as np
 from tqdm import tqdm # Pour la barre de progression
+from csr_graph import CSRGraph, neighbor_slots
+from parallel_ingest import parse_jsonl_parallel
+from triangles import count_triangles, local_clustering_coefficients
+from second_degree import second_degree_counts
+from arxiv_cache import ArxivCache, paper_from_arxiv_result
+from crawl_state import open_crawl_state
+from crawl_records import crawl_record
 
-# --- La fonction get_coauthors_from_arxiv reste la même ---
-def get_coauthors_from_arxiv(author_name: str) -> set[str]:
+# --- Co-auteurs d'un auteur : raccourci sur get_author_record (même requête, même cache) ---
+def get_coauthors_from_arxiv(author_name: str, cache: ArxivCache = None) -> set[str]:
+    return set(get_author_record(author_name, cache)['coauthors'])
+
+def get_author_record(author_name: str, cache: ArxivCache = None) -> dict:
+    """
+    Ligne du JSONL pour l'auteur : co-auteurs, mais aussi catégories et
+    identifiants des articles (voir crawl_records.py), lus dans la même réponse.
+    """
     try:
+        # Les articles déjà récupérés (ce run ou un précédent) viennent du cache disque
+        papers = cache.get(author_name, 100) if cache is not None else None
+        if papers is not None:
+            return crawl_record(author_name, papers)
         # NOTE: La librairie arxiv gère déjà une attente pour respecter l'API.
         # Pour des tests rapides, on peut la rendre plus agressive, mais
         # attention à ne pas se faire bannir.
@@ -23,44 +41,31 @@ def get_coauthors_from_arxiv(author_name: str) -> set[str]:
             sort_by=arxiv.SortCriterion.SubmittedDate
         )
         results = client.results(search)
-        all_coauthors = set()
-        for r in results:
-            authors_in_paper = {auth.name for auth in r.authors}
-            all_coauthors.update(authors_in_paper)
-        all_coauthors.discard(author_name)
-        return all_coauthors
+        papers = [paper_from_arxiv_result(r) for r in results]
+        if cache is not None:
+            cache.put(author_name, 100, papers)
+        return crawl_record(author_name, papers)
     except Exception as e:
         print(f"Erreur lors de la recherche pour '{author_name}': {e}")
-        return set()
+        return crawl_record(author_name, [])
 
 # --- PHASE 1: Construction du graphe avec écriture en continu ---
 
-def stream_build_graph_to_jsonl(seed_author: str, output_file: str): # Plus besoin de max_authors
+def stream_build_graph_to_jsonl(seed_author: str, output_file: str, cache: ArxivCache = None,
+                                memory_bytes: int = None): # Plus besoin de max_authors
     """
     Construit le graphe en parcourant les auteurs (BFS) et écrit chaque
     relation découverte dans un fichier JSON Lines en temps réel.
     """
     print(f"--- Démarrage de la collecte. Les données seront sauvées dans '{output_file}' ---")
     
-    queue = deque([seed_author])
-    
-    # On doit charger les auteurs déjà visités si on reprend une exploration
-    visited = set()
-    try:
-        with open(output_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                record = json.loads(line)
-                visited.add(record['author'])
-        print(f"Reprise de l'exploration avec {len(visited)} auteurs déjà dans le fichier.")
-        # On doit aussi re-remplir la queue avec des auteurs non explorés
-        # C'est complexe, la solution simple est de repartir de la graine
-        if seed_author not in visited:
-            visited.add(seed_author)
-        else: # Pour éviter d'explorer les mêmes
-             print("Attention : le point de départ a déjà été exploré.")
-
-    except FileNotFoundError:
-        visited.add(seed_author)
+    # La file et les auteurs visités sont repris depuis '<output_file>.frontier/'
+    # (voir crawl_state.py) : la reprise continue là où le parcours s'est arrêté.
+    # Avec memory_bytes, visités et file restent sur disque (mémoire bornée).
+    state = open_crawl_state(output_file, seed_author, memory_bytes)
+    queue = state.queue
+    if state.n_explored:
+        print(f"Reprise de l'exploration : {state.n_explored} auteurs déjà écrits, {len(queue)} en file.")
 
     with open(output_file, 'a', encoding='utf-8') as f:
         # tqdm sans 'total' devient une barre de progression infinie
@@ -71,22 +76,23 @@ def stream_build_graph_to_jsonl(seed_author: str, output_file: str): # Plus beso
             current_author = queue.popleft()
             pbar.set_description(f"Exploration de {current_author}")
 
-            coauthors = get_coauthors_from_arxiv(current_author)
+            record = get_author_record(current_author, cache)
             
             # On écrit les données de l'auteur courant (même s'il était déjà visité)
-            record = {'author': current_author, 'coauthors': list(coauthors)}
             f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
             
-            for coauthor in coauthors:
-                if coauthor not in visited:
-                    visited.add(coauthor)
-                    queue.append(coauthor)
+            # Met en file les nouveaux co-auteurs et l'enregistre dans le log de reprise
+            state.explored(current_author, record['coauthors'], f.tell())
             
             pbar.update(1)
             
         pbar.close()
+    state.close()
 
-    print(f"\n--- Exploration terminée (la composante connexe a été entièrement parcourue). {len(visited)} auteurs découverts. ---")
+    if cache is not None:
+        print(cache.stats())
+    print(f"\n--- Exploration terminée (la composante connexe a été entièrement parcourue). {state.n_discovered} auteurs découverts. ---")
 
 # --- PHASE 2: Chargement du graphe et extraction des features ---
 
@@ -126,9 +132,38 @@ def load_graph_from_jsonl(input_file: str) -> dict[str, set]:
     print(f"--- Graphe chargé avec {len(graph)} auteurs. ---")
     return graph
 
-# Les fonctions calculate_local_clustering_coefficient et extract_features_for_pca
-# restent EXACTEMENT les mêmes. Elles travaillent sur un graphe déjà construit.
-def calculate_local_clustering_coefficient(author: str, graph: dict) -> float:
+def load_csr_graph_from_jsonl(input_file: str) -> CSRGraph:
+    """
+    Variante compacte de load_graph_from_jsonl : IDs entiers + adjacence CSR.
+    Toutes les fonctions d'analyse ci-dessous acceptent ce format.
+    Le fichier est parsé en parallèle sur tous les coeurs.
+    """
+    print(f"--- Chargement du graphe (CSR) depuis '{input_file}' ---")
+    try:
+        graph = parse_jsonl_parallel(input_file)
+    except FileNotFoundError:
+        print(f"Erreur: Le fichier {input_file} n'a pas été trouvé.")
+        return CSRGraph.from_edges([], [], [])
+    print(f"--- Graphe chargé avec {graph.n_nodes} auteurs et {graph.n_edges} liens. ---")
+    return graph
+
+# calculate_local_clustering_coefficient et extract_features_for_pca acceptent
+# le graphe CSR (triangles.py, second_degree.py) ou l'ancien dict d'adjacence.
+def _count_links_among(graph: CSRGraph, neighbors: np.ndarray) -> int:
+    """ Nombre de liens entre les voisins (triés) d'un noeud du graphe CSR. """
+    targets = graph.indices[neighbor_slots(graph, neighbors)]
+    pos = np.minimum(np.searchsorted(neighbors, targets), len(neighbors) - 1)
+    # Chaque lien entre deux voisins est vu depuis ses deux extrémités
+    return int(np.count_nonzero(neighbors[pos] == targets)) // 2
+
+def calculate_local_clustering_coefficient(author: str, graph: dict | CSRGraph) -> float:
+    if isinstance(graph, CSRGraph):
+        node_id = graph.name_to_id.get(author)
+        if node_id is None: return 0.0
+        neighbors = graph.neighbors(node_id)
+        k = len(neighbors)
+        if k < 2: return 0.0
+        return _count_links_among(graph, neighbors) / (k * (k - 1) / 2)
     neighbors = list(graph.get(author, set()))
     k = len(neighbors)
     if k < 2: return 0.0
@@ -140,8 +175,10 @@ def calculate_local_clustering_coefficient(author: str, graph: dict) -> float:
                 existing_links += 1
     return existing_links / possible_links if possible_links > 0 else 0.0
 
-def extract_features_for_pca(graph: dict) -> pd.DataFrame:
+def extract_features_for_pca(graph: dict | CSRGraph, second_degree_mode: str = 'exact') -> pd.DataFrame:
     print("--- Démarrage de l'extraction des features ---")
+    if isinstance(graph, CSRGraph):
+        return _extract_features_csr(graph, second_degree_mode)
     features = []
     for author in tqdm(graph, desc="Calcul des features"):
         neighbors = graph[author]
@@ -162,6 +199,22 @@ def extract_features_for_pca(graph: dict) -> pd.DataFrame:
     print("--- Extraction terminée. ---")
     return pd.DataFrame(features).set_index('author')
 
+def _extract_features_csr(graph: CSRGraph, second_degree_mode: str) -> pd.DataFrame:
+    degrees = graph.degrees()
+    # Triangles et clustering de tous les noeuds en une seule passe
+    print("Comptage des triangles...")
+    clustering = local_clustering_coefficients(graph, count_triangles(graph))
+    # Voisins au second degré par blocs (exact) ou HyperLogLog (approché)
+    print(f"Voisins au second degré (mode {second_degree_mode})...")
+    second_degree = second_degree_counts(graph, mode=second_degree_mode)
+    print("--- Extraction terminée. ---")
+    return pd.DataFrame({
+        'author': graph.names,
+        'degree': degrees,
+        'clustering_coeff': clustering,
+        'second_degree_neighbors': second_degree
+    }).set_index('author')
+
 # --- Script Principal ---
 
 if __name__ == "__main__":
@@ -170,23 +223,38 @@ if __name__ == "__main__":
     GRAPH_DATA_FILE = "graphe_bengio_network.jsonl"
     # Limite pour l'exploration. Vous pouvez l'augmenter.
     MAX_AUTHORS_TO_EXPLORE = 2000
+    # Crawl asynchrone (plusieurs requêtes en vol, débit global limité).
+    # Désactivé par défaut : le crawl séquentiel reste la référence.
+    ASYNC_CRAWL = False
     
     # --- PHASE 1 ---
     # Cette fonction va tourner longtemps. Vous pouvez l'arrêter avec Ctrl+C.
     # Le fichier GRAPH_DATA_FILE contiendra votre progression.
     # Si vous voulez recommencer de zéro, supprimez ce fichier.
-    stream_build_graph_to_jsonl(
-        seed_author=SEED_AUTHOR,
-        output_file=GRAPH_DATA_FILE,
-    )
+    # Les réponses de l'API sont gardées sur disque (partagées avec add_subcategory.py)
+    cache = ArxivCache()
+    if ASYNC_CRAWL:
+        from async_crawler import run_crawl
+        run_crawl(
+            seed_author=SEED_AUTHOR,
+            output_file=GRAPH_DATA_FILE,
+            cache=cache,
+        )
+    else:
+        stream_build_graph_to_jsonl(
+            seed_author=SEED_AUTHOR,
+            output_file=GRAPH_DATA_FILE,
+            cache=cache,
+        )
+    cache.close()
     
     # --- PHASE 2 ---
     # Une fois la collecte terminée (ou arrêtée), on peut analyser les données.
     # Cette partie est rapide car elle ne fait pas d'appels réseau.
-    collaboration_graph = load_graph_from_jsonl(GRAPH_DATA_FILE)
+    collaboration_graph = load_csr_graph_from_jsonl(GRAPH_DATA_FILE)
     
     # On continue uniquement si le graphe n'est pas vide
-    if collaboration_graph:
+    if len(collaboration_graph):
         features_df = extract_features_for_pca(collaboration_graph)
         
         print("\nDataFrame des features prêtes pour la PCA:")
@@ -1,17 +1,37 @@
 import pandas as pd
-import json
 import arxiv
 import time
+import numpy as np
 from collections import Counter
 from tqdm import tqdm
+from graph_snapshot import load_graph
+from arxiv_cache import ArxivCache, paper_from_arxiv_result
+from crawl_records import load_author_categories, dominant_category, paper_categories
+from label_propagation import propagate_labels
+from feature_store import ensure_table, open_feature_store
 
 # --- CONFIGURATION ---
 # Fichiers d'entrée
 JSON_GRAPH_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
-CSV_METRICS_FILE = "resultats_complets_avec_categories.csv" # Ton CSV avec Degré, Clustering, etc.
+CSV_METRICS_FILE = "resultats_complets_avec_categories.csv" # Ton CSV avec Degré, Clustering, etc. (importé dans la table)
 
-# Fichier de sortie
-OUTPUT_CSV_FILE = "auteurs_avec_excentricite_et_domaine.csv" # Le nouveau fichier enrichi
+# Sortie : colonnes Domaine_Dominant et Confiance_Domaine de la table du graphe (feature_store.py)
+OUTPUT_CSV_FILE = "auteurs_avec_excentricite_et_domaine.csv" # Export CSV (si EXPORT_CSV)
+EXPORT_CSV = False
+CACHE_FILE = "arxiv_cache.sqlite" # Cache des réponses ArXiv (partagé avec le crawler)
+# Domaines des seeds lus dans le JSONL (catégories enregistrées par le crawler).
+# L'API n'est interrogée que pour les seeds écrits par un ancien crawler.
+OFFLINE_DOMAINS = True
+# Nombre de sauts de la propagation depuis les seeds (None : tout le graphe atteignable)
+PROPAGATION_HOPS = None
+# Articles lus par seed sans catégories dans le JSONL : même requête que le
+# crawler (les plus récents d'abord), donc même règle et même entrée de cache
+MAX_PAPERS = 100
+# Domaines des seeds qui ne votent pas
+NON_INFORMATIVE_DOMAINS = ["Inconnu (API)", "Erreur API"]
+# Auteurs sans aucun co-auteur (degré 0) / non atteints par la propagation
+ISOLATED_DOMAIN = "Isolé"
+UNREACHED_DOMAIN = "Inconnu (Propagation)"
 
 # Mapping pour regrouper les catégories d'ArXiv en grands domaines
 # C'est ici que tu peux affiner pour avoir une meilleure granularité
@@ -52,23 +72,29 @@ def get_specific_domain(arxiv_category):
         return 'Physique (Autre)'
     return "Autre"
 
-def fetch_domains_from_api(authors_list):
+def fetch_domains_from_api(authors_list, cache: ArxivCache = None):
     """
-    Interroge l'API ArXiv pour une liste d'auteurs et renvoie leur domaine principal.
-    C'est l'étape la plus lente.
+    Interroge l'API ArXiv pour une liste d'auteurs et renvoie leur domaine principal,
+    avec la règle de domains_from_crawl : catégorie dominante de leurs MAX_PAPERS
+    articles les plus récents. C'est l'étape la plus lente : les auteurs déjà vus
+    par le crawler (ou un run précédent) sont servis par le cache disque.
     """
     author_domains = {}
     print(f"--- Interrogation de l'API ArXiv pour {len(authors_list)} auteurs ---")
     
-    client = arxiv.Client(page_size=1, delay_seconds=1.0, num_retries=3)
+    client = arxiv.Client(page_size=MAX_PAPERS, delay_seconds=1.0, num_retries=3)
     
     for author in tqdm(authors_list, desc="API ArXiv"):
         try:
-            search = arxiv.Search(query=f'au:"{author}"', max_results=1)
-            # Utiliser un try-except pour les auteurs sans publication
-            paper = next(client.results(search), None)
-            if paper:
-                category = paper.primary_category
+            papers = cache.get(author, MAX_PAPERS) if cache is not None else None
+            if papers is None:
+                search = arxiv.Search(query=f'au:"{author}"', max_results=MAX_PAPERS,
+                                      sort_by=arxiv.SortCriterion.SubmittedDate)
+                papers = [paper_from_arxiv_result(r) for r in client.results(search)]
+                if cache is not None:
+                    cache.put(author, MAX_PAPERS, papers)
+            category = dominant_category(paper_categories(papers))
+            if category:
                 author_domains[author] = get_specific_domain(category)
             else:
                 author_domains[author] = "Inconnu (API)"
@@ -78,74 +104,101 @@ def fetch_domains_from_api(authors_list):
             
     return author_domains
 
+def domains_from_crawl(jsonl_file, seeds):
+    """
+    Domaine de chaque seed à partir des catégories de ses articles, enregistrées
+    dans le JSONL au moment du crawl (aucun appel réseau). Renvoie aussi les
+    seeds sans catégories dans le fichier (ancien format).
+    """
+    print(f"--- Domaines des seeds lus hors ligne depuis '{jsonl_file}' ---")
+    author_categories = load_author_categories(jsonl_file)
+    author_domains = {}
+    missing = []
+    for author in seeds:
+        categories = author_categories.get(author)
+        if categories is None:
+            missing.append(author)
+        elif categories:
+            author_domains[author] = get_specific_domain(dominant_category(categories))
+        else:
+            author_domains[author] = "Inconnu (API)"
+    return author_domains, missing
+
+def propagate_domains(graph, seed_domains, max_hops=PROPAGATION_HOPS):
+    """
+    Domaine, confiance et distance (en sauts) au seed le plus proche pour
+    chaque noeud du graphe, par propagation d'étiquettes (label_propagation.py).
+    Les auteurs sans co-auteur sont ISOLATED_DOMAIN, ceux que la propagation
+    n'atteint pas UNREACHED_DOMAIN.
+    """
+    votes = Counter(d for d in seed_domains.values() if d not in NON_INFORMATIVE_DOMAINS)
+    # Domaines numérotés du plus fréquent au moins fréquent : à égalité de votes, le plus courant gagne
+    domain_names = [d for d, _ in votes.most_common()]
+    domain_index = {d: i for i, d in enumerate(domain_names)}
+    seed_labels = np.full(graph.n_nodes, -1, dtype=np.int64)
+    for author, domain in seed_domains.items():
+        if domain in domain_index and author in graph:
+            seed_labels[graph.id_of(author)] = domain_index[domain]
+    labels, confidence, hops = propagate_labels(graph, seed_labels, len(domain_names), max_hops)
+    domains = np.array(domain_names + [UNREACHED_DOMAIN], dtype=object)[labels]
+    domains[(graph.degrees() == 0) & (labels < 0)] = ISOLATED_DOMAIN
+    return domains, confidence, hops
+
 def main():
-    # 1. Lire le CSV de métriques pour savoir quels auteurs nous intéressent
+    # 1. Charger le graphe (snapshot binaire du JSONL) et la table des auteurs
+    # qui nous intéressent (le CSV de métriques y est importé s'il est nouveau)
+    print("Chargement de la structure du graphe...")
+    graph = load_graph(JSON_GRAPH_FILE)
+    store = open_feature_store(JSON_GRAPH_FILE)
     try:
-        df_metrics = pd.read_csv(CSV_METRICS_FILE)
+        rows = ensure_table(store, graph, CSV_METRICS_FILE)
     except FileNotFoundError:
         print(f"ERREUR: Le fichier '{CSV_METRICS_FILE}' est introuvable.")
         return
-    
-    target_authors = set(df_metrics['Auteur'])
-    print(f"{len(target_authors)} auteurs cibles chargés depuis '{CSV_METRICS_FILE}'.")
+    print(f"{len(rows)} auteurs cibles dans la table '{store.path}'.")
 
-    # 2. Lire le graphe JSONL pour identifier les 'seeds' et construire la structure de voisinage
-    seeds = set()
-    # Structure : {co-auteur: [liste des seeds auxquels il est connecté]}
-    reverse_adjacency = {}
-    
-    print("Analyse de la structure du graphe depuis le fichier JSONL...")
-    with open(JSON_GRAPH_FILE, 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            seed_author = data.get("author")
-            if seed_author:
-                seeds.add(seed_author)
-                for coauthor in data.get("coauthors", []):
-                    if coauthor not in reverse_adjacency:
-                        reverse_adjacency[coauthor] = []
-                    reverse_adjacency[coauthor].append(seed_author)
+    # 2. Les seeds sont les auteurs qui ont leur propre ligne dans le JSONL
+    seeds = {graph.names[i] for i in np.flatnonzero(graph.has_record)}
 
     print(f"{len(seeds)} auteurs 'sources' (seeds) identifiés.")
 
-    # 3. Récupérer les domaines des seeds via l'API
-    seed_domains = fetch_domains_from_api(list(seeds))
+    # 3. Récupérer les domaines des seeds : depuis le JSONL si le crawler y a
+    # noté les catégories, sinon via l'API (ou le cache disque partagé avec le crawler)
+    if OFFLINE_DOMAINS:
+        seed_domains, missing = domains_from_crawl(JSON_GRAPH_FILE, seeds)
+    else:
+        seed_domains, missing = {}, list(seeds)
+    if missing:
+        cache = ArxivCache(CACHE_FILE)
+        seed_domains.update(fetch_domains_from_api(missing, cache))
+        print(cache.stats())
+        cache.close()
 
-    # 4. Propager les domaines aux autres auteurs par vote majoritaire
-    final_author_domains = {}
-    print("\nPropagation des domaines par vote majoritaire...")
-    
-    for author in tqdm(target_authors, desc="Propagation"):
+    # 4. Propager les domaines à tout le graphe (vote des voisins, saut par saut)
+    print("\nPropagation des domaines...")
+    domains, confidence, hops = propagate_domains(graph, seed_domains)
+    reached = hops > 0
+    print(f"{int(reached.sum())} auteurs étiquetés par propagation "
+          f"(jusqu'à {int(hops.max(initial=0))} sauts des seeds).")
+    row_domains = domains[rows]
+    row_confidence = confidence[rows].copy()
+    # Un seed garde son propre domaine
+    for k in np.flatnonzero(np.asarray(graph.has_record)[rows]).tolist():
+        author = graph.names[rows[k]]
         if author in seed_domains:
-            # L'auteur est un seed, on utilise son domaine directement
-            final_author_domains[author] = seed_domains[author]
-        elif author in reverse_adjacency:
-            # L'auteur est un co-auteur, on regarde les domaines de ses voisins (seeds)
-            connected_seed_domains = [seed_domains.get(s) for s in reverse_adjacency[author] if s in seed_domains]
-            
-            # Filtrer les domaines non-informatifs
-            valid_domains = [d for d in connected_seed_domains if d not in ["Inconnu (API)", "Erreur API"]]
-            
-            if valid_domains:
-                # Vote majoritaire
-                most_common_domain = Counter(valid_domains).most_common(1)[0][0]
-                final_author_domains[author] = most_common_domain
-            else:
-                final_author_domains[author] = "Inconnu (Propagation)"
-        else:
-            final_author_domains[author] = "Isolé"
+            row_domains[k] = seed_domains[author]
+            row_confidence[k] = 1.0
 
-    # 5. Fusionner les domaines avec le DataFrame de métriques
-    df_metrics['Domaine_Dominant'] = df_metrics['Auteur'].map(final_author_domains)
-    df_metrics['Domaine_Dominant'].fillna('Inconnu', inplace=True)
-    
-    # 6. Sauvegarder le résultat final
-    df_metrics.to_csv(OUTPUT_CSV_FILE, index=False)
+    # 5. Écrire les deux colonnes dans la table (les autres colonnes ne sont pas touchées)
+    store.write_labels('Domaine_Dominant', row_domains.tolist(), rows)
+    store.write('Confiance_Domaine', row_confidence, rows, fill=0.0)
+    if EXPORT_CSV:
+        store.to_csv(OUTPUT_CSV_FILE, graph.names, rows)
     
     print("\n--- ANALYSE TERMINÉE ---")
-    print(f"DataFrame final sauvegardé dans '{OUTPUT_CSV_FILE}'")
+    print(f"Colonnes 'Domaine_Dominant' et 'Confiance_Domaine' écrites dans '{store.path}'")
     print("\nDistribution des domaines dominants :")
-    print(df_metrics['Domaine_Dominant'].value_counts())
+    print(pd.Series(row_domains).value_counts())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
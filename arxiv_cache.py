@@ -0,0 +1,116 @@
+import json
+import time
+import sqlite3
+import unicodedata
+
+# --- Cache disque des requêtes 'au:"<nom>"' de l'API ArXiv ---
+#
+# Partagé par le crawler (Liste_adj, async_crawler) et l'étiquetage des
+# domaines (add_subcategory) : une requête déjà faite, dans ce run ou un
+# précédent, est servie depuis le fichier SQLite au lieu de l'API limitée
+# en débit. On stocke les articles déjà parsés :
+#   [{'id', 'published', 'updated', 'primary_category', 'authors'}, ...]
+# dans l'ordre de l'API (du plus récent au plus ancien pour submittedDate).
+# L'ordre de tri fait partie de la clé : les 100 articles les plus récents
+# et les 100 plus pertinents ne sont pas la même réponse.
+#
+# Une entrée expire après `ttl_seconds`. Au-delà de `max_entries` entrées,
+# les moins récemment lues sont supprimées (LRU).
+
+CACHE_FILE = "arxiv_cache.sqlite"
+TTL_SECONDS = 30 * 24 * 3600
+MAX_ENTRIES = 2_000_000
+SORT_BY = "submittedDate" # Tri des requêtes des crawlers (sortBy de l'API)
+
+
+def normalize_query(author_name: str, sort_by: str = SORT_BY) -> str:
+    """ Clé de cache : nom en Unicode NFC, espaces normalisés, casse ignorée (comme l'API), puis le tri. """
+    name = unicodedata.normalize('NFC', author_name)
+    return f'au:"{" ".join(name.split()).casefold()}" sortBy:{sort_by}'
+
+
+def paper_from_arxiv_result(result) -> dict:
+    """ Convertit un arxiv.Result (librairie arxiv) au format du cache. """
+    return {
+        'id': result.entry_id,
+        'published': result.published.isoformat() if result.published else "",
+        'updated': result.updated.isoformat() if result.updated else "",
+        'primary_category': result.primary_category,
+        'authors': [author.name for author in result.authors],
+    }
+
+
+class ArxivCache:
+    """
+    Cache clé/valeur SQLite. get() renvoie None si la requête n'est pas
+    connue, a expiré, ou a été faite avec moins de résultats que demandé.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttl_seconds: float = TTL_SECONDS,
+                 max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, max_results INTEGER, papers TEXT,"
+            " created REAL, accessed REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, author_name: str, max_results: int, sort_by: str = SORT_BY) -> list[dict] | None:
+        key = normalize_query(author_name, sort_by)
+        row = self._conn.execute(
+            "SELECT max_results, papers, created FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and now - row[2] > self.ttl_seconds:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            self._count -= 1
+            row = None
+        if row is not None:
+            stored_max, papers = row[0], json.loads(row[1])
+            # Une réponse plus courte que sa limite est complète : elle sert toute demande
+            if stored_max >= max_results or len(papers) < stored_max:
+                self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return papers[:max_results]
+        self.misses += 1
+        return None
+
+    def put(self, author_name: str, max_results: int, papers: list[dict], sort_by: str = SORT_BY):
+        key = normalize_query(author_name, sort_by)
+        now = time.time()
+        if sort_by == "submittedDate":
+            papers = sorted(papers, key=lambda p: p.get('published') or "", reverse=True)
+        if self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is None:
+            self._count += 1
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, max_results, papers, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, max_results, json.dumps(papers, ensure_ascii=False), now, now))
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)", (excess,))
+            self._count -= excess
+
+    def __len__(self):
+        return self._count
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Cache ArXiv : {self.hits} hits, {self.misses} misses ({rate:.1%} servis depuis le disque)"
+
+    def close(self):
+        self._conn.close()
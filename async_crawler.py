@@ -0,0 +1,226 @@
+import json
+import time
+import random
+import asyncio
+import xml.etree.ElementTree as ET
+import aiohttp
+from tqdm import tqdm
+from arxiv_cache import ArxivCache
+from crawl_state import open_crawl_state
+from crawl_records import crawl_record
+
+# --- Crawl asynchrone de l'API ArXiv ---
+#
+# Même parcours en largeur que Liste_adj.stream_build_graph_to_jsonl, mais
+# avec `concurrency` requêtes en vol en même temps :
+#   - un seau à jetons (TokenBucket) commun impose le débit global autorisé
+#     par l'API, quel que soit le nombre de requêtes en vol ;
+#   - une seule session aiohttp réutilise les connexions HTTP ;
+#   - les erreurs réseau / 429 / 5xx sont retentées avec un délai exponentiel ;
+#     les autres 4xx (requête refusée telle quelle) échouent tout de suite ;
+#   - les résultats sont écrits dans le JSONL dans l'ordre où les auteurs ont
+#     été retirés de la file (OrderedJsonlWriter), et c'est à ce moment que
+#     leurs co-auteurs entrent dans la file : l'ordre du BFS reste déterministe ;
+#   - la file et les visités sont persistés au fil de l'eau (CrawlState) : un
+#     crawl interrompu reprend exactement où il s'était arrêté. Avec
+#     memory_bytes, cet état reste sur disque et la mémoire ne grossit plus
+#     avec le nombre d'auteurs (DiskCrawlState).
+# Avec un ArxivCache, les auteurs déjà interrogés ne consomment ni jeton ni requête.
+# L'URL de l'API est un paramètre, ce qui permet de tester contre un serveur
+# local qui renvoie des flux Atom préparés à l'avance.
+
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+
+CONCURRENCY = 8
+REQUESTS_PER_SECOND = 1.0
+MAX_RESULTS = 100
+NUM_RETRIES = 5
+BACKOFF_SECONDS = 2.0
+CRAWL_MEMORY_BYTES = None # None : file et visités en mémoire ; sinon plafond en octets
+
+
+class RequestRejected(Exception):
+    """ Réponse 4xx autre que 429 : définitive, la requête n'est pas retentée. """
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(f"HTTP {status} {reason or ''}".strip())
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Seau à jetons asynchrone : `rate` jetons par seconde, au plus `capacity`
+    en réserve. Chaque requête consomme un jeton.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def parse_atom_feed(text: str) -> list[dict]:
+    """
+    Extrait les articles d'une réponse Atom de l'API ArXiv :
+    [{'id', 'published', 'updated', 'primary_category', 'authors'}, ...]
+    """
+    root = ET.fromstring(text)
+    papers = []
+    for entry in root.iter(f"{ATOM}entry"):
+        primary = entry.find(f"{ARXIV}primary_category")
+        papers.append({
+            'id': (entry.findtext(f"{ATOM}id") or "").strip(),
+            'published': (entry.findtext(f"{ATOM}published") or "").strip(),
+            'updated': (entry.findtext(f"{ATOM}updated") or "").strip(),
+            'primary_category': primary.get('term') if primary is not None else None,
+            'authors': [(a.findtext(f"{ATOM}name") or "").strip() for a in entry.findall(f"{ATOM}author")],
+        })
+    return papers
+
+
+def author_query(author_name: str, max_results: int = MAX_RESULTS) -> dict:
+    """ Paramètres de la requête 'au:"<nom>"' (les plus récents d'abord). """
+    return {
+        'search_query': f'au:"{author_name}"',
+        'start': 0,
+        'max_results': max_results,
+        'sortBy': 'submittedDate',
+        'sortOrder': 'descending',
+    }
+
+
+async def fetch_author_papers(session: aiohttp.ClientSession, bucket: TokenBucket, author_name: str,
+                              api_url: str = ARXIV_API_URL, max_results: int = MAX_RESULTS,
+                              num_retries: int = NUM_RETRIES, backoff: float = BACKOFF_SECONDS,
+                              cache: ArxivCache = None) -> list[dict]:
+    """
+    Articles de l'auteur ; lève la dernière erreur si tous les essais
+    échouent, ou RequestRejected dès un 4xx autre que 429.
+    """
+    if cache is not None:
+        papers = cache.get(author_name, max_results)
+        if papers is not None:
+            return papers
+    params = author_query(author_name, max_results)
+    for attempt in range(num_retries + 1):
+        await bucket.acquire()
+        try:
+            async with session.get(api_url, params=params) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                      status=response.status, message=response.reason)
+                if response.status >= 400:
+                    # Hors de l'except ci-dessous : pas de nouvel essai
+                    raise RequestRejected(response.status, response.reason)
+                papers = parse_atom_feed(await response.text())
+            if cache is not None:
+                cache.put(author_name, max_results, papers)
+            return papers
+        except (aiohttp.ClientError, asyncio.TimeoutError, ET.ParseError) as e:
+            if attempt == num_retries:
+                raise
+            # Délai exponentiel avec un peu d'aléa pour désynchroniser les requêtes
+            await asyncio.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+class OrderedJsonlWriter:
+    """
+    Écrit les enregistrements dans l'ordre de leur numéro de séquence, même
+    s'ils arrivent dans le désordre. complete() renvoie les enregistrements
+    effectivement écrits (ceux dont tous les prédécesseurs sont arrivés),
+    avec la taille du fichier juste après chacun.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._next = 0
+        self._pending = {}
+
+    def complete(self, seq: int, record: dict) -> list[tuple[dict, int]]:
+        self._pending[seq] = record
+        written = []
+        while self._next in self._pending:
+            record = self._pending.pop(self._next)
+            self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._f.flush()
+            written.append((record, self._f.tell()))
+            self._next += 1
+        return written
+
+
+async def crawl(seed_author: str, output_file: str, concurrency: int = CONCURRENCY,
+                requests_per_second: float = REQUESTS_PER_SECOND, api_url: str = ARXIV_API_URL,
+                max_results: int = MAX_RESULTS, num_retries: int = NUM_RETRIES,
+                backoff: float = BACKOFF_SECONDS, max_authors: int = None,
+                cache: ArxivCache = None, memory_bytes: int = CRAWL_MEMORY_BYTES) -> int:
+    """
+    Parcours en largeur asynchrone depuis seed_author. Renvoie le nombre
+    d'auteurs explorés pendant cet appel.
+    """
+    print(f"--- Démarrage de la collecte asynchrone ({concurrency} requêtes en vol, "
+          f"{requests_per_second} req/s). Sortie : '{output_file}' ---")
+    state = open_crawl_state(output_file, seed_author, memory_bytes)
+    queue = state.queue
+    if state.n_explored:
+        print(f"Reprise de l'exploration : {state.n_explored} auteurs déjà écrits, {len(queue)} en file.")
+
+    bucket = TokenBucket(requests_per_second)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    async def explore(seq, author):
+        try:
+            papers = await fetch_author_papers(session, bucket, author, api_url, max_results,
+                                               num_retries, backoff, cache)
+        except Exception as e:
+            print(f"Erreur lors de la recherche pour '{author}': {e}")
+            papers = []
+        return seq, crawl_record(author, papers)
+
+    explored = 0
+    next_seq = 0
+    in_flight = set()
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        with open(output_file, 'a', encoding='utf-8') as f:
+            writer = OrderedJsonlWriter(f)
+            pbar = tqdm(desc="Auteurs explorés")
+            while queue or in_flight:
+                while queue and len(in_flight) < concurrency and (max_authors is None or next_seq < max_authors):
+                    in_flight.add(asyncio.create_task(explore(next_seq, queue.popleft())))
+                    next_seq += 1
+                if not in_flight:
+                    break
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    seq, record = task.result()
+                    for written, offset in writer.complete(seq, record):
+                        state.explored(written['author'], written['coauthors'], offset)
+                        explored += 1
+                        pbar.update(1)
+            pbar.close()
+    state.close()
+
+    if cache is not None:
+        print(cache.stats())
+    print(f"\n--- Exploration terminée. {explored} auteurs explorés, {state.n_discovered} auteurs découverts. ---")
+    return explored
+
+
+def run_crawl(seed_author: str, output_file: str, **kwargs) -> int:
+    """ Point d'entrée synchrone de crawl(). """
+    return asyncio.run(crawl(seed_author, output_file, **kwargs))
@@ -0,0 +1,176 @@
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import stats
+from tqdm import tqdm
+from csr_graph import CSRGraph, SharedCSR, attach_shared_arrays, attach_shared_graph, largest_component
+from edge_attack import EdgeMask, classify_edges, edge_slots, sampled_path_length
+from graph_snapshot import load_graph
+
+# --- Attaque par suppression de liens : réplicats en parallèle ---
+#
+# test.py tire un seul ordre de suppression par niveau et estime L sur 15
+# sources : les courbes sont bruitées. Ici chaque tâche (attaque, fraction,
+# réplicat) est indépendante et part sur un pool de processus. Les workers
+# se rattachent une fois pour toutes au graphe en mémoire partagée
+# (SharedCSR), avec les positions des liens (edge_slots) et les liens
+# candidats de chaque attaque : rien de proportionnel au graphe n'est
+# envoyé par pickle, une tâche ne transporte que son triplet.
+#
+# Les graines ne dépendent que de la tâche, pas du worker qui l'exécute :
+# les résultats sont identiques quel que soit le nombre de processus. Un
+# réplicat garde le même ordre de suppression à tous les niveaux (niveaux
+# emboîtés, comme edge_attack.sweep_removals).
+#
+# Les mesures (L échantillonné, taille de la composante géante) sont
+# agrégées par (attaque, fraction) en moyenne et intervalle de confiance
+# de Student.
+
+# --- CONFIGURATION ---
+JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
+CSV_FILE = "auteurs_avec_excentricite_filtree_et_domaine.csv"
+OUTPUT_CSV = "attaque_replicats.csv"
+SUMMARY_CSV = "attaque_replicats_resume.csv"
+ATTACKS = ['Inter', 'Intra', 'Random']
+FRACTIONS = [0, 0.05, 0.10, 0.15, 0.20, 0.30]
+REPLICATES = 20
+SAMPLE_SIZE = 15 # Sources BFS par estimation de L
+CONFIDENCE = 0.95
+SEED = 42
+N_WORKERS = None # None = tous les coeurs
+
+
+def attack_candidates(is_inter: np.ndarray) -> dict[str, np.ndarray]:
+    """ Liens (rangs de graph.edge_array()) que chaque attaque peut couper. """
+    return {
+        'Inter': np.flatnonzero(is_inter),
+        'Intra': np.flatnonzero(~is_inter),
+        'Random': np.arange(len(is_inter)),
+    }
+
+
+def run_job(graph: CSRGraph, mask: EdgeMask, candidates: dict, job: tuple,
+            seed: int = SEED, n_samples: int = SAMPLE_SIZE) -> tuple[float, float]:
+    """ (L échantillonné, fraction des noeuds dans la composante géante) pour une tâche. """
+    attack, fraction, replicate = job
+    attack_key = zlib.crc32(attack.encode())
+    order = np.random.default_rng([seed, attack_key, replicate]).permutation(candidates[attack])
+    mask.reset()
+    mask.remove(order[:int(len(order) * fraction)])
+    lcc = largest_component(graph, mask.alive)
+    source_rng = np.random.default_rng([seed, attack_key, replicate, int(round(fraction * 1e6))])
+    L = sampled_path_length(graph, n_samples, mask.alive, source_rng, lcc)
+    return L, len(lcc) / graph.n_nodes
+
+
+# --- Workers (graphe en mémoire partagée) ---
+
+_worker_state = None
+
+
+def _init_worker(spec, seed, n_samples):
+    global _worker_state
+    graph, segments = attach_shared_graph(spec)
+    arrays, array_segments = attach_shared_arrays(spec)
+    mask = EdgeMask(graph, (arrays.pop('forward'), arrays.pop('backward')))
+    _worker_state = (graph, mask, arrays, seed, n_samples, segments + array_segments)
+
+
+def _run_job(job):
+    graph, mask, candidates, seed, n_samples, _ = _worker_state
+    return run_job(graph, mask, candidates, job, seed, n_samples)
+
+
+def run_experiment(graph: CSRGraph, is_inter: np.ndarray, attacks: list[str] = ATTACKS,
+                   fractions: list[float] = FRACTIONS, replicates: int = REPLICATES,
+                   n_samples: int = SAMPLE_SIZE, seed: int = SEED, n_workers: int = None) -> pd.DataFrame:
+    """ Une ligne par tâche : Attaque, Fraction, Replicat, L, Geante. """
+    jobs = [(attack, fraction, r) for attack in attacks for fraction in fractions for r in range(replicates)]
+    candidates = attack_candidates(is_inter)
+    forward, backward = edge_slots(graph)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    results = []
+    with tqdm(total=len(jobs), desc="Attaques (tâches)") as pbar:
+        if n_workers == 1 or len(jobs) <= 1:
+            mask = EdgeMask(graph, (forward, backward))
+            for job in jobs:
+                results.append(run_job(graph, mask, candidates, job, seed, n_samples))
+                pbar.update(1)
+        else:
+            arrays = {'forward': forward, 'backward': backward, **candidates}
+            with SharedCSR(graph, arrays) as shared, ProcessPoolExecutor(
+                    max_workers=n_workers, initializer=_init_worker,
+                    initargs=(shared.spec, seed, n_samples)) as pool:
+                for result in pool.map(_run_job, jobs):
+                    results.append(result)
+                    pbar.update(1)
+
+    df = pd.DataFrame(jobs, columns=['Attaque', 'Fraction', 'Replicat'])
+    df['L'] = [L for L, _ in results]
+    df['Geante'] = [giant for _, giant in results]
+    return df
+
+
+def summarize(df: pd.DataFrame, confidence: float = CONFIDENCE) -> pd.DataFrame:
+    """ Moyenne et intervalle de confiance (Student) de L et Geante par (Attaque, Fraction). """
+    grouped = df.groupby(['Attaque', 'Fraction'], sort=False)
+    summary = grouped.size().rename('Replicats').to_frame()
+    for column in ('L', 'Geante'):
+        mean, std = grouped[column].mean(), grouped[column].std(ddof=1).fillna(0.0)
+        n = summary['Replicats']
+        half = stats.t.ppf((1 + confidence) / 2, np.maximum(n - 1, 1)) * std / np.sqrt(n)
+        summary[f'{column}_moyen'] = mean
+        summary[f'{column}_ic_bas'] = mean - half
+        summary[f'{column}_ic_haut'] = mean + half
+    return summary.reset_index()
+
+
+def plot_summary(summary: pd.DataFrame, confidence: float = CONFIDENCE):
+    import matplotlib.pyplot as plt
+    styles = {'Inter': ('r-o', 'Coupe Inter-Domaines (Ponts)'),
+              'Intra': ('g--o', 'Coupe Intra-Domaines (Communautés)'),
+              'Random': ('b:o', 'Coupe au hasard')}
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    for attack, rows in summary.groupby('Attaque', sort=False):
+        style, label = styles.get(attack, ('k-o', attack))
+        for ax, column in zip(axes, ('L', 'Geante')):
+            ax.plot(rows['Fraction'], rows[f'{column}_moyen'], style, label=label)
+            ax.fill_between(rows['Fraction'], rows[f'{column}_ic_bas'], rows[f'{column}_ic_haut'],
+                            color=style[0], alpha=0.2)
+    axes[0].set_title(f"Distance Moyenne (L), IC {int(confidence*100)}%")
+    axes[0].set_ylabel("Distance Moyenne (L)")
+    axes[1].set_title(f"Composante géante, IC {int(confidence*100)}%")
+    axes[1].set_ylabel("Fraction des noeuds")
+    for ax in axes:
+        ax.set_xlabel("% de liens supprimés")
+        ax.legend()
+        ax.grid(True)
+    plt.tight_layout()
+    plt.show()
+
+
+def main():
+    print(f"[{time.strftime('%H:%M:%S')}] Chargement du graphe et des domaines...")
+    graph = load_graph(JSON_FILE)
+    domains = pd.read_csv(CSV_FILE).set_index('Auteur')['Domaine_Dominant'].to_dict()
+    is_inter = classify_edges(graph, np.array([domains.get(n, "Inconnu") for n in graph.names], dtype=object))
+    print(f"Graphe : {graph.n_nodes} noeuds, {graph.n_edges} liens "
+          f"({int(is_inter.sum())} inter-domaines, {int((~is_inter).sum())} intra-domaines).")
+
+    start = time.time()
+    df = run_experiment(graph, is_inter, n_workers=N_WORKERS)
+    print(f"[{time.strftime('%H:%M:%S')}] {len(df)} tâches en {time.time() - start:.1f}s")
+    df.to_csv(OUTPUT_CSV, index=False)
+
+    summary = summarize(df)
+    summary.to_csv(SUMMARY_CSV, index=False)
+    print(summary.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    plot_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from csr_graph import CSRGraph, SharedCSR, attach_shared_graph, neighbor_slots
+from graph_snapshot import load_graph
+from feature_store import ensure_table, open_feature_store
+
+# --- Centralité d'intermédiarité (Brandes) sur le graphe CSR ---
+#
+# Pour chaque source s : BFS par niveaux qui compte les plus courts chemins
+# (sigma), puis remontée des niveaux pour accumuler les dépendances (delta).
+# Les deux passes sont vectorisées niveau par niveau avec NumPy.
+# Les sources sont réparties par lots sur un pool de processus qui lisent
+# tous le même graphe en mémoire partagée.
+#
+# Normalisation identique à networkx.betweenness_centrality(normalized=True)
+# pour un graphe non-dirigé : somme des dépendances / ((n-1)(n-2)).
+#
+# Mode approché : k sources tirées au hasard. Chaque source apporte à chaque
+# noeud une contribution delta_s(v)/(n-2) dans [0, 1] ; par Hoeffding et une
+# borne d'union sur les n noeuds, k >= ln(2n/delta) / (2 eps²) garantit une
+# erreur absolue <= eps (à un facteur n/(n-1) près) sur toutes les valeurs
+# normalisées avec probabilité >= 1 - delta.
+
+# --- CONFIGURATION ---
+JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
+CSV_FILE = "resultats_finaux_gpu_optimized.csv" # Importé dans la table (colonnes manquantes)
+OUTPUT_FILE = "resultats_finaux_avec_intermediarite.csv" # Export CSV (si EXPORT_CSV)
+COLUMN = 'Centralité Intermédiarité'
+# La colonne est écrite dans la table en colonnes du graphe (feature_store.py),
+# où heatmap.py la lit. True : exporte aussi la table en CSV comme avant.
+EXPORT_CSV = False
+EPSILON = 0.005 # None = calcul exact
+CONFIDENCE = 0.95
+SOURCES_PER_TASK = 32
+
+
+def single_source_dependencies(graph: CSRGraph, source: int) -> np.ndarray:
+    """ Dépendances delta_s(v) de Brandes pour une source. """
+    n = graph.n_nodes
+    dist = np.full(n, -1, dtype=np.int32)
+    sigma = np.zeros(n, dtype=np.float64)
+    dist[source] = 0
+    sigma[source] = 1.0
+
+    # Liens (v -> w) entre niveaux consécutifs, gardés pour la remontée
+    level_edges = []
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        slots = neighbor_slots(graph, frontier)
+        v = np.repeat(frontier, graph.indptr[frontier + 1] - graph.indptr[frontier])
+        w = graph.indices[slots].astype(np.int64)
+        fresh = w[dist[w] < 0]
+        dist[fresh] = level + 1
+        on_path = dist[w] == level + 1
+        v, w = v[on_path], w[on_path]
+        sigma += np.bincount(w, weights=sigma[v], minlength=n)
+        level_edges.append((v, w))
+        frontier = np.unique(w)
+        level += 1
+
+    delta = np.zeros(n, dtype=np.float64)
+    for v, w in reversed(level_edges):
+        delta += np.bincount(v, weights=sigma[v] / sigma[w] * (1.0 + delta[w]), minlength=n)
+    delta[source] = 0.0
+    return delta
+
+
+def _accumulate(graph: CSRGraph, sources: np.ndarray) -> np.ndarray:
+    total = np.zeros(graph.n_nodes, dtype=np.float64)
+    for s in sources:
+        total += single_source_dependencies(graph, int(s))
+    return total
+
+
+# --- Workers (graphe en mémoire partagée) ---
+
+_worker_graph = None
+_worker_segments = None
+
+
+def _init_worker(spec):
+    global _worker_graph, _worker_segments
+    _worker_graph, _worker_segments = attach_shared_graph(spec)
+
+
+def _run_sources(sources):
+    return _accumulate(_worker_graph, sources)
+
+
+def sample_size(n: int, epsilon: float, confidence: float) -> int:
+    """ Nombre de sources pour une erreur <= epsilon avec probabilité >= confidence. """
+    return min(n, math.ceil(math.log(2 * n / (1 - confidence)) / (2 * epsilon ** 2)))
+
+
+def betweenness_centrality(graph: CSRGraph, epsilon: float = None, confidence: float = 0.95,
+                           n_workers: int = None, seed: int = 42) -> np.ndarray:
+    """
+    Intermédiarité normalisée de tous les noeuds. epsilon=None : exact
+    (toutes les sources) ; sinon échantillon de sources (voir sample_size).
+    """
+    n = graph.n_nodes
+    if n <= 2:
+        return np.zeros(n)
+    if epsilon is None:
+        sources = np.arange(n)
+    else:
+        k = sample_size(n, epsilon, confidence)
+        sources = np.random.default_rng(seed).choice(n, size=k, replace=False)
+    tasks = [sources[i:i + SOURCES_PER_TASK] for i in range(0, len(sources), SOURCES_PER_TASK)]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    total = np.zeros(n, dtype=np.float64)
+    with tqdm(total=len(sources), desc="Brandes (sources)") as pbar:
+        if n_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                total += _accumulate(graph, task)
+                pbar.update(len(task))
+        else:
+            with SharedCSR(graph) as shared, ProcessPoolExecutor(
+                    max_workers=n_workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+                for task, partial in zip(tasks, pool.map(_run_sources, tasks)):
+                    total += partial
+                    pbar.update(len(task))
+
+    # Extrapolation de l'échantillon à toutes les sources, puis normalisation
+    total *= n / len(sources)
+    return total / ((n - 1) * (n - 2))
+
+
+def main():
+    print(f"[{time.strftime('%H:%M:%S')}] Chargement du graphe...")
+    graph = load_graph(JSON_FILE)
+    mode = "exact" if EPSILON is None else f"approché (eps={EPSILON}, confiance={CONFIDENCE})"
+    print(f"[{time.strftime('%H:%M:%S')}] Intermédiarité {mode} sur {graph.n_nodes} auteurs...")
+    values = betweenness_centrality(graph, EPSILON, CONFIDENCE)
+
+    store = open_feature_store(JSON_FILE)
+    try:
+        rows = ensure_table(store, graph, CSV_FILE)
+    except FileNotFoundError:
+        print(f"'{CSV_FILE}' introuvable et table vide : colonne écrite pour tout le graphe.")
+        rows = np.arange(graph.n_nodes)
+    store.write(COLUMN, values)
+    print(f"[{time.strftime('%H:%M:%S')}] Colonne '{COLUMN}' écrite dans : {store.path}")
+    if EXPORT_CSV:
+        store.to_csv(OUTPUT_FILE, graph.names, rows)
+        print(f"Fichier généré : {OUTPUT_FILE}")
+    print(pd.Series(values[rows]).describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from collections import Counter
+from csr_graph import load_record
+
+# --- Format des lignes du JSONL écrit par les crawlers ---
+#
+#   {"author": ..., "coauthors": [...],
+#    "categories": {"cs.LG": 12, "stat.ML": 3, ...},   # catégorie principale des articles
+#    "papers": [["2101.00001v2", "2021-01-04"], ...]}  # ID ArXiv et date, plus récents d'abord
+#
+# Les catégories sont lues pendant le crawl (elles sont dans la même réponse
+# que les co-auteurs) : le domaine d'un auteur se calcule ensuite hors ligne,
+# sans nouvel appel à l'API. Les anciens fichiers (sans 'categories') restent
+# lisibles par tous les scripts.
+
+
+def paper_categories(papers: list[dict]) -> Counter:
+    """ Nombre d'articles par catégorie principale (format d'arxiv_cache). """
+    return Counter(paper['primary_category'] for paper in papers if paper.get('primary_category'))
+
+
+def crawl_record(author_name: str, papers: list[dict]) -> dict:
+    """ Ligne du JSONL pour un auteur, à partir de ses articles (format d'arxiv_cache). """
+    coauthors = set()
+    for paper in papers:
+        coauthors.update(paper['authors'])
+    coauthors.discard(author_name)
+    return {
+        'author': author_name,
+        'coauthors': list(coauthors),
+        'categories': dict(paper_categories(papers)),
+        'papers': [[paper_short_id(p['id']), (p.get('published') or "")[:10]] for p in papers],
+    }
+
+
+def paper_short_id(entry_id: str) -> str:
+    """ 'http://arxiv.org/abs/2101.00001v2' -> '2101.00001v2' """
+    return entry_id.rsplit('/abs/', 1)[-1]
+
+
+def load_author_categories(jsonl_file: str) -> dict[str, Counter]:
+    """
+    Comptes de catégories de chaque auteur ayant sa ligne dans le JSONL.
+    Les auteurs écrits par un ancien crawler (sans 'categories') sont absents ;
+    les lignes que le graphe ignore (csr_graph.load_record) le sont aussi.
+    """
+    author_categories = {}
+    with open(jsonl_file, 'rb') as f:
+        for line in f:
+            record = load_record(line)
+            if record is None or not isinstance(record.get('categories'), dict):
+                continue
+            if record['author'] not in author_categories:
+                author_categories[record['author']] = Counter(
+                    {c: n for c, n in record['categories'].items() if isinstance(n, int) and n > 0})
+    return author_categories
+
+
+def dominant_category(categories: Counter) -> str | None:
+    """ Catégorie la plus fréquente (à égalité : la plus récente, ordre d'insertion). """
+    if not categories:
+        return None
+    return categories.most_common(1)[0][0]
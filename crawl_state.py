@@ -0,0 +1,473 @@
+import os
+import math
+import json
+import sqlite3
+import hashlib
+from collections import deque
+import numpy as np
+
+# --- État reprenable du parcours en largeur des crawlers ---
+#
+# Le BFS écrit les auteurs dans le JSONL dans l'ordre où ils sortent de la
+# file. Il suffit donc de garder la liste des auteurs découverts, dans
+# l'ordre de découverte, et le nombre d'auteurs déjà écrits :
+#   visited = set(discovered)      file = discovered[explored:]
+# Cet état est gardé à côté du JSONL, dans '<fichier>.frontier/' :
+#   log.jsonl     -> une ligne par auteur écrit : {"author", "offset", "new"}
+#                    (offset = taille du JSONL après l'écriture, new = co-auteurs
+#                    découverts à ce moment), en ajout seulement
+#   discovered.jsonl -> les auteurs découverts, un nom JSON par ligne, dans
+#                    l'ordre de découverte, en ajout seulement
+#   snapshot.json -> compteurs (auteurs écrits, offset, taille valide de
+#                    discovered.jsonl), réécrit tous les `snapshot_every`
+#                    auteurs, après quoi le log repart de zéro
+# Un snapshot n'ajoute à discovered.jsonl que les noms découverts depuis le
+# précédent : son coût ne grandit pas avec la taille du crawl. Les octets
+# au-delà de la taille notée (arrêt pendant un snapshot) sont ignorés puis
+# écrasés.
+# À la reprise on lit le snapshot puis le log, sans relire le JSONL. Les
+# lignes du JSONL au-delà du dernier offset connu (arrêt entre l'écriture et
+# le log) sont rejouées : un auteur déjà écrit n'est jamais réinterrogé.
+
+STATE_SUFFIX = ".frontier"
+SNAPSHOT_EVERY = 10_000
+
+
+def state_dir(output_file: str) -> str:
+    return output_file + STATE_SUFFIX
+
+
+class CrawlState:
+    """
+    File et ensemble des visités d'un crawl, persistés au fil de l'eau.
+    Le crawler retire les auteurs de `queue` puis appelle explored() une
+    fois leur ligne écrite et vidée sur disque.
+    Cette version garde tout en mémoire ; DiskCrawlState garde les mêmes
+    données sur disque (voir plus bas).
+    """
+
+    def __init__(self, output_file: str, snapshot_every: int = SNAPSHOT_EVERY):
+        self.output_file = output_file
+        self.snapshot_every = snapshot_every
+        self.dir = state_dir(output_file)
+        self.discovered = []
+        self.visited = set()
+        self.n_explored = 0
+        self.offset = 0
+        self.queue = deque()
+        self._log = None
+        self._since_snapshot = 0
+        self._saved = 0 # Noms de discovered déjà dans discovered.jsonl
+        self._names_bytes = 0 # Taille valide de discovered.jsonl
+
+    @classmethod
+    def open(cls, output_file: str, seed_author: str, **kwargs) -> "CrawlState":
+        """ Reprend l'état existant, ou le reconstruit une fois depuis le JSONL s'il n'y en a pas. """
+        state = cls(output_file, **kwargs)
+        _truncate_partial_line(output_file)
+        if not state._load():
+            state._rebuild(seed_author)
+        state._replay_tail(seed_author)
+        state.queue = state._make_queue()
+        state._checkpoint()
+        return state
+
+    @property
+    def n_discovered(self) -> int:
+        return len(self.discovered)
+
+    def explored(self, author: str, coauthors, offset: int) -> list[str]:
+        """ Enregistre un auteur écrit dans le JSONL ; renvoie les nouveaux auteurs mis en file. """
+        new = self._apply(author, coauthors, offset)
+        self._enqueue(new)
+        self._persist(author, offset, new)
+        return new
+
+    def close(self):
+        if self._log is not None:
+            self._checkpoint()
+            self._log.close()
+            self._log = None
+
+    def _apply(self, author: str, coauthors, offset: int) -> list[str]:
+        new = self._discover(coauthors)
+        self.n_explored += 1
+        self.offset = offset
+        return new
+
+    def _rebuild(self, seed_author: str):
+        """ Première reprise d'un JSONL sans état : une relecture complète, en deux passes. """
+        self._reset()
+        # Les auteurs écrits d'abord, puis la file : graine et co-auteurs jamais écrits
+        for record, offset in _read_records(self.output_file, 0):
+            self._discover([record['author']])
+            self.offset = offset
+        self.n_explored = self.n_discovered
+        self._discover([seed_author])
+        for record, _ in _read_records(self.output_file, 0):
+            self._discover(record['coauthors'])
+
+    def _replay_tail(self, seed_author: str):
+        """ Rejoue les lignes écrites dans le JSONL après le dernier offset enregistré. """
+        for record, offset in _read_records(self.output_file, self.offset):
+            author = record['author']
+            if self.n_explored < self.n_discovered and self._name_at(self.n_explored) == author:
+                self._apply(author, record['coauthors'], offset)
+            else:
+                # Le fichier ne suit plus l'ordre de la file (modifié à la main ?) : on repart du JSONL
+                print(f"État de '{self.dir}' incohérent avec '{self.output_file}' : reconstruction.")
+                self._rebuild(seed_author)
+                return
+
+    # --- Stockage (en mémoire + log JSONL + snapshot JSON) ---
+
+    def _reset(self):
+        self.discovered, self.visited = [], set()
+        self.n_explored = self.offset = 0
+        self._saved = self._names_bytes = 0
+
+    def _discover(self, names) -> list[str]:
+        new = []
+        for name in names:
+            if name not in self.visited:
+                self.visited.add(name)
+                new.append(name)
+        self.discovered.extend(new)
+        return new
+
+    def _name_at(self, i: int) -> str:
+        return self.discovered[i]
+
+    def _make_queue(self):
+        return deque(self.discovered[self.n_explored:])
+
+    def _enqueue(self, new: list[str]):
+        self.queue.extend(new)
+
+    def _load(self) -> bool:
+        try:
+            with open(os.path.join(self.dir, "snapshot.json"), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if 'discovered' in snapshot:
+            # Ancien format (liste complète dans le snapshot) : réécrite au prochain snapshot
+            self.discovered = snapshot['discovered']
+            self._saved = self._names_bytes = 0
+        else:
+            self.discovered = _read_names(os.path.join(self.dir, "discovered.jsonl"), snapshot['names_bytes'])
+            if self.discovered is None or len(self.discovered) != snapshot['n_discovered']:
+                return False
+            self._saved, self._names_bytes = len(self.discovered), snapshot['names_bytes']
+        self.visited = set(self.discovered)
+        self.n_explored = snapshot['explored']
+        self.offset = snapshot['offset']
+        if not _output_covers(self.output_file, self.offset):
+            return False
+        try:
+            with open(os.path.join(self.dir, "log.jsonl"), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break # Dernière ligne coupée par un arrêt brutal
+                    # Lignes déjà incluses dans le snapshot (arrêt avant la remise à zéro du log)
+                    if entry['offset'] <= self.offset:
+                        continue
+                    self.n_explored += 1
+                    self.offset = entry['offset']
+                    self.discovered.extend(entry['new'])
+                    self.visited.update(entry['new'])
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _persist(self, author: str, offset: int, new: list[str]):
+        self._log.write(json.dumps({'author': author, 'offset': offset, 'new': new}, ensure_ascii=False) + '\n')
+        self._log.flush()
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """
+        Ajoute les noms découverts depuis le dernier snapshot, remplace le
+        snapshot (compteurs) de façon atomique puis remet le log à zéro.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        names_path = os.path.join(self.dir, "discovered.jsonl")
+        with open(names_path, 'r+b' if os.path.exists(names_path) else 'wb') as f:
+            f.truncate(self._names_bytes)
+            f.seek(self._names_bytes)
+            f.write(''.join(json.dumps(name, ensure_ascii=False) + '\n'
+                            for name in self.discovered[self._saved:]).encode('utf-8'))
+            self._names_bytes = f.tell()
+        self._saved = len(self.discovered)
+        path = os.path.join(self.dir, "snapshot.json")
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'explored': self.n_explored, 'offset': self.offset,
+                       'n_discovered': self._saved, 'names_bytes': self._names_bytes}, f)
+        os.replace(path + ".tmp", path)
+        if self._log is not None:
+            self._log.close()
+        self._log = open(os.path.join(self.dir, "log.jsonl"), 'w', encoding='utf-8')
+        self._since_snapshot = 0
+
+
+# --- Variante à mémoire bornée ---
+#
+# Pour des millions d'auteurs, l'ensemble des visités et la file ne tiennent
+# plus en mémoire sous forme de chaînes Python. DiskCrawlState garde les
+# mêmes données dans une base SQLite ('<fichier>.frontier/state.sqlite') :
+#   names(id, hash, name) -> chaque nom reçoit un ID entier dans l'ordre de
+#                            découverte ; index sur un hash 64 bits du nom
+#   meta(key, value)      -> nombre d'auteurs écrits, offset dans le JSONL
+# Comme l'ordre de la file est l'ordre de découverte, la file n'est que
+# l'intervalle d'IDs [explored, discovered) : FrontierQueue le lit par
+# segments de `segment_size` noms. Un filtre de Bloom en mémoire évite la
+# requête SQLite pour la plupart des noms jamais vus.
+# La mémoire utilisée est fixée par `memory_bytes` (filtre de Bloom + cache
+# de pages SQLite), quelle que soit la taille du crawl.
+
+MEMORY_BYTES = 256 << 20
+EXPECTED_NAMES = 20_000_000
+SEGMENT_SIZE = 4096
+BLOOM_SHARE = 0.75 # Part de memory_bytes donnée au filtre de Bloom, le reste au cache SQLite
+
+
+def _name_hash(name: str) -> int:
+    """ Hash 64 bits signé (type INTEGER de SQLite). """
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur des hash 64 bits : `n_hashes` positions par double
+    hachage (moitiés basse et haute du hash). Faux positifs possibles,
+    jamais de faux négatifs.
+    """
+
+    def __init__(self, n_bytes: int, expected_items: int):
+        self.bits = np.zeros(max(1, n_bytes), dtype=np.uint8)
+        self.n_bits = self.bits.size * 8
+        self.n_hashes = max(1, min(16, round(self.n_bits / max(1, expected_items) * math.log(2))))
+
+    def _positions(self, h: int) -> list[int]:
+        h &= 0xFFFFFFFFFFFFFFFF
+        a, b = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(a + i * b) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, h: int):
+        for pos in self._positions(h):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, h: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
+
+    def add_many(self, hashes: np.ndarray):
+        """ Version vectorisée de add() (reconstruction depuis la base). """
+        h = hashes.astype(np.int64).view(np.uint64)
+        a = h & np.uint64(0xFFFFFFFF)
+        b = (h >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.n_hashes):
+            pos = (a + np.uint64(i) * b) % np.uint64(self.n_bits)
+            np.bitwise_or.at(self.bits, (pos >> np.uint64(3)).astype(np.int64),
+                             (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+
+
+class FrontierQueue:
+    """
+    File d'attente du BFS lue depuis la table des noms, par segments :
+    seul le segment en cours est en mémoire.
+    """
+
+    def __init__(self, state: "DiskCrawlState", segment_size: int = SEGMENT_SIZE):
+        self._state = state
+        self._segment_size = segment_size
+        self._buffer = deque()
+        self.head = state.n_explored # ID du prochain auteur à sortir
+
+    def __len__(self):
+        return self._state.n_discovered - self.head
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def popleft(self) -> str:
+        if not self._buffer:
+            if not self:
+                raise IndexError("pop from an empty queue")
+            rows = self._state._conn.execute(
+                "SELECT name FROM names WHERE id >= ? ORDER BY id LIMIT ?", (self.head, self._segment_size))
+            self._buffer.extend(name for (name,) in rows)
+        self.head += 1
+        return self._buffer.popleft()
+
+
+class DiskCrawlState(CrawlState):
+    """ CrawlState à mémoire bornée (voir ci-dessus), mêmes méthodes publiques. """
+
+    def __init__(self, output_file: str, memory_bytes: int = MEMORY_BYTES,
+                 expected_names: int = EXPECTED_NAMES, segment_size: int = SEGMENT_SIZE):
+        super().__init__(output_file)
+        self.memory_bytes = memory_bytes
+        self.expected_names = expected_names
+        self.segment_size = segment_size
+        self._n_discovered = 0
+        self._bloom = None
+        self._conn = None
+
+    @property
+    def n_discovered(self) -> int:
+        return self._n_discovered
+
+    def close(self):
+        if self._conn is not None:
+            self._checkpoint()
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self):
+        os.makedirs(self.dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.dir, "state.sqlite"))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        cache_kib = max(1024, int(self.memory_bytes * (1 - BLOOM_SHARE)) >> 10)
+        self._conn.execute(f"PRAGMA cache_size=-{cache_kib}")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS names (id INTEGER PRIMARY KEY, hash INTEGER, name TEXT)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS names_hash ON names(hash)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.commit()
+        self._bloom = BloomFilter(int(self.memory_bytes * BLOOM_SHARE), self.expected_names)
+
+    def _reset(self):
+        if self._conn is None:
+            self._connect()
+        self._conn.execute("DELETE FROM names")
+        self._conn.execute("DELETE FROM meta")
+        self._conn.commit()
+        self._bloom.bits[:] = 0
+        self._n_discovered = self.n_explored = self.offset = 0
+
+    def _discover(self, names) -> list[str]:
+        new, rows, seen = [], [], set()
+        for name in names:
+            if name in seen:
+                continue
+            seen.add(name)
+            h = _name_hash(name)
+            if h in self._bloom and self._conn.execute(
+                    "SELECT 1 FROM names WHERE hash = ? AND name = ?", (h, name)).fetchone():
+                continue
+            self._bloom.add(h)
+            rows.append((self._n_discovered + len(new), h, name))
+            new.append(name)
+        self._conn.executemany("INSERT INTO names (id, hash, name) VALUES (?, ?, ?)", rows)
+        self._n_discovered += len(new)
+        return new
+
+    def _name_at(self, i: int) -> str:
+        return self._conn.execute("SELECT name FROM names WHERE id = ?", (i,)).fetchone()[0]
+
+    def _make_queue(self):
+        return FrontierQueue(self, self.segment_size)
+
+    def _enqueue(self, new: list[str]):
+        pass # Les nouveaux noms sont déjà dans la table : la file les lira à son tour
+
+    def _load(self) -> bool:
+        if not os.path.exists(os.path.join(self.dir, "state.sqlite")):
+            return False
+        self._connect()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if 'explored' not in meta:
+            return False
+        self.n_explored, self.offset = meta['explored'], meta['offset']
+        if not _output_covers(self.output_file, self.offset):
+            return False
+        self._n_discovered = self._conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+        # Le filtre de Bloom est reconstruit par blocs depuis les hash stockés
+        cursor = self._conn.execute("SELECT hash FROM names")
+        while rows := cursor.fetchmany(1 << 16):
+            self._bloom.add_many(np.array([h for (h,) in rows], dtype=np.int64))
+        return True
+
+    def _persist(self, author: str, offset: int, new: list[str]):
+        self._checkpoint()
+
+    def _checkpoint(self):
+        """ Une transaction par auteur écrit : noms découverts + compteurs. """
+        self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               [('explored', self.n_explored), ('offset', self.offset)])
+        self._conn.commit()
+
+
+def open_crawl_state(output_file: str, seed_author: str, memory_bytes: int = None) -> CrawlState:
+    """ État en mémoire (memory_bytes=None) ou à mémoire bornée par memory_bytes. """
+    if memory_bytes is None:
+        return CrawlState.open(output_file, seed_author)
+    return DiskCrawlState.open(output_file, seed_author, memory_bytes=memory_bytes)
+
+
+def _output_covers(output_file: str, offset: int) -> bool:
+    """ Faux si le JSONL a été supprimé ou raccourci depuis l'enregistrement de l'état. """
+    try:
+        return os.path.getsize(output_file) >= offset
+    except FileNotFoundError:
+        return offset == 0
+
+
+def _read_names(path: str, n_bytes: int) -> list[str] | None:
+    """ Noms des n_bytes premiers octets de discovered.jsonl, None si le fichier est plus court ou abîmé. """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(n_bytes)
+    except FileNotFoundError:
+        return None
+    if len(data) < n_bytes:
+        return None
+    try:
+        return [json.loads(line) for line in data.splitlines()]
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _read_records(path: str, start: int):
+    """ (enregistrement, offset de fin de ligne) pour chaque ligne valide à partir de `start`. """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                offset += len(line)
+                try:
+                    yield json.loads(line), offset
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def _truncate_partial_line(path: str):
+    """ Supprime une dernière ligne incomplète (arrêt pendant une écriture). """
+    try:
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            pos = size
+            while pos > 0:
+                step = min(1 << 16, pos)
+                f.seek(pos - step)
+                block = f.read(step)
+                cut = block.rfind(b'\n')
+                if cut >= 0:
+                    f.truncate(pos - step + cut + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+    except FileNotFoundError:
+        pass
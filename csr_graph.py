@@ -0,0 +1,385 @@
+import json
+from array import array
+from multiprocessing import shared_memory
+import numpy as np
+
+# --- Graphe compact : identifiants entiers + adjacence CSR ---
+#
+# Chaque auteur reçoit un identifiant entier (0..n-1). Les voisins du noeud i
+# sont stockés triés dans indices[indptr[i]:indptr[i+1]]. Le graphe est
+# non-dirigé : chaque lien apparaît deux fois (u -> v et v -> u).
+# Les boucles (auteur co-auteur de lui-même) sont ignorées, comme dans test.py
+# et expand.py.
+
+class CSRGraph:
+    """
+    Graphe non-dirigé au format CSR avec table de correspondance ID <-> nom.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, names: list[str],
+                 has_record: np.ndarray = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.names = names
+        # has_record[i] : l'auteur i a sa propre ligne dans le JSONL (auteur "seed")
+        self.has_record = has_record
+        self._name_to_id = None
+
+    # --- Construction ---
+
+    @classmethod
+    def from_edges(cls, src: np.ndarray, dst: np.ndarray, names: list[str]) -> "CSRGraph":
+        """
+        Construit le graphe à partir de deux tableaux d'IDs (un lien par paire).
+        Les doublons et les boucles sont supprimés, les voisins sont triés.
+        """
+        n = len(names)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        keep = src != dst
+        lo = np.minimum(src[keep], dst[keep])
+        hi = np.maximum(src[keep], dst[keep])
+        # Une clé unique par lien non-dirigé pour dédoublonner
+        keys = np.unique(lo * n + hi)
+        lo, hi = keys // n, keys % n
+
+        rows = np.concatenate([lo, hi])
+        cols = np.concatenate([hi, lo])
+        order = np.argsort(rows * n + cols, kind='stable')
+        rows, cols = rows[order], cols[order]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32), list(names))
+
+    @classmethod
+    def from_adjacency(cls, graph: dict) -> "CSRGraph":
+        """
+        Convertit un graphe dict[str, set] (format de load_graph_from_jsonl).
+        """
+        names = list(graph)
+        name_to_id = {name: i for i, name in enumerate(names)}
+        src, dst = array('q'), array('q')
+        for author, neighbors in graph.items():
+            u = name_to_id[author]
+            for neighbor in neighbors:
+                v = name_to_id.get(neighbor)
+                if v is None:
+                    v = name_to_id[neighbor] = len(names)
+                    names.append(neighbor)
+                src.append(u)
+                dst.append(v)
+        return cls.from_edges(np.frombuffer(src, dtype=np.int64),
+                              np.frombuffer(dst, dtype=np.int64), names)
+
+    @classmethod
+    def from_jsonl(cls, input_file: str) -> "CSRGraph":
+        """
+        Lit un fichier JSON Lines {'author', 'coauthors'} sans passer par des sets.
+        Les auteurs sans co-auteurs sont conservés comme noeuds isolés.
+        """
+        builder = GraphBuilder()
+        for author, coauthors in iter_records(input_file):
+            builder.add(author, coauthors)
+        return builder.build()
+
+    # --- Accès ---
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    @property
+    def name_to_id(self) -> dict[str, int]:
+        if self._name_to_id is None:
+            self._name_to_id = {name: i for i, name in enumerate(self.names)}
+        return self._name_to_id
+
+    def __len__(self):
+        return self.n_nodes
+
+    def __contains__(self, name):
+        return name in self.name_to_id
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def id_of(self, name: str) -> int:
+        return self.name_to_id[name]
+
+    def name_of(self, node_id: int) -> str:
+        return self.names[node_id]
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, node_id: int) -> np.ndarray:
+        """ Voisins triés du noeud (vue sur le tableau indices, sans copie). """
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def edge_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Liste des liens non-dirigés (u < v), une seule fois chacun. """
+        rows = np.repeat(np.arange(self.n_nodes, dtype=np.int32), self.degrees())
+        keep = rows < self.indices
+        return rows[keep], self.indices[keep]
+
+    def to_scipy(self, edge_mask: np.ndarray = None):
+        """
+        Matrice d'adjacence scipy.sparse (partage les tableaux CSR).
+        Avec edge_mask (un booléen par position de indices), seules les
+        positions True sont gardées : copie compacte de indices seulement.
+        """
+        from scipy.sparse import csr_matrix
+        shape = (self.n_nodes, self.n_nodes)
+        if edge_mask is None:
+            data = np.ones(len(self.indices), dtype=np.int8)
+            return csr_matrix((data, self.indices, self.indptr), shape=shape)
+        kept = np.zeros(len(self.indices) + 1, dtype=np.int64)
+        np.cumsum(edge_mask, out=kept[1:])
+        indices = self.indices[edge_mask]
+        data = np.ones(len(indices), dtype=np.int8)
+        return csr_matrix((data, indices, kept[self.indptr]), shape=shape)
+
+    def subgraph(self, node_ids: np.ndarray) -> "CSRGraph":
+        """
+        Sous-graphe induit, renuméroté de 0 à len(node_ids)-1 dans l'ordre donné.
+        """
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        new_id = np.full(self.n_nodes, -1, dtype=np.int64)
+        new_id[node_ids] = np.arange(len(node_ids))
+        src, dst = self.edge_array()
+        keep = (new_id[src] >= 0) & (new_id[dst] >= 0)
+        names = [self.names[i] for i in node_ids]
+        sub = CSRGraph.from_edges(new_id[src[keep]], new_id[dst[keep]], names)
+        if self.has_record is not None:
+            sub.has_record = np.asarray(self.has_record)[node_ids]
+        return sub
+
+    def to_networkx(self):
+        """ Graphe NetworkX équivalent (noeuds = noms d'auteurs). """
+        import networkx as nx
+        G = nx.Graph()
+        G.add_nodes_from(self.names)
+        src, dst = self.edge_array()
+        G.add_edges_from((self.names[u], self.names[v]) for u, v in zip(src.tolist(), dst.tolist()))
+        return G
+
+
+# --- Construction au fil de la lecture ---
+
+def load_record(line) -> dict | None:
+    """
+    Objet JSON d'une ligne du JSONL, None si la ligne est inutilisable (JSON
+    invalide, pas un objet, pas d'auteur). Partagé par tous les lecteurs du
+    JSONL pour qu'ils acceptent exactement les mêmes lignes.
+    """
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(record, dict):
+        return None
+    author = record.get('author')
+    if not author or not isinstance(author, str):
+        return None
+    return record
+
+
+def parse_record(line) -> tuple[str, list[str]] | None:
+    """ (auteur, co-auteurs) d'une ligne du JSONL, None si load_record la refuse. """
+    record = load_record(line)
+    if record is None:
+        return None
+    author = record['author']
+    coauthors = record.get('coauthors') or []
+    if not isinstance(coauthors, list):
+        return author, []
+    return author, [c for c in coauthors if isinstance(c, str) and c]
+
+
+def iter_records(input_file: str):
+    """ (auteur, co-auteurs) de chaque ligne valide du JSONL, une ligne en mémoire à la fois. """
+    with open(input_file, 'rb') as f:
+        for line in f:
+            parsed = parse_record(line)
+            if parsed is not None:
+                yield parsed
+
+
+class GraphBuilder:
+    """
+    Liste de liens remplie enregistrement par enregistrement : noms internés
+    en IDs entiers, extrémités dans deux tableaux compacts (src, dst).
+    build() produit le CSRGraph (dédoublonné, voisins triés).
+    """
+
+    def __init__(self):
+        self.names = []
+        self.name_to_id = {}
+        self._src, self._dst = array('q'), array('q')
+        self._record_ids = array('q')
+
+    def intern(self, name: str) -> int:
+        i = self.name_to_id.get(name)
+        if i is None:
+            i = self.name_to_id[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def add(self, author: str, coauthors: list[str]):
+        u = self.intern(author)
+        self._record_ids.append(u)
+        for coauthor in coauthors:
+            self._src.append(u)
+            self._dst.append(self.intern(coauthor))
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Liens tels que lus (avec doublons et boucles), vues sans copie : à prendre une fois la lecture finie. """
+        return np.frombuffer(self._src, dtype=np.int64), np.frombuffer(self._dst, dtype=np.int64)
+
+    def build(self) -> CSRGraph:
+        graph = CSRGraph.from_edges(*self.edges(), self.names)
+        graph.has_record = np.zeros(len(self.names), dtype=bool)
+        graph.has_record[np.frombuffer(self._record_ids, dtype=np.int64)] = True
+        graph._name_to_id = self.name_to_id
+        return graph
+
+
+# --- Partage entre processus (mémoire partagée, sans pickle des tableaux) ---
+
+class SharedCSR:
+    """
+    Copie indptr/indices dans des segments de mémoire partagée. Les workers
+    s'y rattachent avec attach_shared_graph(spec) au lieu de recevoir le
+    graphe par pickle. `arrays` : tableaux annexes partagés de la même façon
+    (ex. masque par lien), relus avec attach_shared_arrays(spec). À utiliser
+    comme gestionnaire de contexte (libération des segments à la sortie).
+    """
+
+    def __init__(self, graph: CSRGraph, arrays: dict = None):
+        self._segments = []
+        self.spec = {'n_nodes': graph.n_nodes, 'arrays': list(arrays or ())}
+        shared = {'indptr': graph.indptr, 'indices': graph.indices, **(arrays or {})}
+        for key, array in shared.items():
+            array = np.asarray(array)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+            self._segments.append(segment)
+            self.spec[key] = (segment.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(spec: dict, key: str) -> tuple[np.ndarray, shared_memory.SharedMemory]:
+    name, shape, dtype = spec[key]
+    segment = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf), segment
+
+
+def attach_shared_graph(spec: dict) -> tuple[CSRGraph, list]:
+    """
+    Graphe (sans noms) construit sur les segments partagés décrits par spec.
+    Les segments renvoyés doivent rester référencés tant que le graphe sert.
+    """
+    indptr, indptr_segment = _attach(spec, 'indptr')
+    indices, indices_segment = _attach(spec, 'indices')
+    return CSRGraph(indptr, indices, range(spec['n_nodes'])), [indptr_segment, indices_segment]
+
+
+def attach_shared_arrays(spec: dict) -> tuple[dict, list]:
+    """ Tableaux annexes de SharedCSR(graph, arrays), par nom, et leurs segments. """
+    arrays, segments = {}, []
+    for key in spec.get('arrays', ()):
+        arrays[key], segment = _attach(spec, key)
+        segments.append(segment)
+    return arrays, segments
+
+
+# --- Parcours ---
+
+def neighbor_slots(graph: CSRGraph, nodes: np.ndarray) -> np.ndarray:
+    """
+    Positions dans graph.indices de tous les voisins des noeuds donnés
+    (concaténées dans l'ordre des noeuds), sans boucle Python.
+    """
+    starts = graph.indptr[nodes]
+    lengths = graph.indptr[np.asarray(nodes) + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+def neighbor_reduce(graph: CSRGraph, values: np.ndarray, ufunc: np.ufunc, initial: np.ndarray) -> np.ndarray:
+    """
+    result[v] = ufunc.reduce([initial[v]] + [values[u] pour u voisin de v]),
+    pour des lignes de valeurs (ex. np.maximum, np.bitwise_or).
+
+    Les noeuds sont triés par degré décroissant ; à l'étape j on combine le
+    j-ème voisin de tous les noeuds de degré > j, qui forment un préfixe
+    contigu. Chaque étape est une seule opération NumPy sur des lignes
+    contiguës, et la mémoire de travail reste bornée par la taille de values.
+    """
+    degrees = graph.degrees()
+    order = np.argsort(-degrees, kind='stable')
+    descending = -degrees[order] # Croissant, pour searchsorted
+    starts = graph.indptr[order]
+    result = initial[order]
+    max_degree = int(-descending[0]) if len(descending) else 0
+    for j in range(max_degree):
+        k = int(np.searchsorted(descending, -(j + 1), side='right'))
+        ufunc(result[:k], values[graph.indices[starts[:k] + j]], out=result[:k])
+    unordered = np.empty_like(result)
+    unordered[order] = result
+    return unordered
+
+
+def bfs_distances(graph: CSRGraph, source: int, edge_mask: np.ndarray = None) -> np.ndarray:
+    """
+    BFS par niveaux depuis source. Renvoie les distances (-1 si inatteignable).
+    Avec edge_mask, les positions False de graph.indices sont ignorées
+    (liens supprimés, sans copier le graphe).
+    """
+    dist = np.full(graph.n_nodes, -1, dtype=np.int32)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        level += 1
+        slots = neighbor_slots(graph, frontier)
+        if edge_mask is not None:
+            slots = slots[edge_mask[slots]]
+        reached = graph.indices[slots]
+        reached = np.unique(reached[dist[reached] < 0])
+        dist[reached] = level
+        frontier = reached
+    return dist
+
+
+def connected_components(graph: CSRGraph, edge_mask: np.ndarray = None) -> tuple[int, np.ndarray]:
+    """ Nombre de composantes et étiquette de composante de chaque noeud. """
+    from scipy.sparse.csgraph import connected_components as cc
+    return cc(graph.to_scipy(edge_mask), directed=False)
+
+
+def largest_component(graph: CSRGraph, edge_mask: np.ndarray = None) -> np.ndarray:
+    """ IDs (triés) des noeuds de la composante connexe géante (LCC). """
+    if graph.n_nodes == 0:
+        return np.empty(0, dtype=np.int64)
+    _, labels = connected_components(graph, edge_mask)
+    return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
@@ -0,0 +1,87 @@
+import numpy as np
+from csr_graph import CSRGraph, GraphBuilder, iter_records
+
+# --- Lecture unique du JSONL : histogramme des degrés + liste de liens ---
+#
+# Le notebook chargeait tout le JSONL dans un DataFrame pour un .apply(len)
+# sur la colonne coauthors, puis relisait le fichier pour le graphe. Ici une
+# seule lecture, ligne par ligne : chaque enregistrement met à jour
+# l'histogramme (nombre de co-auteurs listés, comme 'nombre_co_authors') et
+# ajoute ses liens au GraphBuilder, puis est oublié. Rien d'autre que
+# l'histogramme et la liste de liens ne grossit avec le fichier.
+#
+# Les classes de l'histogramme sont logarithmiques (BINS_PER_DECADE par
+# décade) : adaptées à la longue traîne, et en nombre borné quel que soit le
+# degré maximal. Le degré 0 est compté à part (pas de log).
+
+BINS_PER_DECADE = 10
+
+
+class LogHistogram:
+    """ Histogramme d'entiers >= 0 à classes [10^(i/b), 10^((i+1)/b)), rempli valeur par valeur. """
+
+    def __init__(self, bins_per_decade: int = BINS_PER_DECADE):
+        self.bins_per_decade = bins_per_decade
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zeros = 0
+
+    def bin_of(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        # Petite marge : 10^(i/b) calculé en flottant doit tomber dans la classe i
+        return np.floor(np.log10(values) * self.bins_per_decade + 1e-9).astype(np.int64)
+
+    def add(self, value: int):
+        if value <= 0:
+            self.zeros += 1
+            return
+        i = int(self.bin_of(value))
+        if i >= len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(i + 1 - len(self.counts), dtype=np.int64)])
+        self.counts[i] += 1
+
+    def add_many(self, values: np.ndarray):
+        values = np.asarray(values)
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if not len(positive):
+            return
+        binned = np.bincount(self.bin_of(positive))
+        if len(binned) > len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(len(binned) - len(self.counts), dtype=np.int64)])
+        self.counts[:len(binned)] += binned
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum()) + self.zeros
+
+    def edges(self) -> np.ndarray:
+        """ Bornes des classes (len(counts) + 1 valeurs). """
+        return 10.0 ** (np.arange(len(self.counts) + 1) / self.bins_per_decade)
+
+    def density(self) -> np.ndarray:
+        """
+        Nombre moyen d'auteurs par valeur entière de chaque classe (NaN pour
+        les classes sans entier) : comparable d'une classe à l'autre malgré
+        leurs largeurs différentes.
+        """
+        edges = self.edges()
+        integers = np.ceil(edges[1:] - 1e-9) - np.ceil(edges[:-1] - 1e-9)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(integers > 0, self.counts / integers, np.nan)
+
+
+def scan_jsonl(input_file: str, bins_per_decade: int = BINS_PER_DECADE) -> tuple[LogHistogram, GraphBuilder]:
+    """ Une lecture du JSONL : histogramme des co-auteurs par enregistrement et liste de liens. """
+    histogram = LogHistogram(bins_per_decade)
+    builder = GraphBuilder()
+    for author, coauthors in iter_records(input_file):
+        histogram.add(len(coauthors))
+        builder.add(author, coauthors)
+    return histogram, builder
+
+
+def degree_histogram(graph: CSRGraph, bins_per_decade: int = BINS_PER_DECADE) -> LogHistogram:
+    """ Histogramme des degrés du graphe (liens dédoublonnés, tous les noeuds). """
+    histogram = LogHistogram(bins_per_decade)
+    histogram.add_many(graph.degrees())
+    return histogram
@@ -0,0 +1,87 @@
+import numpy as np
+
+# --- Rendu en image des placements de millions de points ---
+#
+# plt.scatter dessine un marqueur par point : au-delà de ~10^5 points c'est
+# lent et gourmand. Ici les coordonnées sont rangées directement dans une
+# grille NumPy de taille fixe (un pixel = une case), avec une agrégation par
+# pixel :
+#   'count' -> nombre de points,   'sum' / 'mean' / 'max' -> d'une valeur par point
+# La grille passe ensuite par le même seuil de saturation que le notebook
+# (tout ce qui dépasse ratio * maximum est ramené au seuil), puis par une
+# palette matplotlib. Seul le rangement est en O(N) (un bincount) ; le
+# seuil, la palette et l'écriture de l'image ne dépendent que du nombre de pixels.
+
+RESOLUTION = 1024
+BACKGROUND = (0.0, 0.0, 0.0, 1.0)
+
+
+def pixel_index(x: np.ndarray, y: np.ndarray, width: int, height: int,
+                extent: tuple[float, float, float, float] = None) -> np.ndarray:
+    """ Indice de pixel à plat (ligne 0 en haut) de chaque point, dans extent = (xmin, xmax, ymin, ymax). """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    xmin, xmax, ymin, ymax = extent or (x.min(), x.max(), y.min(), y.max())
+    col = ((x - xmin) / max(xmax - xmin, 1e-300) * width).astype(np.int64)
+    row = ((ymax - y) / max(ymax - ymin, 1e-300) * height).astype(np.int64)
+    np.clip(col, 0, width - 1, out=col)
+    np.clip(row, 0, height - 1, out=row)
+    return row * width + col
+
+
+def rasterize(x: np.ndarray, y: np.ndarray, values: np.ndarray = None, agg: str = 'count',
+              width: int = RESOLUTION, height: int = None,
+              extent: tuple[float, float, float, float] = None) -> np.ndarray:
+    """
+    Grille height x width agrégée par pixel. Pixels vides : 0 pour 'count' et
+    'sum', NaN pour 'mean' et 'max'.
+    """
+    height = height or width
+    pixels = pixel_index(x, y, width, height, extent)
+    size = width * height
+    if agg == 'count':
+        grid = np.bincount(pixels, minlength=size).astype(np.float64)
+    elif agg in ('sum', 'mean'):
+        grid = np.bincount(pixels, weights=values, minlength=size)
+        if agg == 'mean':
+            counts = np.bincount(pixels, minlength=size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                grid = np.where(counts > 0, grid / counts, np.nan)
+    elif agg == 'max':
+        grid = np.full(size, -np.inf)
+        np.maximum.at(grid, pixels, np.asarray(values, dtype=np.float64))
+        grid[np.isneginf(grid)] = np.nan
+    else:
+        raise ValueError(f"Agrégation inconnue : {agg!r} (count, sum, mean ou max)")
+    return grid.reshape(height, width)
+
+
+def saturate(grid: np.ndarray, ratio: float) -> np.ndarray:
+    """ Plafonne la grille à ratio * maximum (même seuil que RATIO_SEUIL du notebook). """
+    top = np.nanmax(grid) if np.isfinite(grid).any() else 0.0
+    return np.minimum(grid, top * ratio)
+
+
+def to_rgba(grid: np.ndarray, cmap: str = 'inferno') -> np.ndarray:
+    """ Image RGBA (height x width x 4) ; les pixels vides (NaN, ou <= 0) prennent la couleur de fond. """
+    import matplotlib
+    empty = np.isnan(grid) | (grid <= 0)
+    finite = grid[~empty]
+    lo, hi = (finite.min(), finite.max()) if finite.size else (0.0, 1.0)
+    scaled = (np.nan_to_num(grid, nan=lo) - lo) / (hi - lo if hi > lo else 1.0)
+    image = matplotlib.colormaps[cmap](scaled)
+    image[empty] = BACKGROUND
+    return image
+
+
+def render_density(x: np.ndarray, y: np.ndarray, values: np.ndarray = None, agg: str = 'count',
+                   ratio: float = None, cmap: str = 'inferno', width: int = RESOLUTION,
+                   height: int = None, output_file: str = None) -> np.ndarray:
+    """ rasterize -> saturate (si ratio) -> palette ; écrit l'image si output_file est donné. """
+    grid = rasterize(x, y, values, agg, width, height)
+    if ratio is not None:
+        grid = saturate(grid, ratio)
+    image = to_rgba(grid, cmap)
+    if output_file is not None:
+        import matplotlib.pyplot as plt
+        plt.imsave(output_file, image)
+    return image
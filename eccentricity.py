@@ -0,0 +1,86 @@
+import numpy as np
+from csr_graph import CSRGraph, bfs_distances, largest_component
+
+# --- Excentricité exacte de tous les noeuds de la LCC (Takes & Kosters) ---
+#
+# Après un BFS depuis v (excentricité e_v), pour tout noeud w à distance d(v, w) :
+#   max(e_v - d(v, w), d(v, w)) <= e_w <= e_v + d(v, w)
+# On garde une borne inférieure et une borne supérieure par noeud ; un noeud
+# dont les deux bornes se rejoignent est résolu sans BFS. Le prochain BFS part
+# d'un candidat choisi alternativement parmi les plus grandes bornes
+# supérieures et les plus petites bornes inférieures (à égalité : le plus haut
+# degré), ce qui resserre très vite les bornes sur les graphes "small world".
+#
+# Élagage : les feuilles accrochées au même voisin ont toutes la même
+# excentricité ; une seule est gardée comme représentante.
+
+
+def _prune_leaves(graph: CSRGraph) -> tuple[np.ndarray, np.ndarray]:
+    """ (représentant de chaque noeud, masque des noeuds retirés des candidats). """
+    n = graph.n_nodes
+    representative = np.arange(n)
+    degrees = graph.degrees()
+    leaves = np.flatnonzero(degrees == 1)
+    if n <= 2 or len(leaves) == 0:
+        return representative, np.zeros(n, dtype=bool)
+    parents = graph.indices[graph.indptr[leaves]]
+    # Première feuille rencontrée pour chaque voisin = représentante
+    _, first = np.unique(parents, return_index=True)
+    lookup = np.full(n, -1, dtype=np.int64)
+    lookup[parents[first]] = leaves[first]
+    representative[leaves] = lookup[parents]
+    return representative, representative != np.arange(n)
+
+
+def exact_eccentricities_connected(graph: CSRGraph) -> tuple[np.ndarray, int]:
+    """
+    Excentricités exactes d'un graphe connexe. Renvoie (excentricités, nombre de BFS).
+    """
+    n = graph.n_nodes
+    if n <= 1:
+        return np.zeros(n, dtype=np.int32), 0
+    degrees = graph.degrees()
+    representative, pruned = _prune_leaves(graph)
+
+    lower = np.zeros(n, dtype=np.int64)
+    upper = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    eccentricity = np.full(n, -1, dtype=np.int64)
+    candidate = ~pruned
+    n_bfs = 0
+    pick_upper = True
+
+    while candidate.any():
+        ids = np.flatnonzero(candidate)
+        if pick_upper:
+            key = np.lexsort((-degrees[ids], -upper[ids]))
+        else:
+            key = np.lexsort((-degrees[ids], lower[ids]))
+        v = ids[key[0]]
+        pick_upper = not pick_upper
+
+        dist = bfs_distances(graph, v).astype(np.int64)
+        n_bfs += 1
+        e_v = int(dist.max())
+        eccentricity[v] = e_v
+        candidate[v] = False
+
+        lower[ids] = np.maximum(lower[ids], np.maximum(e_v - dist[ids], dist[ids]))
+        upper[ids] = np.minimum(upper[ids], e_v + dist[ids])
+        solved = ids[candidate[ids] & (lower[ids] == upper[ids])]
+        eccentricity[solved] = lower[solved]
+        candidate[solved] = False
+
+    eccentricity[pruned] = eccentricity[representative[pruned]]
+    return eccentricity.astype(np.int32), n_bfs
+
+
+def exact_eccentricities(graph: CSRGraph) -> tuple[np.ndarray, int, np.ndarray]:
+    """
+    Excentricités exactes des noeuds de la composante géante.
+    Renvoie (excentricités sur tout le graphe, -1 hors LCC ; nombre de BFS ; IDs de la LCC).
+    """
+    lcc = largest_component(graph)
+    eccentricity = np.full(graph.n_nodes, -1, dtype=np.int32)
+    ecc_lcc, n_bfs = exact_eccentricities_connected(graph.subgraph(lcc))
+    eccentricity[lcc] = ecc_lcc
+    return eccentricity, n_bfs, lcc
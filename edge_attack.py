@@ -0,0 +1,112 @@
+import numpy as np
+from csr_graph import CSRGraph, bfs_distances, largest_component
+
+# --- Attaque par suppression de liens, sans copie du graphe ---
+#
+# Au lieu de G.copy() + remove_edges_from() à chaque scénario, le graphe CSR
+# reste intact et les suppressions sont un masque booléen sur les positions
+# de graph.indices (alive[k] = False : le lien indices[k] est coupé). Chaque
+# lien non-dirigé occupe deux positions (u -> v et v -> u) : EdgeMask les
+# coupe et les rétablit ensemble, le masque reste symétrique.
+#
+# Les liens sont désignés par leur rang dans graph.edge_array() (u < v).
+# bfs_distances, connected_components et largest_component de csr_graph
+# acceptent le masque (edge_mask=mask.alive).
+#
+# sweep_removals balaie plusieurs niveaux de suppression en une passe : un
+# seul ordre aléatoire des liens candidats est tiré, et le niveau p coupe
+# ses int(p * n) premiers liens. Les niveaux sont emboîtés (les liens coupés
+# à 5 % le sont aussi à 10 %) ; passer d'un niveau au suivant ne touche que
+# les liens en plus ou en moins.
+
+
+def edge_slots(graph: CSRGraph) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pour chaque lien (u, v) de graph.edge_array() : position de v dans la
+    ligne de u, et position de u dans la ligne de v.
+    """
+    rows = np.repeat(np.arange(graph.n_nodes, dtype=np.int64), graph.degrees())
+    cols = np.asarray(graph.indices)
+    forward = np.flatnonzero(rows < cols)
+    backward = np.flatnonzero(rows > cols)
+    # Les positions v -> u sont triées par (v, u) ; edge_array est trié par (u, v)
+    backward = backward[np.lexsort((rows[backward], cols[backward]))]
+    return forward, backward
+
+
+def classify_edges(graph: CSRGraph, node_domains: np.ndarray, unknown: str = "Inconnu") -> np.ndarray:
+    """ is_inter[k] : le lien k de graph.edge_array() relie deux domaines connus et différents. """
+    names, codes = np.unique(np.asarray(node_domains).astype(str), return_inverse=True)
+    position = np.searchsorted(names, unknown)
+    unknown_code = position if position < len(names) and names[position] == unknown else -1
+    src, dst = graph.edge_array()
+    dom_u, dom_v = codes[src], codes[dst]
+    return (dom_u != unknown_code) & (dom_v != unknown_code) & (dom_u != dom_v)
+
+
+class EdgeMask:
+    """ Masque des liens encore présents, sur les positions de graph.indices. """
+
+    def __init__(self, graph: CSRGraph, slots: tuple[np.ndarray, np.ndarray] = None):
+        self.graph = graph
+        # slots : résultat de edge_slots(graph), s'il est déjà calculé (ex. partagé entre processus)
+        self.forward, self.backward = slots if slots is not None else edge_slots(graph)
+        self.alive = np.ones(len(graph.indices), dtype=bool)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.forward)
+
+    def remove(self, edge_ids: np.ndarray):
+        self.alive[self.forward[edge_ids]] = False
+        self.alive[self.backward[edge_ids]] = False
+
+    def restore(self, edge_ids: np.ndarray):
+        self.alive[self.forward[edge_ids]] = True
+        self.alive[self.backward[edge_ids]] = True
+
+    def reset(self):
+        self.alive[:] = True
+
+
+def sweep_removals(mask: EdgeMask, candidates: np.ndarray, fractions: list[float],
+                   measure, seed: int = None) -> list:
+    """
+    Pour chaque fraction p (dans l'ordre donné), coupe int(p * len(candidates))
+    liens candidats puis appelle measure(mask.alive). Renvoie les mesures.
+    Le masque est remis à zéro au début et à la fin.
+    """
+    order = np.random.default_rng(seed).permutation(np.asarray(candidates, dtype=np.int64))
+    mask.reset()
+    results = []
+    removed = 0
+    for fraction in fractions:
+        target = int(len(order) * fraction)
+        if target > removed:
+            mask.remove(order[removed:target])
+        elif target < removed:
+            mask.restore(order[target:removed])
+        removed = target
+        results.append(measure(mask.alive))
+    mask.reset()
+    return results
+
+
+def sampled_path_length(graph: CSRGraph, n_samples: int, edge_mask: np.ndarray = None,
+                        rng: np.random.Generator = None, lcc: np.ndarray = None) -> float:
+    """
+    Distance moyenne (L) depuis n_samples sources tirées dans la composante
+    géante (lcc, recalculée si absente).
+    """
+    rng = rng or np.random.default_rng()
+    if lcc is None:
+        lcc = largest_component(graph, edge_mask)
+    sources = rng.choice(lcc, size=min(n_samples, len(lcc)), replace=False)
+    total_path_lengths = 0
+    count = 0
+    for source in sources:
+        dist = bfs_distances(graph, source, edge_mask)
+        reached = dist[dist > 0]
+        total_path_lengths += int(reached.sum())
+        count += len(reached)
+    return total_path_lengths / count if count > 0 else 0
@@ -1,144 +1,116 @@
-import cugraph
-import cudf
 import pandas as pd
-import json
 import time
 from tqdm import tqdm
-import random
 import numpy as np
+from graph_snapshot import load_graph
+from csr_graph import largest_component
+from msbfs import batched_eccentricities, BATCH_WIDTH
+from eccentricity import exact_eccentricities
+from feature_store import ensure_table, open_feature_store
 
 # --- CONFIGURATION ---
 JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
-CSV_FILE = "resultats_finaux_gpu_optimized.csv"      # Le fichier source (avec degrés)
-FINAL_FILE = "resultats_finaux_distrib_represent.csv" # Le fichier de sortie
+CSV_FILE = "resultats_finaux_gpu_optimized.csv"      # Le fichier source (avec degrés), importé dans la table
+FINAL_FILE = "resultats_finaux_distrib_represent.csv" # Export CSV (si EXPORT_CSV)
 SAMPLE_SIZE = 50000 # 1000 est suffisant pour une marge d'erreur ~3%
+N_WORKERS = None # Processus pour le BFS multi-sources (None = tous les coeurs)
+EXACT_ECCENTRICITY = False # True : excentricité exacte de toute la LCC au lieu d'un échantillon
+EXACT_FILE = "resultats_finaux_excentricite_exacte.csv"
+# La colonne 'Excentricité' est écrite dans la table en colonnes du graphe
+# (feature_store.py) et appartient à cette étape : aucun import de CSV ne la
+# complète ni ne la remplace ensuite (NaN hors des auteurs calculés).
+# True : exporte aussi toute la table en CSV comme avant.
+EXPORT_CSV = False
 
-def run_representative_sampling():
-    print(f"[{time.strftime('%H:%M:%S')}] Chargement des données...")
-    
-    # 1. Charger le CSV des métriques existantes
+def load_metrics(graph):
+    """ Table des auteurs du graphe et IDs des auteurs de CSV_FILE (importé si nouveau ou modifié). """
+    store = open_feature_store(JSON_FILE)
     try:
-        df_csv = pd.read_csv(CSV_FILE)
+        rows = ensure_table(store, graph, CSV_FILE)
     except FileNotFoundError:
         print("Erreur: Fichier CSV introuvable.")
-        return
+        return None, None
+    return store, rows
 
-    # CORRECTION DES DEGRÉS (si ce n'est pas déjà fait)
-    # On vérifie si c'est pair en moyenne pour deviner s'il faut diviser
-    if df_csv['Degré'].mean() > 10 and df_csv['Degré'].iloc[0] % 2 == 0:
-        print("Correction des degrés (Division par 2)...")
-        df_csv['Degré'] = df_csv['Degré'] / 2
-
-    # 2. Reconstruire le Graphe pour trouver la LCC
-    print(f"[{time.strftime('%H:%M:%S')}] Reconstruction du graphe (pour LCC)...")
-    edges = []
-    nodes_seen = set()
-    
-    # Lecture optimisée juste pour les arêtes
-    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                src = data.get("author")
-                coauthors = data.get("coauthors", [])
-                if src:
-                    nodes_seen.add(src)
-                    for dst in coauthors:
-                        if src != dst:
-                            edges.append([src, dst])
-                            nodes_seen.add(dst)
-            except: continue
-            
-    # Mapping
-    all_nodes = list(nodes_seen)
-    node_to_id = {name: i for i, name in enumerate(all_nodes)}
-    id_to_node = {i: name for i, name in enumerate(all_nodes)}
-    
-    pdf_edges = pd.DataFrame(edges, columns=['src', 'dst'])
-    pdf_edges['src_id'] = pdf_edges['src'].map(node_to_id)
-    pdf_edges['dst_id'] = pdf_edges['dst'].map(node_to_id)
-    pdf_edges = pdf_edges.dropna().astype({'src_id': 'int32', 'dst_id': 'int32'})
+def run_representative_sampling():
+    print(f"[{time.strftime('%H:%M:%S')}] Chargement des données...")
     
-    # GPU Load
-    gdf_edges = cudf.DataFrame.from_pandas(pdf_edges[['src_id', 'dst_id']])
-    G = cugraph.Graph(directed=False)
-    G.from_cudf_edgelist(gdf_edges, source='src_id', destination='dst_id', renumber=False)
+    # 1. Charger le graphe (snapshot) et la table des métriques existantes
+    graph = load_graph(JSON_FILE)
+    store, rows = load_metrics(graph)
+    if store is None:
+        return
 
-    # 3. IDENTIFICATION DE LA POPULATION CIBLE (LCC)
+    # 2. IDENTIFICATION DE LA POPULATION CIBLE (LCC)
     print(f"[{time.strftime('%H:%M:%S')}] Isolation de la Composante Connexe Géante (LCC)...")
-    components = cugraph.connected_components(G)
-    largest_label = components['labels'].value_counts().index[0]
-    
-    # Récupérer les IDs GPU des nœuds de la LCC
-    lcc_gpu_nodes = components[components['labels'] == largest_label]['vertex']
-    
-    # Convertir en liste Python d'IDs
-    valid_ids = set(lcc_gpu_nodes.to_pandas().tolist())
-    
-    # Retrouver les noms d'auteurs correspondant à ces IDs
-    # C'est important : on ne peut échantillonner que parmi les gens DANS la LCC
-    valid_authors = [id_to_node[i] for i in valid_ids if i in id_to_node]
+    valid_ids = largest_component(graph)
     
-    print(f"Population LCC : {len(valid_authors)} auteurs ({len(valid_authors)/len(all_nodes):.1%} du graphe total).")
+    print(f"Population LCC : {len(valid_ids)} auteurs ({len(valid_ids)/graph.n_nodes:.1%} du graphe total).")
 
-    # 4. ÉCHANTILLONNAGE REPRÉSENTATIF
-    # On filtre notre DataFrame CSV pour ne garder que ceux qui sont dans la LCC
-    df_population = df_csv[df_csv['Auteur'].isin(valid_authors)]
+    # 3. ÉCHANTILLONNAGE REPRÉSENTATIF
+    # On ne peut échantillonner que parmi les auteurs de la table qui sont DANS la LCC
+    population = np.intersect1d(rows, valid_ids)
     
     print(f"[{time.strftime('%H:%M:%S')}] Tirage aléatoire de {SAMPLE_SIZE} auteurs...")
     # L'échantillonnage aléatoire simple préserve la distribution des degrés
-    df_sample = df_population.sample(n=min(SAMPLE_SIZE, len(df_population)), random_state=42)
+    rng = np.random.default_rng(42)
+    target_ids = rng.choice(population, size=min(SAMPLE_SIZE, len(population)), replace=False)
     
     # Vérification de la distribution (Bonus)
-    mean_pop = df_population['Degré'].mean()
-    mean_samp = df_sample['Degré'].mean()
+    degrees = store.read('Degré')
+    mean_pop = np.nanmean(degrees[population])
+    mean_samp = np.nanmean(degrees[target_ids])
     print(f"   -> Degré moyen Population : {mean_pop:.2f}")
     print(f"   -> Degré moyen Échantillon: {mean_samp:.2f}")
     print("   (Si les chiffres sont proches, l'échantillon est représentatif)")
 
-    # Préparer les IDs pour le calcul
-    target_ids = [node_to_id[name] for name in df_sample['Auteur'].tolist()]
-
-    # 5. CALCUL GPU (BFS)
-    # Préparer le sous-graphe LCC sur GPU
-    gdf_lcc = gdf_edges[gdf_edges.src_id.isin(lcc_gpu_nodes) & gdf_edges.dst_id.isin(lcc_gpu_nodes)]
-    G_lcc = cugraph.Graph(directed=False)
-    G_lcc.from_cudf_edgelist(gdf_lcc, source='src_id', destination='dst_id', renumber=False)
-    
+    # 4. CALCUL CPU (BFS multi-sources bit-parallèle)
+    # Les sources avancent par lots de BATCH_WIDTH, les lots sont répartis sur les coeurs.
+    # Un BFS depuis un noeud de la LCC reste dans la LCC : pas besoin de sous-graphe.
     print(f"[{time.strftime('%H:%M:%S')}] Calcul de l'excentricité (BFS) pour l'échantillon...")
-    results = []
-    
-    for node_id in tqdm(target_ids):
-        try:
-            # BFS pour distance max
-            df_paths = cugraph.bfs(G_lcc, start=node_id)
-            max_dist = df_paths['distance'].max()
-            
-            if max_dist < 1e9 and max_dist > 0:
-                results.append({'vertex': node_id, 'Excentricité_Rep': max_dist})
-        except: pass
+    with tqdm(total=len(target_ids)) as pbar:
+        eccentricities, _ = batched_eccentricities(graph, target_ids, BATCH_WIDTH, N_WORKERS, pbar)
 
-    # 6. SAUVEGARDE
-    if results:
-        d_ecc = pd.DataFrame(results)
-        d_ecc['Auteur'] = d_ecc['vertex'].map(id_to_node)
-        
-        # On repart du fichier CSV complet original
-        # On nettoie l'ancienne colonne excentricité si elle existe
-        if 'Excentricité' in df_csv.columns:
-            del df_csv['Excentricité']
-            
-        # On fusionne les nouvelles données
-        df_final = df_csv.merge(d_ecc[['Auteur', 'Excentricité_Rep']], on='Auteur', how='left')
-        df_final.rename(columns={'Excentricité_Rep': 'Excentricité'}, inplace=True)
-        
-        df_final.to_csv(FINAL_FILE, index=False)
-        print(f"\n✅ TERMINÉ. Fichier représentatif généré : {FINAL_FILE}")
-        
-        # Stats finales
-        print(df_final['Excentricité'].describe())
-    else:
+    # 5. SAUVEGARDE
+    save_eccentricities(store, graph, rows, target_ids, eccentricities, FINAL_FILE)
+
+def save_eccentricities(store, graph, rows, ids, eccentricities, output_file):
+    """ Remplace la colonne Excentricité de la table (NaN hors des auteurs calculés). """
+    ids, eccentricities = np.asarray(ids), np.asarray(eccentricities)
+    computed = eccentricities > 0
+    if not computed.any():
         print("Erreur : Aucun calcul n'a réussi.")
+        return
+    column = np.full(store.n_nodes, np.nan)
+    column[ids[computed]] = eccentricities[computed]
+    store.write('Excentricité', column)
+    print(f"\n✅ TERMINÉ. Colonne 'Excentricité' écrite dans : {store.path}")
+    if EXPORT_CSV:
+        store.to_csv(output_file, graph.names, rows)
+        print(f"Fichier généré : {output_file}")
+    
+    # Stats finales
+    print(pd.Series(column[rows]).describe())
+
+def run_exact_eccentricity():
+    """
+    Mode exact : excentricité de TOUS les auteurs de la LCC, avec élagage par
+    bornes (Takes & Kosters) au lieu d'un BFS par auteur.
+    """
+    print(f"[{time.strftime('%H:%M:%S')}] Chargement des données...")
+    graph = load_graph(JSON_FILE)
+    store, rows = load_metrics(graph)
+    if store is None:
+        return
+
+    print(f"[{time.strftime('%H:%M:%S')}] Excentricité exacte de la LCC (élagage par bornes)...")
+    eccentricities, n_bfs, lcc = exact_eccentricities(graph)
+    print(f"   -> {n_bfs} BFS nécessaires pour {len(lcc)} auteurs ({n_bfs/max(len(lcc), 1):.2%} d'un calcul brut)")
+
+    save_eccentricities(store, graph, rows, lcc, eccentricities[lcc], EXACT_FILE)
 
 if __name__ == "__main__":
-    run_representative_sampling()
\ No newline at end of file
+    if EXACT_ECCENTRICITY:
+        run_exact_eccentricity()
+    else:
+        run_representative_sampling()
\ No newline at end of file
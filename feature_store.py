@@ -0,0 +1,460 @@
+import os
+import re
+import json
+import shutil
+import numpy as np
+from graph_snapshot import load_names, read_snapshot_meta, snapshot_dir
+
+# --- Table des auteurs en colonnes (un .npy par colonne) ---
+#
+# Les scripts d'analyse se passaient la table des auteurs en CSV, relu et
+# réécrit en entier à chaque étape (noms reparsés, flottants re-sérialisés).
+# Ici chaque colonne est un fichier .npy à côté du snapshot du graphe,
+# dans '<fichier>.features/' : la ligne i est l'auteur d'ID i du snapshot
+# (graph.names[i]), les noms ne sont donc jamais stockés ni relus. Une étape
+# écrit ou remplace seulement ses colonnes ; une lecture ouvre seulement les
+# colonnes demandées, en mémoire mappée.
+#
+#   <colonne>.npy   -> valeurs numériques (NaN si absent), ou codes int32
+#                      d'une colonne de libellés (-1 si absent)
+#   rows_<csv>.npy  -> IDs des auteurs de chaque CSV importé
+#   meta.json       -> colonnes (fichier, libellés, origine), imports, SHA-256 du JSONL source
+#   names.bin, name_offsets.npy -> copie de la table des noms du snapshot
+#
+# Les IDs dépendent du JSONL (ordre de première apparition). Quand le
+# snapshot change, la copie des noms permet de garder les colonnes : si les
+# anciens noms sont le début des nouveaux (le crawler a ajouté des lignes),
+# les colonnes sont seulement prolongées de valeurs absentes ; sinon elles
+# sont réindexées nom par nom. Sans copie des noms (table d'avant ce
+# mécanisme), les colonnes sont mises de côté dans 'stale-<sha>/', jamais
+# effacées.
+#
+# MEMBER_COLUMN marque les auteurs de la table (union des CSV importés) ;
+# les autres noeuds du graphe ont des valeurs absentes. ensure_table renvoie
+# les auteurs du CSV demandé, pas cette union.
+#
+# Chaque colonne a une origine : le CSV qui l'a créée, ou None si une étape
+# l'a écrite (Excentricité, Domaine_Dominant...). ensure_table importe un CSV
+# la première fois qu'il est vu, puis s'il a changé (taille, date) ou apporte
+# une colonne absente de la table :
+#   - colonne absente -> créée depuis le CSV ;
+#   - colonne venant de ce CSV -> ses lignes sont remplacées (CSV modifié) ;
+#   - colonne venant d'un autre CSV -> complétée là où elle n'a pas de valeur ;
+#   - colonne écrite par une étape -> jamais touchée : une valeur calculée
+#     n'est pas mélangée à celles d'un ancien CSV, les désaccords sont signalés.
+# La correction des degrés doublés par le script GPU est faite ici, à
+# l'import, d'après le CSV lui-même (voir correct_degrees).
+
+FEATURES_SUFFIX = ".features"
+MEMBER_COLUMN = "Dans_Table"
+DEGREE_COLUMN = "Degré"
+
+
+def features_dir(jsonl_file: str) -> str:
+    return jsonl_file + FEATURES_SUFFIX
+
+
+def _file_name(column: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', column) + ".npy"
+
+
+def _remap(array: np.ndarray, n_nodes: int, mapping: np.ndarray = None, labels: bool = False) -> np.ndarray:
+    """
+    Colonne réindexée sur n_nodes lignes : mapping[ancien ID] = nouvel ID (-1
+    si l'auteur a disparu), ou None si les anciens IDs sont gardés tels quels.
+    Les nouvelles lignes sont absentes : -1 (libellés), False, ou NaN (les
+    colonnes entières passent en flottant pour pouvoir le représenter).
+    """
+    if labels:
+        fill = -1
+    elif array.dtype == bool:
+        fill = False
+    else:
+        fill = np.nan
+        if not np.issubdtype(array.dtype, np.floating):
+            array = array.astype(np.float64)
+    out = np.full(n_nodes, fill, dtype=array.dtype)
+    if mapping is None:
+        out[:len(array)] = array
+    else:
+        kept = mapping >= 0
+        out[mapping[kept]] = array[kept]
+    return out
+
+
+class FeatureStore:
+    """ Colonnes indexées par ID d'auteur (0..n_nodes-1), un fichier .npy par colonne. """
+
+    def __init__(self, path: str, n_nodes: int, source_sha256: str = None, names_dir: str = None):
+        """ names_dir : dossier du snapshot (names.bin), pour suivre les IDs quand le graphe change. """
+        self.path = path
+        self.n_nodes = n_nodes
+        os.makedirs(path, exist_ok=True)
+        meta = self._read_meta()
+        changed = meta is not None and (meta['n_nodes'] != n_nodes or meta['source_sha256'] != source_sha256)
+        if meta is None:
+            meta = {'n_nodes': n_nodes, 'source_sha256': source_sha256, 'columns': {}}
+        elif changed:
+            meta = self._follow_graph(meta, source_sha256, names_dir)
+        self._meta = meta
+        self._save_meta()
+        if names_dir is not None and (changed or not os.path.exists(os.path.join(path, "name_offsets.npy"))):
+            self._copy_names(names_dir)
+
+    # --- Changement de graphe ---
+
+    def _copy_names(self, names_dir: str):
+        for file_name in ("names.bin", "name_offsets.npy"):
+            tmp = os.path.join(self.path, file_name + ".tmp")
+            shutil.copyfile(os.path.join(names_dir, file_name), tmp)
+            os.replace(tmp, os.path.join(self.path, file_name))
+
+    def _follow_graph(self, meta: dict, source_sha256: str, names_dir: str) -> dict:
+        """ Reporte les colonnes de l'ancien graphe sur le nouveau (IDs des mêmes noms). """
+        new_meta = {**meta, 'n_nodes': self.n_nodes, 'source_sha256': source_sha256}
+        if not meta['columns']:
+            return new_meta
+        if names_dir is None or not os.path.exists(os.path.join(self.path, "name_offsets.npy")):
+            return self._set_aside(meta, new_meta)
+
+        old_names, new_names = load_names(self.path), load_names(names_dir)
+        if new_names.starts_with(old_names):
+            mapping = None
+            print(f"--- Graphe agrandi ({len(old_names)} -> {len(new_names)} auteurs) : "
+                  f"{len(meta['columns'])} colonnes prolongées ---")
+        else:
+            name_to_id = {name: i for i, name in enumerate(new_names)}
+            mapping = np.fromiter((name_to_id.get(name, -1) for name in old_names),
+                                  dtype=np.int64, count=len(old_names))
+            print(f"--- Graphe renuméroté : {len(meta['columns'])} colonnes réindexées par nom, "
+                  f"{int((mapping < 0).sum())} auteurs disparus du graphe ---")
+        for info in meta['columns'].values():
+            old = np.load(os.path.join(self.path, info['file']))
+            self._save_array(info['file'], _remap(old, self.n_nodes, mapping, labels=info['categories'] is not None))
+        if mapping is not None:
+            for info in meta.get('imports', {}).values():
+                if 'rows_file' in info:
+                    ids = mapping[np.load(os.path.join(self.path, info['rows_file']))]
+                    self._save_array(info['rows_file'], ids[ids >= 0])
+        return new_meta
+
+    def _set_aside(self, meta: dict, new_meta: dict) -> dict:
+        """ Sans les anciens noms, les colonnes sont déplacées dans 'stale-<sha>/' (pas effacées). """
+        backup = os.path.join(self.path, f"stale-{(meta['source_sha256'] or 'inconnu')[:12]}")
+        os.makedirs(backup, exist_ok=True)
+        rows_files = [info['rows_file'] for info in meta.get('imports', {}).values() if 'rows_file' in info]
+        for file_name in [info['file'] for info in meta['columns'].values()] + rows_files + ["meta.json"]:
+            if os.path.exists(os.path.join(self.path, file_name)):
+                os.replace(os.path.join(self.path, file_name), os.path.join(backup, file_name))
+        print(f"--- Table '{self.path}' faite pour un autre graphe, sans ses noms : "
+              f"{len(meta['columns'])} colonnes mises de côté dans '{backup}' ---")
+        return {**new_meta, 'columns': {}, 'imports': {}}
+
+    # --- Métadonnées ---
+
+    def _read_meta(self) -> dict | None:
+        try:
+            with open(os.path.join(self.path, "meta.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _save_array(self, file_name: str, array: np.ndarray):
+        tmp = os.path.join(self.path, file_name + ".tmp")
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp, os.path.join(self.path, file_name))
+
+    def _remove(self, file_name: str):
+        try:
+            os.remove(os.path.join(self.path, file_name))
+        except FileNotFoundError:
+            pass
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._meta['columns'])
+
+    @property
+    def table_columns(self) -> list[str]:
+        """ Colonnes de données (sans MEMBER_COLUMN), dans l'ordre de création. """
+        return [column for column in self._meta['columns'] if column != MEMBER_COLUMN]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._meta['columns']
+
+    def imported(self, csv_file: str) -> dict | None:
+        """ Ce qui a été noté à l'import de csv_file (par nom de fichier), None s'il n'a jamais été importé. """
+        return self._meta.get('imports', {}).get(os.path.basename(csv_file))
+
+    def record_import(self, csv_file: str, info: dict, ids: np.ndarray):
+        """ Note l'import de csv_file et garde les IDs de ses auteurs (imported_rows). """
+        key = os.path.basename(csv_file)
+        rows_file = _file_name("rows_" + key)
+        self._save_array(rows_file, np.sort(np.asarray(ids, dtype=np.int64)))
+        self._meta.setdefault('imports', {})[key] = {**info, 'rows_file': rows_file}
+        self._save_meta()
+
+    def imported_rows(self, csv_file: str) -> np.ndarray | None:
+        """ IDs (triés) des auteurs de csv_file à son dernier import, None s'il n'a pas été importé. """
+        info = self.imported(csv_file)
+        if info is None or 'rows_file' not in info:
+            return None
+        return np.load(os.path.join(self.path, info['rows_file']))
+
+    def source(self, column: str) -> str | None:
+        """ CSV d'origine de la colonne, None si elle a été écrite par une étape du pipeline. """
+        return self._meta['columns'][column].get('source')
+
+    def categories(self, column: str) -> list[str] | None:
+        """ Libellés d'une colonne de libellés (code i -> categories[i]), None pour une colonne numérique. """
+        return self._meta['columns'][column]['categories']
+
+    # --- Lecture ---
+
+    def read(self, column: str) -> np.ndarray:
+        """ Colonne brute (valeurs ou codes) en mémoire mappée, lecture seule. """
+        if column not in self:
+            raise KeyError(f"Colonne absente de la table : {column!r}")
+        return np.load(os.path.join(self.path, self._meta['columns'][column]['file']), mmap_mode='r')
+
+    def read_labels(self, column: str, ids: np.ndarray = None, missing=None) -> np.ndarray:
+        """ Libellés décodés (tableau d'objets) des lignes ids ; `missing` pour les lignes sans valeur. """
+        codes = self.read(column)
+        codes = np.asarray(codes if ids is None else codes[ids])
+        table = np.array(self.categories(column) + [missing], dtype=object)
+        return table[codes] # Le code -1 tombe sur `missing`
+
+    def rows(self) -> np.ndarray:
+        """ IDs des auteurs de la table (MEMBER_COLUMN), triés. """
+        return np.flatnonzero(self.read(MEMBER_COLUMN))
+
+    def frame(self, columns: list[str], ids: np.ndarray = None, names=None):
+        """
+        DataFrame des colonnes demandées pour les lignes ids (toutes par
+        défaut), avec une colonne 'Auteur' si la table des noms est fournie.
+        """
+        import pandas as pd
+        ids = np.arange(self.n_nodes) if ids is None else np.asarray(ids)
+        data = {}
+        if names is not None:
+            data['Auteur'] = [names[i] for i in ids.tolist()]
+        for column in columns:
+            if self.categories(column) is None:
+                data[column] = np.asarray(self.read(column)[ids])
+            else:
+                data[column] = self.read_labels(column, ids)
+        return pd.DataFrame(data, index=ids)
+
+    def to_csv(self, output_file: str, names, ids: np.ndarray = None, columns: list[str] = None):
+        """ Export CSV (colonne 'Auteur' puis les colonnes) des lignes ids, par défaut les auteurs de la table. """
+        ids = self.rows() if ids is None else ids
+        self.frame(columns or self.table_columns, ids, names).to_csv(output_file, index=False)
+
+    # --- Écriture (une colonne à la fois, fichier remplacé d'un coup) ---
+
+    def _store(self, column: str, array: np.ndarray, categories: list[str] = None, source: str = None):
+        file_name = self._meta['columns'].get(column, {}).get('file') or _file_name(column)
+        self._save_array(file_name, array)
+        self._meta['columns'][column] = {'file': file_name, 'categories': categories, 'source': source}
+        self._save_meta()
+
+    def write(self, column: str, values: np.ndarray, ids: np.ndarray = None, fill=np.nan, source: str = None):
+        """
+        Écrit une colonne numérique. Avec ids, seules ces lignes changent : les
+        autres gardent leur valeur (ou `fill` si la colonne est nouvelle).
+        source : CSV d'origine (import_csv) ; None pour une étape du pipeline.
+        """
+        values = np.asarray(values)
+        if ids is None:
+            if len(values) != self.n_nodes:
+                raise ValueError(f"{len(values)} valeurs pour {self.n_nodes} auteurs")
+            self._store(column, values, source=source)
+            return
+        if column in self and self.categories(column) is None:
+            array = np.array(self.read(column), dtype=np.result_type(self.read(column).dtype, values.dtype))
+        else:
+            array = np.full(self.n_nodes, fill, dtype=np.result_type(values.dtype, np.asarray(fill).dtype))
+        array[np.asarray(ids)] = values
+        self._store(column, array, source=source)
+
+    def write_labels(self, column: str, labels, ids: np.ndarray = None, source: str = None):
+        """
+        Écrit une colonne de libellés (chaînes) sous forme de codes. None/NaN
+        = absent. Avec ids, seules ces lignes changent. source : comme write.
+        """
+        categories = list(self.categories(column) or []) if column in self else []
+        index = {label: i for i, label in enumerate(categories)}
+        codes = np.empty(len(labels), dtype=np.int32)
+        for k, label in enumerate(labels):
+            if label is None or (isinstance(label, float) and np.isnan(label)):
+                codes[k] = -1
+                continue
+            code = index.get(label)
+            if code is None:
+                code = index[label] = len(categories)
+                categories.append(label)
+            codes[k] = code
+        if ids is None:
+            array = codes
+        else:
+            array = np.array(self.read(column)) if column in self else np.full(self.n_nodes, -1, dtype=np.int32)
+            array[np.asarray(ids)] = codes
+        self._store(column, array, categories, source)
+
+    def drop(self, column: str):
+        info = self._meta['columns'].pop(column, None)
+        if info is not None:
+            self._remove(info['file'])
+            self._save_meta()
+
+
+def open_feature_store(jsonl_file: str) -> FeatureStore:
+    """ Table du graphe de jsonl_file (le snapshot doit exister : appeler load_graph avant). """
+    meta = read_snapshot_meta(snapshot_dir(jsonl_file))
+    if meta is None:
+        raise FileNotFoundError(f"Pas de snapshot pour '{jsonl_file}' : charger le graphe avec load_graph d'abord")
+    return FeatureStore(features_dir(jsonl_file), meta['n_nodes'], meta['source_sha256'],
+                        names_dir=snapshot_dir(jsonl_file))
+
+
+def correct_degrees(df, graph, ids: np.ndarray) -> bool:
+    """
+    Le script GPU compte chaque lien deux fois, et ses CSV dérivés gardent ces
+    degrés. On compare la colonne DEGREE_COLUMN aux degrés du graphe : si le
+    rapport médian est proche de 2, elle est divisée par 2 (en place). Seule
+    correction des degrés du pipeline. Renvoie True si elle a été appliquée.
+    """
+    import pandas as pd
+    if DEGREE_COLUMN not in df.columns:
+        return False
+    csv_degrees = pd.to_numeric(df[DEGREE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+    graph_degrees = graph.degrees()[ids]
+    usable = (graph_degrees > 0) & np.isfinite(csv_degrees)
+    if not usable.any():
+        return False
+    ratio = float(np.median(csv_degrees[usable] / graph_degrees[usable]))
+    if abs(ratio - 2) > 0.5:
+        return False
+    print(f"Degrés doublés (rapport médian {ratio:.2f} avec le graphe) : division par 2.")
+    df[DEGREE_COLUMN] = csv_degrees / 2
+    return True
+
+
+def _missing(store: FeatureStore, column: str, ids: np.ndarray) -> np.ndarray:
+    """ Lignes ids sans valeur dans la colonne (code -1, NaN ; jamais pour une colonne entière). """
+    values = np.asarray(store.read(column)[ids])
+    if store.categories(column) is not None:
+        return values < 0
+    if np.issubdtype(values.dtype, np.floating):
+        return np.isnan(values)
+    return np.zeros(len(ids), dtype=bool)
+
+
+def _disagreements(store: FeatureStore, column: str, ids: np.ndarray, values) -> int:
+    """ Lignes où le CSV a une valeur différente de celle de la table (ou la table n'en a pas). """
+    import pandas as pd
+    present = values.notna().to_numpy()
+    if store.categories(column) is not None:
+        current = store.read_labels(column, ids)
+        return int((present & (current != values.to_numpy(dtype=object))).sum())
+    current = np.asarray(store.read(column)[ids], dtype=np.float64)
+    incoming = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+    same = np.isclose(current, incoming, equal_nan=True)
+    return int((present & ~same).sum())
+
+
+def import_csv(store: FeatureStore, graph, csv_file: str) -> np.ndarray:
+    """
+    Importe une table CSV (colonne 'Auteur') selon les règles d'origine des
+    colonnes (voir l'en-tête) : colonnes absentes créées, colonnes de ce CSV
+    remplacées sur ses lignes, colonnes d'un autre CSV complétées, colonnes
+    écrites par une étape laissées intactes (désaccords signalés). Les
+    lignes ignorées (auteur vide, absent du graphe, en double) sont
+    comptées. Renvoie les IDs (triés) des auteurs du CSV.
+    """
+    import pandas as pd
+    stat = os.stat(csv_file)
+    key = os.path.basename(csv_file)
+    df = pd.read_csv(csv_file)
+    n_rows = len(df)
+    empty = df['Auteur'].isna().to_numpy()
+    ids = df['Auteur'].map(graph.name_to_id)
+    known = ids.notna().to_numpy()
+    df, ids = df[known], ids[known].to_numpy(dtype=np.int64)
+    first = ~pd.Series(ids).duplicated().to_numpy()
+    df, ids = df[first].copy(), ids[first]
+    halved = correct_degrees(df, graph, ids)
+
+    member = np.array(store.read(MEMBER_COLUMN)) if MEMBER_COLUMN in store else np.zeros(store.n_nodes, dtype=bool)
+    member[ids] = True
+    store.write(MEMBER_COLUMN, member, source=key)
+    created, replaced, completed, kept = [], [], [], {}
+    for column in df.columns.drop('Auteur'):
+        values, target = df[column], ids
+        if column not in store:
+            labels = not pd.api.types.is_numeric_dtype(values)
+            created.append(column)
+        elif store.source(column) is None:
+            disagreements = _disagreements(store, column, ids, values)
+            if disagreements:
+                kept[column] = disagreements
+            continue
+        elif store.source(column) == key:
+            labels = store.categories(column) is not None
+            replaced.append(column)
+        else:
+            missing = _missing(store, column, ids)
+            if not missing.any():
+                continue
+            values, target = values[missing], ids[missing]
+            labels = store.categories(column) is not None
+            completed.append(column)
+        owner = store.source(column) if column in store else key
+        if labels:
+            store.write_labels(column, values.tolist(), target, source=owner)
+        else:
+            store.write(column, pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64), target,
+                        source=owner)
+    store.record_import(csv_file, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                   'rows': len(ids), 'degree_halved': halved}, ids)
+
+    print(f"'{csv_file}' : {len(ids)} auteurs importés sur {n_rows} lignes, {len(created)} colonnes créées, "
+          f"{len(replaced)} remplacées, {len(completed)} complétées.")
+    for column, n in kept.items():
+        print(f"Attention : '{column}' est calculée par le pipeline, les valeurs de '{csv_file}' sont "
+              f"ignorées ({n} lignes en désaccord).")
+    dropped = {'auteur vide': int(empty.sum()), 'absent du graphe': int((~known & ~empty).sum()),
+               'en double': int((~first).sum())}
+    if any(dropped.values()):
+        print("Lignes ignorées : " + ", ".join(f"{n} {reason}" for reason, n in dropped.items() if n) + ".")
+    return np.sort(ids)
+
+
+def ensure_table(store: FeatureStore, graph, csv_file: str) -> np.ndarray:
+    """
+    IDs (triés) des auteurs de csv_file. Le CSV est importé s'il ne l'a
+    jamais été, s'il a changé depuis, ou s'il a des colonnes que la table
+    n'a pas. S'il est introuvable, les auteurs notés à son dernier import
+    servent (FileNotFoundError s'il n'a jamais été importé).
+    """
+    import pandas as pd
+    rows = store.imported_rows(csv_file)
+    if not os.path.exists(csv_file):
+        if rows is None:
+            raise FileNotFoundError(f"CSV introuvable et jamais importé : '{csv_file}'")
+        print(f"'{csv_file}' introuvable : auteurs de son dernier import utilisés.")
+        return rows
+    stat = os.stat(csv_file)
+    info = store.imported(csv_file)
+    unchanged = rows is not None and (info['size'], info['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+    new_columns = [c for c in pd.read_csv(csv_file, nrows=0).columns if c != 'Auteur' and c not in store]
+    if not unchanged or new_columns:
+        return import_csv(store, graph, csv_file)
+    return rows
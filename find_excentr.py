@@ -1,30 +1,37 @@
-import pandas as pd
+import numpy as np
+from graph_snapshot import load_graph
+from feature_store import ensure_table, open_feature_store
 
-# 1. Charger le fichier
-FILE_NAME = "auteurs_avec_excentricite_et_domaine.csv"
-print("Chargement du fichier...")
-df = pd.read_csv(FILE_NAME)
+# 1. Charger la table des auteurs (colonnes du graphe, feature_store.py)
+JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
+FILE_NAME = "auteurs_avec_excentricite_et_domaine.csv" # Importé dans la table (colonnes manquantes)
+OUTPUT_FILE = "auteurs_avec_excentricite_filtree_et_domaine.csv"
+print("Chargement de la table...")
+graph = load_graph(JSON_FILE)
+store = open_feature_store(JSON_FILE)
 
-# 2. Correction des degrés (diviser par 2 car doublés par le script GPU)
-df['Degré'] = df['Degré'] / 2
+# 2. Import du CSV (colonnes manquantes seulement). Les degrés doublés par le
+# script GPU sont corrigés à l'import, par feature_store.correct_degrees.
+rows = ensure_table(store, graph, FILE_NAME)
 
 # 3. FILTRER : On garde seulement ceux qui ont une Excentricité > 0
 # (Les non-calculés sont soit NaN (vide), soit 0.0)
-df_ecc = df[ (df['Excentricité'].notna()) & (df['Excentricité'] > 0) ]
+excentricity = np.asarray(store.read('Excentricité')[rows])
+computed = ~np.isnan(excentricity) & (excentricity > 0)
 
 # 4. TRIER :
 # - Les plus petits chiffres = Les auteurs les plus CENTRAUX (proches de tout le monde)
 # - Les plus grands chiffres = Les auteurs PÉRIPHÉRIQUES
-df_ecc = df_ecc.sort_values(by='Excentricité', ascending=True)
+ids = rows[computed][np.argsort(excentricity[computed], kind='stable')]
 
 # 5. Afficher et Sauvegarder
-print(f"Nombre d'auteurs avec excentricité calculée : {len(df_ecc)}")
+print(f"Nombre d'auteurs avec excentricité calculée : {len(ids)}")
 print("\n--- Top 10 des auteurs les plus centraux (Excentricité faible) ---")
-print(df_ecc[['Auteur', 'Excentricité', 'Degré']].head(10))
+print(store.frame(['Excentricité', 'Degré'], ids[:10], graph.names))
 
 print("\n--- Top 10 des auteurs les plus périphériques (Excentricité élevée) ---")
-print(df_ecc[['Auteur', 'Excentricité', 'Degré']].tail(10))
+print(store.frame(['Excentricité', 'Degré'], ids[-10:], graph.names))
 
-# Sauvegarder ce sous-ensemble dans un nouveau fichier pour analyse
-df_ecc.to_csv("auteurs_avec_excentricite_filtree_et_domaine.csv", index=False)
-print("\nFichier filtré sauvegardé sous : 'auteurs_avec_excentricite.csv'")
\ No newline at end of file
+# Sauvegarder ce sous-ensemble dans un nouveau fichier pour analyse (lu par test.py)
+store.to_csv(OUTPUT_FILE, graph.names, ids)
+print(f"\nFichier filtré sauvegardé sous : '{OUTPUT_FILE}'")
@@ -0,0 +1,283 @@
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from csr_graph import CSRGraph
+
+# --- Placement par forces (Simulation Spatiale de smallworld) ---
+#
+# Même loi que la double boucle du notebook : à chaque itération, chaque
+# noeud A se déplace de
+#   sum_B  signe(A, B) * b * (pos_B - pos_A) / max(||pos_B - pos_A||², 1e-5)
+# avec signe = +1 si A et B sont co-auteurs, -1 sinon, toutes les positions
+# étant mises à jour en même temps à partir de celles du tour précédent.
+#
+# On l'écrit : répulsion -b de TOUS les autres noeuds, plus +2b exact sur
+# chaque lien (qui annule la répulsion et applique l'attraction).
+#   - La répulsion est approchée par Barnes-Hut : quadtree construit en
+#     triant les noeuds selon leur code de Morton (chaque cellule est alors
+#     une tranche contiguë), puis descente niveau par niveau, vectorisée
+#     sur des paires (noeud, cellule). Une cellule de côté s vue à une
+#     distance d de son centre de masse avec s/d < theta compte comme un seul
+#     point de masse = nombre de noeuds ; sinon on l'ouvre. Les feuilles
+#     (<= LEAF_SIZE noeuds) sont calculées exactement.
+#   - L'attraction est calculée exactement sur la liste des liens.
+# theta = 0 n'accepte aucune approximation : on retrouve le calcul exact.
+#
+# Mode exact (exact=True) : toutes les paires, par tuiles de TILE x TILE
+# noeuds calculées par broadcasting NumPy. Le signe vient d'une matrice
+# d'adjacence en bits (packbits), précalculée une fois si elle tient dans
+# BITMAP_MAX_BYTES, sinon reconstruite tuile par tuile depuis le CSR : la
+# mémoire reste bornée quel que soit N. Les tuiles d'une même ligne sont
+# sommées colonne par colonne dans l'ordre (np.cumsum est séquentiel), avec
+# les mêmes opérations flottantes que la double boucle : à positions de
+# départ égales (initial_positions), le résultat est identique au bit près.
+# Les blocs de lignes sont indépendants et tournent sur plusieurs threads
+# (NumPy relâche le GIL sur les tableaux d'une tuile).
+
+B = 0.05
+ITERATIONS = 50
+THETA = 0.7
+MIN_DIST_SQ = 0.00001
+MAX_DEPTH = 16
+LEAF_SIZE = 8
+CHUNK_NODES = 2048
+TILE = 512
+BITMAP_MAX_BYTES = 256 << 20
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """ Intercale des zéros entre les 16 bits de poids faible (code de Morton). """
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """ Concaténation des intervalles [start, start + count). """
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    return np.arange(total) - np.repeat(offsets, counts) + np.repeat(starts, counts)
+
+
+class QuadTree:
+    """
+    Quadtree sur les positions, stocké niveau par niveau. Au niveau l, les
+    cellules non vides sont décrites par leur code, leur tranche [start,
+    start + count) dans `order`, leur centre de masse, et la tranche de
+    leurs enfants au niveau l + 1.
+    """
+
+    def __init__(self, positions: np.ndarray, max_depth: int = MAX_DEPTH):
+        self.depth = max_depth
+        lo = positions.min(axis=0)
+        self.size = max(float((positions.max(axis=0) - lo).max()), 1e-12)
+        cells = np.minimum(((positions - lo) / self.size * (1 << max_depth)).astype(np.int64),
+                           (1 << max_depth) - 1)
+        self.node_codes = (_spread_bits(cells[:, 0]) << np.uint64(1)) | _spread_bits(cells[:, 1])
+        self.order = np.argsort(self.node_codes, kind='stable')
+        sorted_codes = self.node_codes[self.order]
+        sorted_positions = positions[self.order]
+
+        self.codes, self.starts, self.counts, self.centers = [], [], [], []
+        for level in range(max_depth + 1):
+            shifted = sorted_codes >> np.uint64(2 * (max_depth - level))
+            starts = np.flatnonzero(np.r_[True, shifted[1:] != shifted[:-1]])
+            counts = np.diff(np.r_[starts, len(shifted)])
+            self.codes.append(shifted[starts])
+            self.starts.append(starts)
+            self.counts.append(counts)
+            self.centers.append(np.add.reduceat(sorted_positions, starts, axis=0) / counts[:, None])
+        self.child_lo, self.child_hi = [], []
+        for level in range(max_depth):
+            parents = self.codes[level + 1] >> np.uint64(2)
+            self.child_lo.append(np.searchsorted(parents, self.codes[level], 'left'))
+            self.child_hi.append(np.searchsorted(parents, self.codes[level], 'right'))
+
+    def cell_side(self, level: int) -> float:
+        return self.size / (1 << level)
+
+
+def repulsion(positions: np.ndarray, theta: float = THETA, tree: QuadTree = None,
+              chunk_nodes: int = CHUNK_NODES) -> np.ndarray:
+    """ sum_{B != A} (pos_B - pos_A) / max(d², MIN_DIST_SQ) pour chaque A (Barnes-Hut). """
+    n = len(positions)
+    tree = tree or QuadTree(positions)
+    force = np.zeros_like(positions)
+    for chunk_start in range(0, n, chunk_nodes):
+        nodes = np.arange(chunk_start, min(n, chunk_start + chunk_nodes))
+        pair_node, pair_cell = nodes, np.zeros(len(nodes), dtype=np.int64)
+        for level in range(tree.depth + 1):
+            if not pair_node.size:
+                break
+            vec = tree.centers[level][pair_cell] - positions[pair_node]
+            dist_sq = np.einsum('ij,ij->i', vec, vec)
+            counts = tree.counts[level][pair_cell]
+            inside = (tree.node_codes[pair_node] >> np.uint64(2 * (tree.depth - level))) == tree.codes[level][pair_cell]
+            far = ~inside & (tree.cell_side(level) ** 2 < theta * theta * dist_sq)
+            leaf = ~far & ((counts <= LEAF_SIZE) | (level == tree.depth))
+
+            # Cellules lointaines : un seul point pesant `counts` noeuds
+            weights = counts[far] / np.maximum(dist_sq[far], MIN_DIST_SQ)
+            _accumulate(force, pair_node[far], vec[far] * weights[:, None], chunk_start)
+
+            # Feuilles proches : calcul exact avec chacun de leurs noeuds
+            leaf_node, leaf_cell = pair_node[leaf], pair_cell[leaf]
+            leaf_counts = tree.counts[level][leaf_cell]
+            others = tree.order[_expand_ranges(tree.starts[level][leaf_cell], leaf_counts)]
+            targets = np.repeat(leaf_node, leaf_counts)
+            keep = others != targets
+            others, targets = others[keep], targets[keep]
+            vec_exact = positions[others] - positions[targets]
+            dist_exact = np.maximum(np.einsum('ij,ij->i', vec_exact, vec_exact), MIN_DIST_SQ)
+            _accumulate(force, targets, vec_exact / dist_exact[:, None], chunk_start)
+
+            # Les autres cellules sont ouvertes : paires avec leurs enfants au niveau suivant
+            split = ~far & ~leaf
+            if level == tree.depth or not split.any():
+                break
+            lo = tree.child_lo[level][pair_cell[split]]
+            n_children = tree.child_hi[level][pair_cell[split]] - lo
+            pair_node = np.repeat(pair_node[split], n_children)
+            pair_cell = _expand_ranges(lo, n_children)
+    return force
+
+
+def _accumulate(force: np.ndarray, nodes: np.ndarray, values: np.ndarray, offset: int):
+    """ force[nodes] += values (indices répétés possibles), noeuds du bloc commençant à offset. """
+    if not nodes.size:
+        return
+    local = nodes - offset
+    length = int(local.max()) + 1
+    force[offset:offset + length, 0] += np.bincount(local, weights=values[:, 0], minlength=length)
+    force[offset:offset + length, 1] += np.bincount(local, weights=values[:, 1], minlength=length)
+
+
+def attraction(positions: np.ndarray, edges: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """ sum_{B voisin de A} (pos_B - pos_A) / max(d², MIN_DIST_SQ), exact sur la liste des liens (u, v). """
+    force = np.zeros_like(positions)
+    u, v = edges
+    if not len(u):
+        return force
+    vec = positions[v] - positions[u]
+    dist_sq = np.maximum(np.einsum('ij,ij->i', vec, vec), MIN_DIST_SQ)
+    contrib = vec / dist_sq[:, None]
+    n = len(positions)
+    for axis in range(2):
+        force[:, axis] += np.bincount(u, weights=contrib[:, axis], minlength=n)
+        force[:, axis] -= np.bincount(v, weights=contrib[:, axis], minlength=n)
+    return force
+
+
+def initial_positions(n: int, seed: int = None) -> np.ndarray:
+    """ Départ uniforme dans [0, 1]², tiré comme le notebook (random.random(), x puis y). """
+    rng = random.Random(seed)
+    return np.array([[rng.random(), rng.random()] for _ in range(n)], dtype=np.float64).reshape(n, 2)
+
+
+# --- Mode exact par tuiles ---
+
+def adjacency_bitmap(graph: CSRGraph) -> np.ndarray:
+    """ Matrice d'adjacence n x n en bits (une ligne de ceil(n/8) octets par noeud, ordre de np.packbits). """
+    n = graph.n_nodes
+    bitmap = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    rows = np.repeat(np.arange(n, dtype=np.int64), graph.degrees())
+    cols = np.asarray(graph.indices, dtype=np.int64)
+    np.bitwise_or.at(bitmap, (rows, cols >> 3), (128 >> (cols & 7)).astype(np.uint8))
+    return bitmap
+
+
+def _tile_links(graph: CSRGraph, bitmap: np.ndarray, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+    """ Booléens (r1-r0) x (c1-c0) : lien entre le noeud r0+i et le noeud c0+j. """
+    if bitmap is not None:
+        # c0 est un multiple de 8 (TILE l'est) : on découpe directement les octets
+        return np.unpackbits(bitmap[r0:r1, c0 >> 3:(c1 + 7) >> 3], axis=1, count=c1 - c0).astype(bool)
+    links = np.zeros((r1 - r0, c1 - c0), dtype=bool)
+    lo, hi = graph.indptr[r0], graph.indptr[r1]
+    rows = np.repeat(np.arange(r1 - r0), np.diff(graph.indptr[r0:r1 + 1]))
+    cols = np.asarray(graph.indices[lo:hi], dtype=np.int64)
+    keep = (cols >= c0) & (cols < c1)
+    links[rows[keep], cols[keep] - c0] = True
+    return links
+
+
+def _exact_rows(positions: np.ndarray, graph: CSRGraph, bitmap: np.ndarray, b: float,
+                r0: int, r1: int, tile: int) -> np.ndarray:
+    """ Déplacement exact des noeuds r0..r1-1, sommé sur B dans l'ordre des IDs. """
+    n = len(positions)
+    pa_x, pa_y = positions[r0:r1, 0][:, None], positions[r0:r1, 1][:, None]
+    acc_x = np.zeros(r1 - r0)
+    acc_y = np.zeros(r1 - r0)
+    for c0 in range(0, n, tile):
+        c1 = min(n, c0 + tile)
+        vec_x = positions[c0:c1, 0][None, :] - pa_x
+        vec_y = positions[c0:c1, 1][None, :] - pa_y
+        # vecteur**2 du notebook passe par pow() de la libm, qui diffère parfois de x*x
+        # au dernier bit : np.float_power appelle la même fonction
+        dist_sq = np.float_power(vec_x, 2) + np.float_power(vec_y, 2)
+        np.maximum(dist_sq, MIN_DIST_SQ, out=dist_sq)
+        factor = np.where(_tile_links(graph, bitmap, r0, r1, c0, c1), b, -b) / dist_sq
+        term_x, term_y = factor * vec_x, factor * vec_y
+        # Le noeud lui-même ne compte pas (terme nul)
+        lo, hi = max(r0, c0), min(r1, c1)
+        if lo < hi:
+            diag = np.arange(lo, hi)
+            term_x[diag - r0, diag - c0] = 0.0
+            term_y[diag - r0, diag - c0] = 0.0
+        # Somme séquentielle, colonne après colonne, en partant du cumul précédent
+        term_x[:, 0] += acc_x
+        term_y[:, 0] += acc_y
+        acc_x = np.cumsum(term_x, axis=1)[:, -1]
+        acc_y = np.cumsum(term_y, axis=1)[:, -1]
+    return np.column_stack([acc_x, acc_y])
+
+
+def exact_displacement(positions: np.ndarray, graph: CSRGraph, b: float = B, tile: int = TILE,
+                       n_workers: int = None, bitmap: np.ndarray = None) -> np.ndarray:
+    """ Déplacement de chaque noeud selon la loi exacte (toutes les paires). """
+    n = len(positions)
+    blocks = [(r0, min(n, r0 + tile)) for r0 in range(0, n, tile)]
+    n_workers = n_workers or os.cpu_count() or 1
+    displacement = np.empty_like(positions)
+    if n_workers == 1 or len(blocks) <= 1:
+        for r0, r1 in blocks:
+            displacement[r0:r1] = _exact_rows(positions, graph, bitmap, b, r0, r1, tile)
+        return displacement
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        parts = pool.map(lambda block: _exact_rows(positions, graph, bitmap, b, *block, tile), blocks)
+        for (r0, r1), part in zip(blocks, parts):
+            displacement[r0:r1] = part
+    return displacement
+
+
+def force_layout(graph: CSRGraph, iterations: int = ITERATIONS, b: float = B, theta: float = THETA,
+                 positions: np.ndarray = None, seed: int = None, progress: bool = True,
+                 exact: bool = False, tile: int = TILE, n_workers: int = None) -> np.ndarray:
+    """
+    Positions (n_nodes x 2) après `iterations` pas de la loi du notebook.
+    Départ : positions données, sinon initial_positions(n, seed).
+    exact=True : toutes les paires par tuiles (identique à la double boucle),
+    sinon Barnes-Hut avec le paramètre theta.
+    """
+    if positions is None:
+        positions = initial_positions(graph.n_nodes, seed)
+    positions = np.array(positions, dtype=np.float64)
+    if exact:
+        tile = max(8, tile - tile % 8)
+        n = graph.n_nodes
+        bitmap = adjacency_bitmap(graph) if n * ((n + 7) // 8) <= BITMAP_MAX_BYTES else None
+    else:
+        edges = graph.edge_array()
+    for it in range(iterations):
+        if exact:
+            positions = positions + exact_displacement(positions, graph, b, tile, n_workers, bitmap)
+        else:
+            positions += -b * repulsion(positions, theta) + 2 * b * attraction(positions, edges)
+        if progress:
+            print(f"\rItération {it + 1}/{iterations}", end="", flush=True)
+    if progress:
+        print()
+    return positions
@@ -0,0 +1,171 @@
+import os
+import json
+import shutil
+import hashlib
+from collections.abc import Sequence
+import numpy as np
+from csr_graph import CSRGraph
+from parallel_ingest import parse_jsonl_parallel
+
+# --- Snapshot binaire du graphe (chargé par np.memmap) ---
+#
+# Le JSONL n'est parsé qu'une seule fois. Le résultat est écrit à côté du
+# fichier source dans un dossier '<fichier>.snapshot/' :
+#   indptr.npy, indices.npy   -> adjacence CSR
+#   has_record.npy            -> auteurs ayant leur propre ligne dans le JSONL
+#   names.bin, name_offsets.npy -> table des noms (UTF-8 concaténé)
+#   meta.json                 -> taille, date et SHA-256 du JSONL source
+# Les chargements suivants ouvrent ces fichiers en mémoire mappée.
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+class NameTable(Sequence):
+    """
+    Table des noms en lecture seule, décodée à la demande depuis le snapshot.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode('utf-8')
+
+    def starts_with(self, other: "NameTable") -> bool:
+        """ Vrai si les noms de other sont, dans le même ordre, les premiers de cette table. """
+        n = len(other)
+        if n > len(self) or not np.array_equal(self._offsets[:n + 1], other._offsets):
+            return False
+        end = int(other._offsets[-1])
+        return np.array_equal(self._blob[:end], other._blob[:end])
+
+    def __iter__(self):
+        # Les offsets sont en octets : on découpe le bloc encodé puis on décode
+        raw = self._blob.tobytes()
+        offsets = self._offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield raw[start:end].decode('utf-8')
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """ SHA-256 du fichier, lu par blocs. """
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def snapshot_dir(jsonl_file: str) -> str:
+    return jsonl_file + SNAPSHOT_SUFFIX
+
+
+def save_snapshot(graph: CSRGraph, jsonl_file: str, out_dir: str = None) -> str:
+    """
+    Écrit le snapshot du graphe. L'écriture passe par un dossier temporaire
+    renommé à la fin, pour ne jamais laisser un snapshot à moitié écrit.
+    """
+    out_dir = out_dir or snapshot_dir(jsonl_file)
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.save(os.path.join(tmp_dir, "indptr.npy"), np.asarray(graph.indptr, dtype=np.int64))
+    np.save(os.path.join(tmp_dir, "indices.npy"), np.asarray(graph.indices, dtype=np.int32))
+    has_record = graph.has_record if graph.has_record is not None else np.zeros(graph.n_nodes, dtype=bool)
+    np.save(os.path.join(tmp_dir, "has_record.npy"), np.asarray(has_record, dtype=bool))
+
+    encoded = [name.encode('utf-8') for name in graph.names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    with open(os.path.join(tmp_dir, "names.bin"), 'wb') as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(tmp_dir, "name_offsets.npy"), offsets)
+
+    stat = os.stat(jsonl_file)
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'source': os.path.basename(jsonl_file),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': file_checksum(jsonl_file),
+        'n_nodes': graph.n_nodes,
+        'n_edges': graph.n_edges,
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+
+def load_snapshot(out_dir: str) -> CSRGraph:
+    """ Ouvre un snapshot existant en mémoire mappée (aucune copie). """
+    def load(name):
+        return np.load(os.path.join(out_dir, name), mmap_mode='r')
+
+    return CSRGraph(load("indptr.npy"), load("indices.npy"), load_names(out_dir), has_record=load("has_record.npy"))
+
+
+def load_names(out_dir: str) -> NameTable:
+    """ Table des noms (names.bin + name_offsets.npy) d'un dossier, en mémoire mappée. """
+    names_path = os.path.join(out_dir, "names.bin")
+    if os.path.getsize(names_path):
+        blob = np.memmap(names_path, dtype=np.uint8, mode='r')
+    else:
+        blob = np.empty(0, dtype=np.uint8)
+    return NameTable(blob, np.load(os.path.join(out_dir, "name_offsets.npy"), mmap_mode='r'))
+
+
+def read_snapshot_meta(out_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(out_dir, "meta.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def snapshot_is_fresh(jsonl_file: str, out_dir: str = None) -> bool:
+    """
+    Vérifie que le snapshot correspond au JSONL actuel. Si la taille et la date
+    n'ont pas bougé on ne relit pas le fichier ; sinon on compare le SHA-256
+    (un simple 'touch' ne force donc pas de reconstruction).
+    """
+    out_dir = out_dir or snapshot_dir(jsonl_file)
+    meta = read_snapshot_meta(out_dir)
+    if meta is None or meta.get('version') != SNAPSHOT_VERSION:
+        return False
+    stat = os.stat(jsonl_file)
+    if meta['source_size'] != stat.st_size:
+        return False
+    if meta['source_mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if meta['source_sha256'] != file_checksum(jsonl_file):
+        return False
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    with open(os.path.join(out_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return True
+
+
+def load_graph(jsonl_file: str, out_dir: str = None, n_workers: int = None) -> CSRGraph:
+    """
+    Point d'entrée des scripts : charge le snapshot s'il est à jour, sinon
+    parse le JSONL une fois (en parallèle), écrit le snapshot et le recharge
+    en memmap.
+    """
+    out_dir = out_dir or snapshot_dir(jsonl_file)
+    if not snapshot_is_fresh(jsonl_file, out_dir):
+        print(f"--- Snapshot absent ou périmé : conversion de '{jsonl_file}' ---")
+        save_snapshot(parse_jsonl_parallel(jsonl_file, n_workers), jsonl_file, out_dir)
+    return load_snapshot(out_dir)
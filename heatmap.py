@@ -5,18 +5,26 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from scipy.stats import chi2_contingency
 import numpy as np
+from graph_snapshot import load_graph
+from feature_store import ensure_table, open_feature_store
 
-# 1. Chargement des données existantes
+JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
+CSV_FILE = "auteurs_avec_excentricite_et_domaine.csv" # Importé dans la table (colonnes manquantes)
+
+# 1. Chargement des données existantes : seulement les colonnes utiles, en mémoire mappée
+features = ['Degré', 'Clustering', 'Centralité Intermédiarité', 'Excentricité']
+graph = load_graph(JSON_FILE)
+store = open_feature_store(JSON_FILE)
 try:
-    df = pd.read_csv("auteurs_avec_excentricite_et_domaine.csv")
+    rows = ensure_table(store, graph, CSV_FILE)
 except FileNotFoundError:
     # Essayer le sous-dossier si besoin
-    df = pd.read_csv("Fichiers_finaux/auteurs_avec_excentricite_et_domaine.csv")
+    rows = ensure_table(store, graph, "Fichiers_finaux/" + CSV_FILE)
+df = store.frame(features + ['Domaine_Dominant'], rows)
 
 df = df.fillna(0)
 
-# 2. Reconstitution des Clusters (Car ils ne sont pas dans le CSV)
-features = ['Degré', 'Clustering', 'Centralité Intermédiarité', 'Excentricité']
+# 2. Reconstitution des Clusters (Car ils ne sont pas dans la table)
 X = df[features]
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
@@ -0,0 +1,51 @@
+import numpy as np
+from csr_graph import CSRGraph
+import hyperloglog
+
+# --- HyperANF : fonction de voisinage approchée de tout le graphe ---
+#
+# Chaque noeud porte un compteur HyperLogLog de sa boule B(v, t). Une passe
+# sur les liens (union avec les compteurs des voisins) donne B(v, t+1).
+# N(t) = somme des |B(v, t)| = nombre de paires (u, v) avec d(u, v) <= t.
+# On itère jusqu'à ce qu'aucun compteur ne change : quelques passes
+# linéaires (le diamètre) suffisent, sans stocker aucune distance.
+
+EFFECTIVE_DIAMETER_QUANTILE = 0.9
+
+
+def neighbourhood_function(graph: CSRGraph, precision: int = hyperloglog.DEFAULT_PRECISION,
+                           seed: int = 0, max_iterations: int = None) -> np.ndarray:
+    """ Estimation de N(t) pour t = 0, 1, ... jusqu'à stabilisation. """
+    counters = hyperloglog.singleton_counters(graph.n_nodes, precision, seed)
+    values = [float(graph.n_nodes)] # N(0) = n exactement
+    t = 0
+    while max_iterations is None or t < max_iterations:
+        updated = hyperloglog.union_over_neighbors(graph, counters)
+        if np.array_equal(updated, counters):
+            break
+        counters = updated
+        values.append(float(hyperloglog.estimate(counters).sum()))
+        t += 1
+    # Une fonction de voisinage est croissante : on lisse les fluctuations de l'estimateur
+    return np.maximum.accumulate(np.array(values))
+
+
+def distance_distribution(nf: np.ndarray) -> np.ndarray:
+    """ p(t) = part des paires distinctes (connectées) à distance exactement t, t >= 1. """
+    pairs = np.diff(nf)
+    total = pairs.sum()
+    return pairs / total if total > 0 else pairs
+
+
+def average_distance(nf: np.ndarray) -> float:
+    p = distance_distribution(nf)
+    return float(np.sum(np.arange(1, len(p) + 1) * p))
+
+
+def effective_diameter(nf: np.ndarray, quantile: float = EFFECTIVE_DIAMETER_QUANTILE) -> float:
+    """ Distance (interpolée) sous laquelle se trouve `quantile` des paires connectées. """
+    reached = (nf - nf[0]) / (nf[-1] - nf[0]) if nf[-1] > nf[0] else np.zeros_like(nf)
+    t = int(np.searchsorted(reached, quantile))
+    if t == 0 or t >= len(reached):
+        return float(min(t, len(reached) - 1))
+    return (t - 1) + (quantile - reached[t - 1]) / (reached[t] - reached[t - 1])
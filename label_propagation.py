@@ -0,0 +1,57 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from csr_graph import CSRGraph
+
+# --- Propagation d'étiquettes (domaines) sur le graphe CSR ---
+#
+# Les seeds gardent leur étiquette. À chaque saut, les noeuds encore sans
+# étiquette qui touchent un noeud étiqueté au saut précédent votent :
+#   votes = A[F]ᵀ @ Y_F
+# où F est la frontière (noeuds étiquetés au saut précédent) et Y_F leur
+# matrice one-hot (n_F x n_étiquettes) pondérée par leur confiance. Un noeud
+# sans étiquette au saut h n'a aucun voisin étiqueté avant h-1 (sinon il
+# l'aurait été plus tôt) : la frontière suffit, et chaque lien n'est vu
+# qu'une fois sur toute la propagation.
+#
+# Le noeud prend l'étiquette au plus fort vote pondéré ; sa confiance est ce
+# vote divisé par le nombre de voisins votants. Au premier saut (voisins des
+# seeds, confiance 1) c'est exactement le vote majoritaire des seeds ; la
+# confiance diminue ensuite avec les désaccords accumulés. À égalité,
+# l'étiquette de plus petit indice gagne.
+
+
+def one_hot(labels: np.ndarray, n_labels: int, weights: np.ndarray = None) -> csr_matrix:
+    """ Matrice creuse (len(labels) x n_labels), une ligne par noeud étiqueté. """
+    rows = np.arange(len(labels))
+    data = np.ones(len(labels)) if weights is None else np.asarray(weights, dtype=np.float64)
+    return csr_matrix((data, (rows, labels)), shape=(len(labels), n_labels))
+
+
+def propagate_labels(graph: CSRGraph, labels: np.ndarray, n_labels: int,
+                     max_hops: int = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    labels : indice d'étiquette par noeud, -1 si inconnu.
+    Renvoie (étiquettes, confiance, saut) ; -1 / 0 / -1 pour les noeuds
+    qu'aucune étiquette n'atteint en max_hops sauts (None : jusqu'au bout).
+    """
+    labels = np.asarray(labels, dtype=np.int64).copy()
+    confidence = np.where(labels >= 0, 1.0, 0.0)
+    hops = np.where(labels >= 0, 0, -1)
+    A = graph.to_scipy()
+
+    frontier = np.flatnonzero(labels >= 0)
+    hop = 0
+    while frontier.size and (max_hops is None or hop < max_hops):
+        hop += 1
+        rows = A[frontier]
+        votes = (rows.T @ one_hot(labels[frontier], n_labels, confidence[frontier])).tocsr()
+        voters = np.bincount(rows.indices, minlength=graph.n_nodes)
+        touched = np.flatnonzero(np.diff(votes.indptr))
+        frontier = touched[labels[touched] < 0]
+        if not frontier.size:
+            break
+        dense = votes[frontier].toarray()
+        labels[frontier] = dense.argmax(axis=1)
+        confidence[frontier] = dense.max(axis=1) / voters[frontier]
+        hops[frontier] = hop
+    return labels, confidence, hops
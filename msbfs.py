@@ -0,0 +1,128 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from csr_graph import CSRGraph, SharedCSR, attach_shared_graph, neighbor_reduce, neighbor_slots
+
+# --- BFS multi-sources bit-parallèle (style MS-BFS) sur CPU ---
+#
+# Un lot de `width` sources (multiple de 64) avance en même temps : chaque
+# noeud porte un masque de width bits (width // 64 mots uint64), le bit s
+# indiquant que la source s a atteint le noeud. À chaque niveau :
+#   suivant[v] = OU des frontières des voisins de v, privé des bits déjà vus
+# Un seul parcours des listes d'adjacence sert donc à toutes les sources du lot.
+# Quand la frontière est petite on pousse ses masques vers ses voisins
+# (top-down) ; quand elle est grande on tire depuis tous les noeuds (bottom-up).
+# Les lots sont répartis sur les coeurs par un pool de processus qui lisent
+# tous le même graphe en mémoire partagée (SharedCSR).
+
+BATCH_WIDTH = 64
+PUSH_FRACTION = 0.1 # Part des liens touchés par la frontière sous laquelle on pousse
+
+
+def _push(graph: CSRGraph, frontier: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """ OU des masques des noeuds actifs vers leurs voisins (frontière creuse). """
+    reached = np.zeros_like(frontier)
+    slots = neighbor_slots(graph, active)
+    if len(slots) == 0:
+        return reached
+    targets = graph.indices[slots]
+    masks = frontier[np.repeat(active, graph.indptr[active + 1] - graph.indptr[active])]
+    order = np.argsort(targets, kind='stable')
+    targets, masks = targets[order], masks[order]
+    unique, starts = np.unique(targets, return_index=True)
+    reached[unique] = np.bitwise_or.reduceat(masks, starts, axis=0)
+    return reached
+
+
+def _bit_counts(masks: np.ndarray) -> np.ndarray:
+    """ Pour chaque bit (source) : nombre de noeuds dont le masque a ce bit. """
+    rows = masks[masks.any(axis=1)]
+    if len(rows) == 0:
+        return np.zeros(masks.shape[1] * 64, dtype=np.int64)
+    bits = np.unpackbits(rows.view(np.uint8), axis=1, bitorder='little')
+    return bits.sum(axis=0, dtype=np.int64)
+
+
+def multi_source_bfs(graph: CSRGraph, sources: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    BFS simultané depuis toutes les sources du lot (au plus quelques centaines).
+    Renvoie (excentricités, histogrammes) : histogrammes[s, d] = nombre de
+    noeuds à distance d de la source s (d = 0 inclus).
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    n_sources = len(sources)
+    words = max(1, -(-n_sources // 64))
+    bit = np.arange(n_sources)
+
+    seen = np.zeros((graph.n_nodes, words), dtype=np.uint64)
+    np.bitwise_or.at(seen, (sources, bit // 64), np.left_shift(np.uint64(1), (bit % 64).astype(np.uint64)))
+    frontier = seen.copy()
+    empty = np.zeros_like(seen)
+
+    eccentricities = np.zeros(n_sources, dtype=np.int32)
+    histograms = [np.ones(n_sources, dtype=np.int64)]
+    degrees = graph.degrees()
+    level = 0
+    while True:
+        active = np.flatnonzero(frontier.any(axis=1))
+        if degrees[active].sum() < PUSH_FRACTION * len(graph.indices):
+            reached = _push(graph, frontier, active)
+        else:
+            reached = neighbor_reduce(graph, frontier, np.bitwise_or, empty)
+        reached &= ~seen
+        if not reached.any():
+            break
+        level += 1
+        seen |= reached
+        counts = _bit_counts(reached)[:n_sources]
+        eccentricities[counts > 0] = level
+        histograms.append(counts)
+        frontier = reached
+    return eccentricities, np.stack(histograms, axis=1)
+
+
+# --- Répartition des lots sur plusieurs processus ---
+
+_worker_graph = None
+_worker_segments = None
+
+
+def _init_worker(spec):
+    global _worker_graph, _worker_segments
+    _worker_graph, _worker_segments = attach_shared_graph(spec)
+
+
+def _run_batch(sources):
+    return multi_source_bfs(_worker_graph, sources)
+
+
+def batched_eccentricities(graph: CSRGraph, sources: np.ndarray, width: int = BATCH_WIDTH,
+                           n_workers: int = None, progress=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Excentricité et histogramme des distances de chaque source, par lots de
+    `width` sources BFS-és ensemble, répartis sur n_workers processus.
+    `progress` : barre tqdm optionnelle (avancée du nombre de sources traitées).
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    batches = [sources[i:i + width] for i in range(0, len(sources), width)]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if n_workers == 1 or len(batches) <= 1:
+        results = []
+        for batch in batches:
+            results.append(multi_source_bfs(graph, batch))
+            if progress is not None: progress.update(len(batch))
+    else:
+        with SharedCSR(graph) as shared, ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            results = []
+            for batch, result in zip(batches, pool.map(_run_batch, batches)):
+                results.append(result)
+                if progress is not None: progress.update(len(batch))
+
+    if not results:
+        return np.zeros(0, dtype=np.int32), np.zeros((0, 1), dtype=np.int64)
+    depth = max(h.shape[1] for _, h in results)
+    eccentricities = np.concatenate([e for e, _ in results])
+    histograms = np.concatenate([np.pad(h, ((0, 0), (0, depth - h.shape[1]))) for _, h in results])
+    return eccentricities, histograms
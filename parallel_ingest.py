@@ -0,0 +1,113 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from csr_graph import CSRGraph, parse_record
+
+# --- Lecture parallèle du JSONL ---
+#
+# Le fichier est découpé en morceaux d'octets alignés sur les fins de ligne.
+# Chaque processus parse son morceau et renvoie une table de noms locale et
+# des tableaux d'arêtes en IDs locaux (déjà dédoublonnés). Le processus
+# principal fusionne les tables de noms dans l'ordre des morceaux, ce qui
+# donne exactement la même numérotation qu'une lecture séquentielle.
+
+MIN_CHUNK_BYTES = 8 << 20 # En dessous, un seul processus suffit
+
+
+def chunk_offsets(input_file: str, n_chunks: int) -> list[tuple[int, int]]:
+    """ Découpe le fichier en n_chunks intervalles [début, fin) sur des débuts de ligne. """
+    size = os.path.getsize(input_file)
+    n_chunks = max(1, min(n_chunks, size // MIN_CHUNK_BYTES or 1))
+    bounds = [0]
+    with open(input_file, 'rb') as f:
+        for k in range(1, n_chunks):
+            f.seek(size * k // n_chunks)
+            f.readline() # On termine la ligne en cours
+            pos = f.tell()
+            if pos > bounds[-1]:
+                bounds.append(min(pos, size))
+    if bounds[-1] != size:
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _parse_chunk(task):
+    """
+    Worker : parse les lignes de [start, end) et renvoie
+    (noms locaux, src, dst, ids des auteurs ayant une ligne).
+    """
+    input_file, start, end = task
+    name_to_id = {}
+    names = []
+    src, dst = array('q'), array('q')
+    record_ids = array('q')
+
+    def intern(name):
+        i = name_to_id.get(name)
+        if i is None:
+            i = name_to_id[name] = len(names)
+            names.append(name)
+        return i
+
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        for line in f.read(end - start).splitlines():
+            parsed = parse_record(line)
+            if parsed is None:
+                continue
+            author, coauthors = parsed
+            u = intern(author)
+            record_ids.append(u)
+            for coauthor in coauthors:
+                v = intern(coauthor)
+                if v != u:
+                    src.append(u)
+                    dst.append(v)
+
+    # Dédoublonnage local pour réduire ce qui repasse par le pickle
+    n = len(names)
+    src = np.frombuffer(src, dtype=np.int64)
+    dst = np.frombuffer(dst, dtype=np.int64)
+    keys = np.unique(np.minimum(src, dst) * n + np.maximum(src, dst))
+    return names, (keys // n).astype(np.int32), (keys % n).astype(np.int32), np.frombuffer(record_ids, dtype=np.int64)
+
+
+def parse_jsonl_parallel(input_file: str, n_workers: int = None) -> CSRGraph:
+    """
+    Équivalent de CSRGraph.from_jsonl, réparti sur n_workers processus
+    (par défaut tous les coeurs).
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    tasks = [(input_file, start, end) for start, end in chunk_offsets(input_file, n_workers)]
+    if len(tasks) <= 1:
+        parts = [_parse_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+            parts = list(pool.map(_parse_chunk, tasks))
+
+    # Fusion : chaque ID local est traduit en ID global
+    name_to_id = {}
+    names = []
+    all_src, all_dst, all_records = [], [], []
+    for local_names, src, dst, record_ids in parts:
+        local_to_global = np.empty(len(local_names), dtype=np.int64)
+        for i, name in enumerate(local_names):
+            g = name_to_id.get(name)
+            if g is None:
+                g = name_to_id[name] = len(names)
+                names.append(name)
+            local_to_global[i] = g
+        all_src.append(local_to_global[src])
+        all_dst.append(local_to_global[dst])
+        all_records.append(local_to_global[record_ids])
+
+    def concat(arrays):
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+
+    # from_edges dédoublonne les arêtes présentes dans plusieurs morceaux
+    graph = CSRGraph.from_edges(concat(all_src), concat(all_dst), names)
+    graph.has_record = np.zeros(len(names), dtype=bool)
+    graph.has_record[concat(all_records)] = True
+    graph._name_to_id = name_to_id
+    return graph
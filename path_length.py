@@ -0,0 +1,77 @@
+import numpy as np
+from scipy import stats
+from csr_graph import CSRGraph, bfs_distances, largest_component
+from msbfs import BATCH_WIDTH, multi_source_bfs
+
+# --- Distance moyenne (L) à précision demandée ---
+#
+# Dans la composante géante, chaque source s a sa distance moyenne x_s vers
+# les autres noeuds, et L est la moyenne des x_s sur toutes les sources
+# (même valeur que somme des distances / nombre de paires, puisque chaque
+# source atteint le même nombre de noeuds). On tire les sources sans remise
+# par lots (un lot = un BFS multi-sources de msbfs), on tient la moyenne et
+# l'écart-type des x_s, et on s'arrête dès que la demi-largeur de
+# l'intervalle de confiance (Student, avec correction de population finie)
+# passe sous rel_error * L. Le coût suit la précision voulue au lieu d'un
+# nombre de sources fixé à l'avance ; si toute la composante est parcourue,
+# L est exact (intervalle de largeur nulle).
+#
+# Avec un edge_mask (liens supprimés, voir edge_attack), les BFS sont faits
+# source par source avec bfs_distances, qui respecte le masque.
+
+REL_ERROR = 0.01
+CONFIDENCE = 0.95
+
+
+def source_mean_distances(graph: CSRGraph, sources: np.ndarray, edge_mask: np.ndarray = None) -> np.ndarray:
+    """ Distance moyenne de chaque source vers les noeuds qu'elle atteint (NaN si aucun). """
+    sources = np.asarray(sources, dtype=np.int64)
+    if edge_mask is None:
+        _, histograms = multi_source_bfs(graph, sources)
+        totals = histograms @ np.arange(histograms.shape[1])
+        counts = histograms[:, 1:].sum(axis=1)
+    else:
+        totals = np.zeros(len(sources), dtype=np.int64)
+        counts = np.zeros(len(sources), dtype=np.int64)
+        for i, source in enumerate(sources):
+            dist = bfs_distances(graph, source, edge_mask)
+            reached = dist[dist > 0]
+            totals[i], counts[i] = reached.sum(), len(reached)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return totals / counts
+
+
+def estimate_path_length(graph: CSRGraph, rel_error: float = REL_ERROR, confidence: float = CONFIDENCE,
+                         batch: int = BATCH_WIDTH, max_sources: int = None, edge_mask: np.ndarray = None,
+                         lcc: np.ndarray = None, rng: np.random.Generator = None
+                         ) -> tuple[float, tuple[float, float], int]:
+    """
+    (L, (borne basse, borne haute), nombre de BFS) sur la composante géante
+    (lcc, recalculée si absente). S'arrête quand la demi-largeur de
+    l'intervalle est <= rel_error * L, ou après max_sources sources.
+    """
+    rng = rng or np.random.default_rng()
+    if lcc is None:
+        lcc = largest_component(graph, edge_mask)
+    population = len(lcc)
+    if population < 2:
+        return 0.0, (0.0, 0.0), 0
+    order = rng.permutation(lcc)
+    limit = min(population, max_sources or population)
+
+    values = np.empty(0)
+    mean, half = 0.0, np.inf
+    while len(values) < limit:
+        sources = order[len(values):min(limit, len(values) + batch)]
+        values = np.concatenate([values, source_mean_distances(graph, sources, edge_mask)])
+        n = len(values)
+        mean = float(values.mean())
+        if n == population:
+            half = 0.0
+            break
+        if n >= 2:
+            finite_population = np.sqrt((population - n) / (population - 1))
+            half = float(stats.t.ppf((1 + confidence) / 2, n - 1) * values.std(ddof=1) / np.sqrt(n) * finite_population)
+            if half <= rel_error * mean:
+                break
+    return mean, (mean - half, mean + half), len(values)
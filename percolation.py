@@ -0,0 +1,157 @@
+import numpy as np
+from csr_graph import CSRGraph, connected_components
+from edge_attack import edge_slots
+
+# --- Percolation de Newman-Ziff : courbe de robustesse complète en une passe ---
+#
+# Plutôt que de supprimer p % des liens puis de recalculer les composantes
+# pour chaque niveau, on fixe un ordre de suppression et on le parcourt à
+# l'envers : on part du graphe où tout est supprimé et on rajoute les liens
+# (ou les noeuds) un par un, avec un union-find qui tient la taille de la
+# plus grande composante. Après avoir rajouté le lien k, l'état est celui du
+# graphe où seuls les k premiers liens de l'ordre sont supprimés. Une seule
+# passe quasi linéaire donne donc la taille de la composante géante pour
+# chaque nombre de suppressions, de 0 à 100 %.
+#
+# Ordres disponibles (removal_order) :
+#   'inter' / 'intra' -> liens inter / intra-domaines dans un ordre aléatoire
+#                        (les autres liens ne sont jamais supprimés)
+#   'random'          -> tous les liens dans un ordre aléatoire
+#   'hub'             -> noeuds par degré décroissant (degré initial, ex aequo
+#                        dans un ordre aléatoire), avec tous leurs liens
+#
+# Les liens sont désignés par leur rang dans graph.edge_array() (u < v),
+# comme dans edge_attack.
+
+EDGE_ORDERS = ('inter', 'intra', 'random')
+NODE_ORDERS = ('hub',)
+
+
+def removal_order(graph: CSRGraph, kind: str, is_inter: np.ndarray = None, seed: int = None) -> np.ndarray:
+    """
+    Ordre de suppression : rangs de liens pour 'inter', 'intra' et 'random'
+    (is_inter requis pour les deux premiers), IDs de noeuds pour 'hub'.
+    """
+    rng = np.random.default_rng(seed)
+    if kind == 'hub':
+        shuffled = rng.permutation(graph.n_nodes)
+        return shuffled[np.argsort(-graph.degrees()[shuffled], kind='stable')]
+    if kind == 'random':
+        return rng.permutation(graph.n_edges)
+    if kind in ('inter', 'intra'):
+        if is_inter is None:
+            raise ValueError(f"L'ordre {kind!r} demande la classification des liens (is_inter)")
+        selected = is_inter if kind == 'inter' else ~np.asarray(is_inter)
+        return rng.permutation(np.flatnonzero(selected))
+    raise ValueError(f"Ordre de suppression inconnu : {kind!r} ({', '.join(EDGE_ORDERS + NODE_ORDERS)})")
+
+
+def edge_percolation(graph: CSRGraph, order: np.ndarray) -> np.ndarray:
+    """
+    giant[k] = taille de la plus grande composante quand les k premiers liens
+    de order sont supprimés (k = 0..len(order)). Les liens absents de order
+    restent en place.
+    """
+    src, dst = graph.edge_array()
+    order = np.asarray(order, dtype=np.int64)
+
+    # État de départ (tout order supprimé) : composantes des liens restants
+    kept = np.ones(graph.n_edges, dtype=bool)
+    kept[order] = False
+    forward, backward = edge_slots(graph)
+    alive = np.zeros(len(graph.indices), dtype=bool)
+    alive[forward[kept]] = True
+    alive[backward[kept]] = True
+    n_components, labels = connected_components(graph, alive)
+    root = np.empty(n_components, dtype=np.int64)
+    root[labels] = np.arange(graph.n_nodes) # Un représentant par composante
+    size = np.zeros(graph.n_nodes, dtype=np.int64)
+    size[root] = np.bincount(labels, minlength=n_components)
+    parent = root[labels].tolist()
+    size = size.tolist()
+
+    giant = np.empty(len(order) + 1, dtype=np.int64)
+    largest = max(size) if size else 0
+    giant[len(order)] = largest
+    us, vs = src[order[::-1]].tolist(), dst[order[::-1]].tolist()
+    k = len(order)
+    for u, v in zip(us, vs):
+        # Recherche des racines avec compression par moitié
+        while parent[u] != u:
+            parent[u] = u = parent[parent[u]]
+        while parent[v] != v:
+            parent[v] = v = parent[parent[v]]
+        if u != v:
+            if size[u] < size[v]:
+                u, v = v, u
+            parent[v] = u
+            size[u] += size[v]
+            if size[u] > largest:
+                largest = size[u]
+        k -= 1
+        giant[k] = largest
+    return giant
+
+
+def node_percolation(graph: CSRGraph, order: np.ndarray) -> np.ndarray:
+    """
+    giant[k] = taille de la plus grande composante quand les k premiers
+    noeuds de order (et leurs liens) sont supprimés (k = 0..len(order)).
+    Les noeuds absents de order restent en place.
+    """
+    order = np.asarray(order, dtype=np.int64)
+    kept = np.ones(graph.n_nodes, dtype=bool)
+    kept[order] = False
+    indptr, indices = graph.indptr, graph.indices
+    present = [False] * graph.n_nodes
+    parent = list(range(graph.n_nodes))
+    size = [1] * graph.n_nodes
+    largest = 0
+
+    def add(node):
+        nonlocal largest
+        present[node] = True
+        root = node
+        for w in indices[indptr[node]:indptr[node + 1]].tolist():
+            if not present[w]:
+                continue
+            while parent[w] != w:
+                parent[w] = w = parent[parent[w]]
+            if w != root:
+                if size[root] < size[w]:
+                    root, w = w, root
+                parent[w] = root
+                size[root] += size[w]
+        if size[root] > largest:
+            largest = size[root]
+
+    # Les noeuds jamais supprimés sont en place dès le départ
+    for node in np.flatnonzero(kept).tolist():
+        add(node)
+    giant = np.empty(len(order) + 1, dtype=np.int64)
+    giant[len(order)] = largest
+    for k in range(len(order) - 1, -1, -1):
+        add(int(order[k]))
+        giant[k] = largest
+    return giant
+
+
+def percolation_curve(graph: CSRGraph, kind: str, is_inter: np.ndarray = None,
+                      seed: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (fraction supprimée, fraction des noeuds dans la composante géante) pour
+    chaque nombre de suppressions de l'ordre 'kind'.
+    """
+    order = removal_order(graph, kind, is_inter, seed)
+    if kind in NODE_ORDERS:
+        giant = node_percolation(graph, order)
+    else:
+        giant = edge_percolation(graph, order)
+    fractions = np.arange(len(giant)) / max(len(giant) - 1, 1)
+    return fractions, giant / max(graph.n_nodes, 1)
+
+
+def sample_curve(values: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """ Valeurs de la courbe aux niveaux demandés (nombre de suppressions = int(p * total)). """
+    total = len(values) - 1
+    return values[(np.asarray(levels) * total).astype(np.int64)]
@@ -0,0 +1,59 @@
+import numpy as np
+from csr_graph import CSRGraph
+import hyperloglog
+
+# --- Nombre de voisins au second degré |N2(v)| pour tous les noeuds ---
+#
+# N2(v) = (union des voisins des voisins de v) - {v} - N(v), comme la feature
+# 'second_degree_neighbors' de extract_features_for_pca.
+#
+# Mode exact : produit de matrices creuses booléennes A[bloc] @ A, par blocs de
+# sources dont le travail (somme des degrés des voisins) est borné.
+# Mode 'hll' : compteurs HyperLogLog de N(u) + {u} fusionnés sur les voisins,
+# pour les graphes où même les blocs exacts ne tiennent pas en mémoire.
+
+BLOCK_WORK = 1 << 24
+
+
+def second_degree_counts_exact(graph: CSRGraph, block_work: int = BLOCK_WORK) -> np.ndarray:
+    n = graph.n_nodes
+    counts = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return counts
+    A = graph.to_scipy().astype(bool)
+    degrees = graph.degrees()
+    # Travail d'une source = nombre de chemins de longueur 2 qui en partent
+    work = np.cumsum(A @ degrees)
+    bounds = np.searchsorted(work, np.arange(block_work, work[-1], block_work)) if work[-1] else []
+    bounds = np.unique(np.concatenate([[0], bounds, [n]])).astype(np.int64)
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        rows = A[start:end]
+        reach = (rows @ A) + rows # Boule de rayon 2 (le noeud lui-même inclus s'il a un voisin)
+        sizes = np.diff(reach.indptr)
+        block_degrees = degrees[start:end]
+        counts[start:end] = sizes - block_degrees - (block_degrees > 0)
+    return counts
+
+
+def second_degree_counts_hll(graph: CSRGraph, precision: int = hyperloglog.DEFAULT_PRECISION,
+                             seed: int = 0) -> np.ndarray:
+    """
+    Estimation de |N2(v)| : |boule de rayon 2| estimée par HyperLogLog, moins
+    le degré et le noeud lui-même. L'erreur porte sur la taille de la boule
+    (écart-type relatif hyperloglog.relative_error(precision)).
+    """
+    counters = hyperloglog.singleton_counters(graph.n_nodes, precision, seed)
+    for _ in range(2):
+        counters = hyperloglog.union_over_neighbors(graph, counters)
+    ball = hyperloglog.estimate(counters)
+    return np.maximum(np.rint(ball).astype(np.int64) - graph.degrees() - 1, 0)
+
+
+def second_degree_counts(graph: CSRGraph, mode: str = 'exact', **kwargs) -> np.ndarray:
+    """ |N2(v)| pour tous les noeuds ; mode = 'exact' ou 'hll' (approché). """
+    if mode == 'exact':
+        return second_degree_counts_exact(graph, **kwargs)
+    if mode == 'hll':
+        return second_degree_counts_hll(graph, **kwargs)
+    raise ValueError(f"Mode inconnu : {mode}")
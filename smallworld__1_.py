@@ -7,57 +7,48 @@ Original file is located at
     https://colab.research.google.com/drive/1S56GrjfhhuGO_Qnb6Camf-tPNabOZlD1
 """
 
-import pandas as pd
-
-df = pd.read_json('baba.jsonl', lines=True, orient='records')
-
-pd.set_option('display.max_colwidth', None)
-
-pd.set_option('display.max_columns', None)
+import numpy as np
+from degree_stream import scan_jsonl, degree_histogram
 
-df['nombre_co_authors'] = df['coauthors'].apply(lambda x: len(x) if isinstance(x, list) else 0)
+# Une seule lecture de baba.jsonl, ligne par ligne (pas de DataFrame) :
+# histogramme du nombre de co-auteurs par auteur + liste des liens du graphe
+histogramme, liens = scan_jsonl('baba.jsonl')
+graph = liens.build()
 
-print(df.size)
-print(df.head())
+print(f"{histogramme.total} auteurs lus, {histogramme.zeros} sans co-auteur")
 
 import matplotlib.pyplot as plt
-import seaborn as sns
 
-# On utilise votre colonne calculée précédemment
+# Classes logarithmiques : la "Long Tail" reste lisible sur plusieurs décades.
+# density() divise chaque classe par le nombre de degrés entiers qu'elle couvre.
+histogramme_graphe = degree_histogram(graph)
 plt.figure(figsize=(10, 6))
-sns.histplot(df['nombre_co_authors'], bins=30, kde=True, color='skyblue')
+plt.stairs(histogramme.density(), histogramme.edges(), fill=True, color='skyblue',
+           label='Co-auteurs listés (auteurs du JSONL)')
+plt.stairs(histogramme_graphe.density(), histogramme_graphe.edges(), color='steelblue',
+           label='Degré dans le graphe (tous les noeuds)')
 
 plt.title('Distribution du nombre de co-auteurs (Degree Distribution)')
 plt.xlabel('Nombre de co-auteurs')
-plt.ylabel("Nombre d'auteurs (Fréquence)")
+plt.ylabel("Nombre d'auteurs par valeur de degré")
+plt.xscale('log')
 plt.yscale('log') # ASTUCE : L'échelle log permet de mieux voir la "Long Tail" typique des Small Worlds
+plt.legend()
 
 plt.show()
 
 import networkx as nx
 
-# Création du graphe vide
-G = nx.Graph()
-
-# On boucle sur chaque ligne du DataFrame pour créer les liens
-for index, row in df.iterrows():
-    auteur_principal = row['author'] # ou le nom de la colonne auteur
-    co_auteurs = row['coauthors']
-
-    # Si co_authors est une liste, on crée un lien pour chaque co-auteur
-    if isinstance(co_auteurs, list):
-        for co_auteur in co_auteurs:
-            # On ajoute un lien (edge) entre l'auteur et son co-auteur
-            G.add_edge(auteur_principal, co_auteur)
-
-print(f"Nombre de nœuds (auteurs) : {G.number_of_nodes()}")
-print(f"Nombre de liens (collaborations) : {G.number_of_edges()}")
+# Le graphe CSR est construit à partir de la même lecture (liste de liens
+# dédoublonnée), au lieu d'une boucle iterrows sur un DataFrame
+print(f"Nombre de nœuds (auteurs) : {graph.n_nodes}")
+print(f"Nombre de liens (collaborations) : {graph.n_edges}")
 
-degres = dict(G.degree) # Dictionnaire {auteur: nombre_liens}
-top_auteurs = sorted(degres, key=degres.get, reverse=True)[:50] # Les 50 plus gros
+# 1. Les 50 plus gros collaborateurs (seul ce petit sous-graphe passe par NetworkX)
+top_ids = np.argsort(-graph.degrees(), kind='stable')[:50]
 
 # 2. On crée un sous-graphe avec juste ces gens-là
-sub_G = G.subgraph(top_auteurs)
+sub_G = graph.subgraph(top_ids).to_networkx()
 
 # 3. On dessine
 plt.figure(figsize=(12, 12))
@@ -76,40 +67,42 @@ plt.show()
 
 import networkx as nx
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import random
+
+from csr_graph import largest_component
+from hyperanf import neighbourhood_function, distance_distribution, average_distance, effective_diameter
+from path_length import estimate_path_length
 
 # 1. Préparation : On prend la plus grande composante connectée
 # (On ne peut pas calculer de chemin si les gens ne sont pas reliés du tout)
-# Si ton graphe s'appelle G
-G_main = G.subgraph(max(nx.connected_components(G), key=len))
-print(f"Calcul sur la composante principale : {len(G_main)} noeuds")
-
-# 2. L'Astuce : Échantillonnage (Sampling)
-# Calculer les chemins entre TOUS les nœuds est trop long (O(N^2)).
-# On va prendre 100 nœuds au hasard et calculer leur distance vers tous les autres.
-n_samples = 100
-random_nodes = random.sample(list(G_main.nodes()), n_samples)
-
-all_distances = []
-
-print("Calcul des distances en cours...")
-for source in random_nodes:
-    # Calcule la distance de ce noeud vers tous les autres
-    lengths = nx.single_source_shortest_path_length(G_main, source)
-    # On garde toutes les longueurs (sauf 0, qui est la distance vers soi-même)
-    all_distances.extend([d for d in lengths.values() if d > 0])
+graph_main = graph.subgraph(largest_component(graph))
+print(f"Calcul sur la composante principale : {graph_main.n_nodes} noeuds")
+
+# 2. HyperANF : au lieu d'échantillonner 100 sources, chaque noeud garde un
+# compteur HyperLogLog de sa boule de rayon t, fusionné avec ses voisins à
+# chaque passe. On obtient la distribution des distances de TOUTES les paires
+# en quelques passes linéaires, sans stocker la moindre distance.
+print("Calcul de la fonction de voisinage (HyperANF)...")
+nf = neighbourhood_function(graph_main)
+distances = np.arange(1, len(nf))
+probas = distance_distribution(nf)
+mu = average_distance(nf)
+diametre_effectif = effective_diameter(nf)
+print(f"Distance moyenne : {mu:.2f} | Diamètre effectif (90%) : {diametre_effectif:.2f}")
+
+# Contrôle par BFS exacts : sources tirées par lots jusqu'à ±1 % (IC 95 %)
+L_bfs, (L_bas, L_haut), n_bfs = estimate_path_length(graph_main, rel_error=0.01)
+print(f"Distance moyenne (BFS échantillonnés) : {L_bfs:.2f} [{L_bas:.2f}, {L_haut:.2f}] avec {n_bfs} BFS")
 
 # 3. Affichage de la Loi Normale
 plt.figure(figsize=(10, 6))
 
-# Histogramme avec la courbe de densité (KDE) qui devrait ressembler à une cloche
-sns.histplot(all_distances, discrete=True, stat="density", kde=True, color='mediumseagreen', alpha=0.6)
+# Histogramme de la distribution estimée (une barre par distance)
+plt.bar(distances, probas, width=1.0, color='mediumseagreen', alpha=0.6, edgecolor='white')
 
 # On ajoute une vraie courbe normale théorique par-dessus pour comparer
-mu, std = np.mean(all_distances), np.std(all_distances)
-x = np.linspace(min(all_distances), max(all_distances), 100)
+std = np.sqrt(np.sum(probas * (distances - mu) ** 2))
+x = np.linspace(distances.min(), distances.max(), 100)
 p = (1 / (std * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x - mu) / std) ** 2)
 plt.plot(x, p, 'r--', linewidth=2, label='Loi Normale Théorique')
 
@@ -120,93 +113,44 @@ plt.legend()
 plt.grid(axis='y', alpha=0.5)
 plt.show()
 
-import networkx as nx
 import matplotlib.pyplot as plt
-import random
-import math
+import numpy as np
+from force_layout import force_layout
 
 # ==========================================
-# 1. PRÉPARATION (On garde environ 400 sommets)
+# 1. PRÉPARATION
 # ==========================================
-# On prend un sous-ensemble pour que les boucles for ne durent pas une éternité
-N_TARGET = 800
+# Le placement Barnes-Hut (force_layout.py) coûte O(N log N) par itération au
+# lieu de O(N²) : on place toute la composante principale.
+# N_TARGET limite aux auteurs les plus connectés (None : toute la composante).
+N_TARGET = None
 
-if len(G) > N_TARGET:
+if N_TARGET is not None and graph_main.n_nodes > N_TARGET:
     # On prend les noeuds les plus connectés
-    degres = dict(G.degree)
-    top_nodes = sorted(degres, key=degres.get, reverse=True)[:N_TARGET]
-    sub_G = G.subgraph(top_nodes).copy()
+    top_ids = np.sort(np.argsort(-graph_main.degrees(), kind='stable')[:N_TARGET])
+    sub_graph = graph_main.subgraph(top_ids)
 else:
-    sub_G = G.copy()
+    sub_graph = graph_main
 
-nodes = list(sub_G.nodes())
+nodes = list(sub_graph.names)
 
 # ==========================================
 # 2. INITIALISATION
 # ==========================================
-# Dictionnaire pour stocker les positions : { "Auteur": [x, y], ... }
-positions = {node: [random.random(), random.random()] for node in nodes}
-
 # Tes paramètres
 b = 0.05        # Vitesse de déplacement
 ITERATIONS = 50 # Nombre de fois qu'on applique la formule
 
-print(f"Démarrage de la simulation 'non optimisée' sur {len(nodes)} noeuds...")
+print(f"Démarrage de la simulation sur {len(nodes)} noeuds...")
 
 # ==========================================
-# 3. LA FORMULE EXACTE (Double Boucle)
+# 3. LA FORMULE (inchangée)
 # ==========================================
-
-for it in range(ITERATIONS):
-    # On crée un dictionnaire pour stocker les nouvelles positions de ce tour
-    nouvelles_positions = {}
-
-    # Pour chaque point A
-    for node_A in nodes:
-        pos_A = positions[node_A]
-        deplacement_x = 0
-        deplacement_y = 0
-
-        # On regarde l'interaction avec tous les points B
-        for node_B in nodes:
-            if node_A == node_B:
-                continue # On ne calcule pas la force sur soi-même
-
-            pos_B = positions[node_B]
-
-            # Calcul du vecteur (PosB - PosA)
-            vecteur_x = pos_B[0] - pos_A[0]
-            vecteur_y = pos_B[1] - pos_A[1]
-
-            # Calcul de la distance au carré ||PosB - PosA||^2
-            dist_carre = vecteur_x**2 + vecteur_y**2
-
-            # Petite sécurité pour ne pas diviser par 0 si deux points sont collés
-            if dist_carre < 0.00001:
-                dist_carre = 0.00001
-
-            # exists_link(A,B) : 1 si lien, -1 sinon
-            if sub_G.has_edge(node_A, node_B):
-                signe = 1
-            else:
-                signe = -1
-
-            # TA FORMULE : signe * b * (vecteur / dist²)
-            # On factorise pour le calcul
-            facteur = (signe * b) / dist_carre
-
-            # On ajoute cette force au déplacement total de A
-            deplacement_x += facteur * vecteur_x
-            deplacement_y += facteur * vecteur_y
-
-        # Fin de la boucle sur B : on calcule la nouvelle position de A
-        nouveau_x = pos_A[0] + deplacement_x
-        nouveau_y = pos_A[1] + deplacement_y
-
-        nouvelles_positions[node_A] = [nouveau_x, nouveau_y]
-
-    # Fin de la boucle sur A : on met à jour tout le monde pour le tour suivant
-    positions = nouvelles_positions
+# Pour chaque point A, somme sur tous les B de signe * b * (PosB - PosA) / dist²
+# (signe = +1 si lien, -1 sinon), toutes les positions mises à jour ensemble.
+# La répulsion des noeuds lointains est regroupée par cellules (quadtree),
+# l'attraction est calculée exactement sur la liste des liens.
+coords = force_layout(sub_graph, ITERATIONS, b)
 
 print("Calcul terminé.")
 
@@ -215,112 +159,81 @@ print("Calcul terminé.")
 # ==========================================
 
 # Récupération des coordonnées pour le plot
-X = [positions[n][0] for n in nodes]
-Y = [positions[n][1] for n in nodes]
+X = coords[:, 0]
+Y = coords[:, 1]
 
-# Récupération de la couleur (selon le degré)
+# Au-delà de SCATTER_MAX_POINTS, un marqueur par point devient trop lent :
+# on range les points dans une image de taille fixe (density_raster.py)
+from density_raster import render_density
+SCATTER_MAX_POINTS = 100_000
 
 plt.figure(figsize=(10, 10)) # Fond noir
 
-plt.scatter(
-    X, Y,
-    s=30,           # Taille des points
-    alpha=0.8,
-    edgecolors='none'
-)
+if len(nodes) > SCATTER_MAX_POINTS:
+    plt.imshow(render_density(X, Y, agg='count', cmap='viridis'))
+else:
+    plt.scatter(
+        X, Y,
+        s=min(30, 30 * 800 / len(nodes)), # Taille des points (plus petits quand il y en a beaucoup)
+        alpha=0.8,
+        edgecolors='none'
+    )
 
 plt.axis('off') # Pas d'axes
-plt.title("Simulation Spatiale (Implémentation Naïve)", color='white')
+plt.title("Simulation Spatiale (Barnes-Hut)", color='white')
 plt.show()
 
-import networkx as nx
 import matplotlib.pyplot as plt
-import random
-import math
+import numpy as np
+from force_layout import force_layout
 
 # ==========================================
 # 1. PRÉPARATION
 # ==========================================
-N_TARGET = 800
-
-if len(G) > N_TARGET:
-    degres = dict(G.degree)
-    top_nodes = sorted(degres, key=degres.get, reverse=True)[:N_TARGET]
-    sub_G = G.subgraph(top_nodes).copy()
+# Densités et clusters passent par un KD-tree (spatial_density.py) : on peut
+# travailler sur toute la composante principale (N_TARGET = None).
+N_TARGET = None
+# En dessous de cette taille, placement exact sur toutes les paires ; au-dessus, Barnes-Hut
+EXACT_MAX_NODES = 2000
+
+if N_TARGET is not None and graph_main.n_nodes > N_TARGET:
+    top_ids = np.sort(np.argsort(-graph_main.degrees(), kind='stable')[:N_TARGET])
+    sub_graph = graph_main.subgraph(top_ids)
 else:
-    sub_G = G.copy()
+    sub_graph = graph_main
 
-nodes = list(sub_G.nodes())
+nodes = list(sub_graph.names)
 
 # ==========================================
 # 2. INITIALISATION
 # ==========================================
-positions = {node: [random.random(), random.random()] for node in nodes}
-
 b = 0.05
 ITERATIONS = 50
 
 print(f"Démarrage de la simulation sur {len(nodes)} noeuds...")
 
 # ==========================================
-# 3. PHYSIQUE (Ta formule inchangée)
+# 3. PHYSIQUE (Ta formule inchangée, voir force_layout.py)
 # ==========================================
-
-for it in range(ITERATIONS):
-    nouvelles_positions = {}
-
-    for node_A in nodes:
-        pos_A = positions[node_A]
-        deplacement_x = 0
-        deplacement_y = 0
-
-        for node_B in nodes:
-            if node_A == node_B: continue
-
-            pos_B = positions[node_B]
-            vecteur_x = pos_B[0] - pos_A[0]
-            vecteur_y = pos_B[1] - pos_A[1]
-            dist_carre = vecteur_x**2 + vecteur_y**2
-
-            if dist_carre < 0.00001: dist_carre = 0.00001
-
-            if sub_G.has_edge(node_A, node_B): signe = 1
-            else: signe = -1
-
-            facteur = (signe * b) / dist_carre
-            deplacement_x += facteur * vecteur_x
-            deplacement_y += facteur * vecteur_y
-
-        nouveau_x = pos_A[0] + deplacement_x
-        nouveau_y = pos_A[1] + deplacement_y
-        nouvelles_positions[node_A] = [nouveau_x, nouveau_y]
-
-    positions = nouvelles_positions
+coords = force_layout(sub_graph, ITERATIONS, b, exact=len(nodes) <= EXACT_MAX_NODES)
 
 print("Calcul physique terminé.")
 
 # ==========================================
 # 4. CALCUL DE LA DENSITÉ BRUTE
 # ==========================================
-X = [positions[n][0] for n in nodes]
-Y = [positions[n][1] for n in nodes]
+X = coords[:, 0]
+Y = coords[:, 1]
 
-largeur_graph = max(X) - min(X)
-rayon_proximite = largeur_graph * 0.05
-rayon_carre = rayon_proximite**2
+from spatial_density import SpatialIndex
 
-densites_brutes = []
+largeur_graph = X.max() - X.min()
+rayon_proximite = largeur_graph * 0.05
 
+# Nombre de points (soi compris) à moins de rayon_proximite, via un KD-tree
 print("Calcul des densités...")
-for i in range(len(nodes)):
-    voisins = 0
-    pos_A_x = X[i]
-    pos_A_y = Y[i]
-    for j in range(len(nodes)):
-        dist_sq = (X[j] - pos_A_x)**2 + (Y[j] - pos_A_y)**2
-        if dist_sq < rayon_carre:
-            voisins += 1
-    densites_brutes.append(voisins)
+index_spatial = SpatialIndex(coords)
+densites_brutes = index_spatial.radius_counts(rayon_proximite)
 
 # ==========================================
 # 5. APPLICATION DU SEUIL (La partie magique)
@@ -335,28 +248,26 @@ max_densite = max(densites_brutes)
 RATIO_SEUIL = 0.20
 seuil_coupure = max_densite * RATIO_SEUIL
 
-densites_visuelles = []
-
-for d in densites_brutes:
-    # Si la densité dépasse le seuil, on la bloque au seuil
-    if d > seuil_coupure:
-        densites_visuelles.append(seuil_coupure)
-    else:
-        densites_visuelles.append(d)
+# Si la densité dépasse le seuil, on la bloque au seuil
+densites_visuelles = np.minimum(densites_brutes, seuil_coupure)
 
 # ==========================================
 # 6. AFFICHAGE
 # ==========================================
 plt.figure(figsize=(10, 10), facecolor='black')
 
-plt.scatter(
-    X, Y,
-    c=densites_visuelles,    # On utilise la densité "coupée"
-    cmap='inferno',
-    s=35,
-    alpha=0.9,
-    edgecolors='none'
-)
+if len(nodes) > SCATTER_MAX_POINTS:
+    # Image : densité maximale des points de chaque pixel, même seuil de saturation
+    plt.imshow(render_density(X, Y, densites_brutes, agg='max', ratio=RATIO_SEUIL, cmap='inferno'))
+else:
+    plt.scatter(
+        X, Y,
+        c=densites_visuelles,    # On utilise la densité "coupée"
+        cmap='inferno',
+        s=min(35, 35 * 800 / len(nodes)),
+        alpha=0.9,
+        edgecolors='none'
+    )
 
 plt.title(f"Visualisation avec seuil de saturation (Max={int(seuil_coupure)})", color='white')
 plt.axis('off')
@@ -365,6 +276,7 @@ plt.show()
 import matplotlib.pyplot as plt
 import numpy as np
 from sklearn.cluster import KMeans
+from spatial_density import dbscan
 
 # 1. PRÉPARATION DES DONNÉES
 # On combine X et Y pour faire un tableau de points [[x1, y1], [x2, y2], ...]
@@ -375,29 +287,51 @@ data_points = np.column_stack((X, Y))
 # Combien de groupes vois-tu à l'œil nu ? Disons 5 pour l'exemple.
 # Dans un vrai rapport, on utilise la méthode du "Coude" (Elbow) pour trouver ce chiffre.
 K = 20
+# "kmeans" : K groupes imposés ; "dbscan" : groupes de points denses, nombre libre,
+# calculés avec le même KD-tree et le même rayon que les densités ci-dessus
+METHODE_CLUSTERING = "kmeans"
+DBSCAN_MIN_POINTS = 10
+
+if METHODE_CLUSTERING == "dbscan":
+    print(f"Lancement du DBSCAN (rayon {rayon_proximite:.3g}, {DBSCAN_MIN_POINTS} points minimum)...")
+    labels = dbscan(data_points, rayon_proximite, DBSCAN_MIN_POINTS,
+                    index=index_spatial, counts=densites_brutes)
+    K = int(labels.max()) + 1
+    # Centre de gravité de chaque cluster (le bruit, étiquette -1, n'en a pas)
+    groupe = labels >= 0
+    taille = np.bincount(labels[groupe], minlength=K)
+    centers = np.column_stack([np.bincount(labels[groupe], weights=data_points[groupe, axe], minlength=K)
+                               for axe in range(2)]) / taille[:, None]
+    print(f"{K} clusters, {int((~groupe).sum())} points isolés (bruit).")
+else:
+    print(f"Lancement du K-Means pour trouver {K} clusters...")
 
-print(f"Lancement du K-Means pour trouver {K} clusters...")
-
-# 3. L'ALGORITHME K-MEANS
-kmeans = KMeans(n_clusters=K, random_state=42, n_init=10)
-kmeans.fit(data_points)
+    # 3. L'ALGORITHME K-MEANS
+    kmeans = KMeans(n_clusters=K, random_state=42, n_init=10)
+    kmeans.fit(data_points)
 
-# On récupère les résultats
-labels = kmeans.labels_       # À quel groupe appartient chaque point (0, 1, 2...)
-centers = kmeans.cluster_centers_ # Les coordonnées du centre de chaque cluster
+    # On récupère les résultats
+    labels = kmeans.labels_       # À quel groupe appartient chaque point (0, 1, 2...)
+    centers = kmeans.cluster_centers_ # Les coordonnées du centre de chaque cluster
 
 # 4. AFFICHAGE
 plt.figure(figsize=(10, 10), facecolor='black')
 
 # On dessine les points, colorés selon leur cluster (c=labels)
-plt.scatter(
-    X, Y,
-    c=labels,          # La couleur dépend du numéro du cluster
-    cmap='Set1',       # Une palette avec des couleurs bien distinctes (Rouge, Bleu, Vert...)
-    s=30,
-    alpha=0.8,
-    edgecolors='none'
-)
+if len(nodes) > SCATTER_MAX_POINTS:
+    # Image : plus grand numéro de cluster du pixel (+1 pour que le bruit, -1, reste noir).
+    # extent aligne l'image sur les coordonnées, pour y superposer les centroïdes.
+    plt.imshow(render_density(X, Y, labels + 1, agg='max', cmap='Set1'),
+               extent=(X.min(), X.max(), Y.min(), Y.max()))
+else:
+    plt.scatter(
+        X, Y,
+        c=labels,          # La couleur dépend du numéro du cluster
+        cmap='Set1',       # Une palette avec des couleurs bien distinctes (Rouge, Bleu, Vert...)
+        s=min(30, 30 * 800 / len(nodes)),
+        alpha=0.8,
+        edgecolors='none'
+    )
 
 # On dessine les CENTROÏDES (les croix blanches)
 # C'est le "centre de gravité" de chaque groupe calculé par K-Means
@@ -411,7 +345,7 @@ plt.scatter(
     label='Centraux (Centroids)'
 )
 
-plt.title(f"Clustering K-Means (K={K}) appliqué sur ta simulation", color='white')
+plt.title(f"Clustering {'DBSCAN' if METHODE_CLUSTERING == 'dbscan' else 'K-Means'} (K={K}) appliqué sur ta simulation", color='white')
 plt.axis('off')
 plt.legend()
 plt.show()
\ No newline at end of file
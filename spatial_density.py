@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+# --- Densité locale et clustering des positions du placement ---
+#
+# La "densité brute" du notebook est, pour chaque point, le nombre de points
+# (lui compris) à distance strictement inférieure à rayon_proximite. Un
+# KD-tree (scipy.spatial.cKDTree) répond à ces requêtes de rayon en
+# O(log N + k) par point au lieu de comparer toutes les paires.
+#
+# Le même index sert à un DBSCAN (alternative à KMeans(K) qui n'impose pas le
+# nombre de groupes) :
+#   - un point est "coeur" s'il a au moins min_samples points (lui compris)
+#     à moins de eps : c'est la densité brute avec rayon eps ;
+#   - les coeurs à moins de eps l'un de l'autre sont dans le même cluster
+#     (union-find sur les paires, calculées par blocs pour borner la mémoire) ;
+#   - un point non coeur à moins de eps d'un coeur rejoint le cluster du coeur
+#     le plus proche, les autres sont du bruit (étiquette -1).
+
+CHUNK_POINTS = 4096
+
+
+class SpatialIndex:
+    """ Index KD-tree sur des positions 2D (tableau n x 2). """
+
+    def __init__(self, points: np.ndarray):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.tree = cKDTree(self.points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def radius_counts(self, radius: float, points: np.ndarray = None) -> np.ndarray:
+        """ Nombre de points indexés à distance < radius de chaque point (par défaut : les points indexés). """
+        points = self.points if points is None else points
+        # cKDTree compte les distances <= r : on prend le flottant juste en dessous
+        strict = np.nextafter(radius, 0.0)
+        return np.asarray(self.tree.query_ball_point(points, strict, return_length=True, workers=-1))
+
+
+def radius_counts(points: np.ndarray, radius: float) -> np.ndarray:
+    return SpatialIndex(points).radius_counts(radius)
+
+
+def _find_roots(parent: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    roots = parent[nodes]
+    while True:
+        up = parent[roots]
+        if np.array_equal(up, roots):
+            return roots
+        roots = up
+
+
+def _union(parent: np.ndarray, u: np.ndarray, v: np.ndarray):
+    """ Union-find vectorisé : relie les racines des paires (u, v) jusqu'à stabilité. """
+    while u.size:
+        ru, rv = _find_roots(parent, u), _find_roots(parent, v)
+        differ = ru != rv
+        if not differ.any():
+            return
+        ru, rv = ru[differ], rv[differ]
+        lo, hi = np.minimum(ru, rv), np.maximum(ru, rv)
+        np.minimum.at(parent, hi, lo)
+        u, v = lo, hi
+        # Compression des chemins pour garder les recherches courtes
+        parent[:] = parent[parent]
+
+
+def dbscan(points: np.ndarray, eps: float, min_samples: int = 5, index: SpatialIndex = None,
+           counts: np.ndarray = None, chunk_points: int = CHUNK_POINTS) -> np.ndarray:
+    """
+    Étiquettes de cluster (0, 1, ... dans l'ordre d'apparition), -1 pour le bruit.
+    `index` et `counts` (densités de rayon eps) peuvent être réutilisés
+    depuis l'étape de densité.
+    """
+    index = index or SpatialIndex(points)
+    points = index.points
+    if counts is None:
+        counts = index.radius_counts(eps)
+    strict = np.nextafter(eps, 0.0)
+    core = np.flatnonzero(counts >= min_samples)
+    labels = np.full(len(points), -1, dtype=np.int64)
+    if not core.size:
+        return labels
+
+    core_tree = cKDTree(points[core])
+    parent = np.arange(len(core))
+    for start in range(0, len(core), chunk_points):
+        block = np.arange(start, min(len(core), start + chunk_points))
+        neighbours = core_tree.query_ball_point(points[core[block]], strict, workers=-1)
+        lengths = np.array([len(nb) for nb in neighbours])
+        if not lengths.sum():
+            continue
+        u = np.repeat(block, lengths)
+        v = np.concatenate([np.asarray(nb, dtype=np.int64) for nb in neighbours])
+        keep = u < v
+        _union(parent, u[keep], v[keep])
+    roots = _find_roots(parent, np.arange(len(core)))
+    labels[core] = roots
+
+    # Points de bordure : cluster du coeur le plus proche à moins de eps
+    border = np.setdiff1d(np.arange(len(points)), core)
+    if border.size:
+        dist, nearest = core_tree.query(points[border], distance_upper_bound=eps, workers=-1)
+        attached = dist < eps
+        labels[border[attached]] = roots[nearest[attached]]
+
+    # Renumérotation 0..k-1 dans l'ordre d'apparition des points
+    clustered = labels >= 0
+    _, first, inverse = np.unique(labels[clustered], return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    labels[clustered] = rank[inverse]
+    return labels
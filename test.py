@@ -1,15 +1,19 @@
-import networkx as nx
 import pandas as pd
-import json
-import random
 import matplotlib.pyplot as plt
 import numpy as np
-from tqdm import tqdm
+from edge_attack import EdgeMask, classify_edges, sweep_removals
+from path_length import estimate_path_length
+from percolation import percolation_curve, sample_curve
+from graph_snapshot import load_graph
 
 # --- CONFIGURATION RAPIDE ---
 JSON_FILE = "graphe_bengio_network__clean_Copie_.jsonl"
 CSV_FILE = "auteurs_avec_excentricite_filtree_et_domaine.csv"
-SAMPLE_SIZE = 15 # Nombre de noeuds pour estimer L (pour aller vite)
+REL_ERROR = 0.02 # Précision relative visée pour L : autant de BFS que nécessaire, pas plus
+CONFIDENCE = 0.95
+PERCENTAGES = [0, 0.05, 0.10, 0.15] # Niveaux de coupe, balayés en une seule passe
+MODE = "distance" # "distance" (L échantillonné, PERCENTAGES) ou "percolation" (composante géante, 0-100 %)
+PERCOLATION_ORDERS = ['inter', 'intra', 'random', 'hub']
 
 def load_data():
     print("1. Chargement des données...")
@@ -18,107 +22,52 @@ def load_data():
     # Dictionnaire {Auteur: Domaine}
     domains = df.set_index('Auteur')['Domaine_Dominant'].to_dict()
     
-    # Charger le Graphe
-    G = nx.Graph()
-    with open(JSON_FILE, 'r') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                src = data.get("author")
-                coauthors = data.get("coauthors", [])
-                if src:
-                    # On note le domaine du noeud
-                    G.add_node(src, domain=domains.get(src, "Inconnu"))
-                    for dst in coauthors:
-                        if dst != src:
-                            G.add_node(dst, domain=domains.get(dst, "Inconnu"))
-                            G.add_edge(src, dst)
-            except: continue
-    return G
-
-def get_sampled_average_path_length(G, n_samples=50):
-    """ Calcule L approximatif sur la plus grande composante connexe """
-    if len(G) == 0: return 0
-    
-    # On travaille uniquement sur la composante géante (LCC)
-    largest_cc = max(nx.connected_components(G), key=len)
-    subG = G.subgraph(largest_cc)
-    
-    nodes = list(subG.nodes())
-    # Si le graphe est petit, on prend tout, sinon on échantillonne
-    sources = random.sample(nodes, min(n_samples, len(nodes)))
-    
-    total_path_lengths = 0
-    count = 0
-    
-    for source in sources:
-        lengths = nx.single_source_shortest_path_length(subG, source)
-        # On ne garde que les distances > 0
-        total_path_lengths += sum(lengths.values())
-        count += len(lengths) - 1 # -1 pour ne pas compter soi-même
-        
-    return total_path_lengths / count if count > 0 else 0
+    # Charger le Graphe (snapshot binaire, reconstruit si le JSONL a changé)
+    graph = load_graph(JSON_FILE)
+    node_domains = np.array([domains.get(n, "Inconnu") for n in graph.names], dtype=object)
+    return graph, node_domains
 
 def run_attack():
-    G = load_data()
-    print(f"Graphe initial : {len(G.nodes())} noeuds, {len(G.edges())} liens.")
-    
-    # 2. Classification des Liens
-    inter_edges = []
-    intra_edges = []
+    graph, node_domains = load_data()
+    print(f"Graphe initial : {graph.n_nodes} noeuds, {graph.n_edges} liens.")
     
+    # 2. Classification des Liens (un rang par lien de graph.edge_array())
     print("Classification des arêtes...")
-    for u, v in G.edges():
-        dom_u = G.nodes[u].get('domain', 'Inconnu')
-        dom_v = G.nodes[v].get('domain', 'Inconnu')
-        
-        if dom_u != "Inconnu" and dom_v != "Inconnu" and dom_u != dom_v:
-            inter_edges.append((u, v))
-        else:
-            intra_edges.append((u, v))
+    is_inter = classify_edges(graph, node_domains)
+    inter_edges = np.flatnonzero(is_inter)
+    intra_edges = np.flatnonzero(~is_inter)
             
     print(f"-> Liens Inter-Domaines (Ponts) : {len(inter_edges)}")
     print(f"-> Liens Intra-Domaines (Communautés) : {len(intra_edges)}")
 
-    # 3. Simulation
-    results = {'Inter': [], 'Intra': []}
-    percentages = [0, 0.05, 0.10, 0.15]
-# On coupe 0%, 10%, 30%, 50%
+    # 3. Simulation : les suppressions sont un masque sur le graphe CSR, pas de copie
+    results = {}
+    percentages = PERCENTAGES
+    mask = EdgeMask(graph)
     
-    initial_L = get_sampled_average_path_length(G, SAMPLE_SIZE)
-    print(f"Distance Moyenne (L) Initiale : {initial_L:.2f}")
+    initial_L, (low, high), n_bfs = estimate_path_length(graph, REL_ERROR, CONFIDENCE)
+    print(f"Distance Moyenne (L) Initiale : {initial_L:.2f} [{low:.2f}, {high:.2f}] ({n_bfs} BFS)")
     
-    # --- Attaque INTER ---
-    print("\n--- Attaque INTER-DOMAINES ---")
-    for p in percentages:
-        G_temp = G.copy()
-        n_remove = int(len(inter_edges) * p)
-        if n_remove > 0:
-            edges_to_remove = random.sample(inter_edges, n_remove)
-            G_temp.remove_edges_from(edges_to_remove)
-        
-        L = get_sampled_average_path_length(G_temp, SAMPLE_SIZE)
-        results['Inter'].append(L)
-        print(f"Coupe {int(p*100)}% : L = {L:.2f}")
-
-    # --- Attaque INTRA ---
-    print("\n--- Attaque INTRA-DOMAINES ---")
-    for p in percentages:
-        G_temp = G.copy()
-        n_remove = int(len(intra_edges) * p) # On enlève le MÊME NOMBRE de liens que pour inter pour être fair-play ? 
-        # NON, on enlève le même pourcentage de la catégorie pour tester la robustesse structurelle
-        if n_remove > 0:
-            edges_to_remove = random.sample(intra_edges, n_remove)
-            G_temp.remove_edges_from(edges_to_remove)
-            
-        L = get_sampled_average_path_length(G_temp, SAMPLE_SIZE)
-        results['Intra'].append(L)
-        print(f"Coupe {int(p*100)}% : L = {L:.2f}")
+    def measure(alive):
+        return estimate_path_length(graph, REL_ERROR, CONFIDENCE, edge_mask=alive)
+    
+    # On enlève le même pourcentage de chaque catégorie pour tester la robustesse structurelle
+    for key, label, edges in (('Inter', "INTER-DOMAINES", inter_edges),
+                              ('Intra', "INTRA-DOMAINES", intra_edges)):
+        print(f"\n--- Attaque {label} ---")
+        results[key] = sweep_removals(mask, edges, percentages, measure)
+        for p, (L, (low, high), n_bfs) in zip(percentages, results[key]):
+            print(f"Coupe {int(p*100)}% : L = {L:.2f} [{low:.2f}, {high:.2f}] ({n_bfs} BFS)")
 
-    # 4. Plot Rapide
+    # 4. Plot Rapide (barres : intervalle de confiance de L)
+    def errorbar(key, style, label, **kwargs):
+        L = np.array([estimate[0] for estimate in results[key]])
+        bounds = np.array([estimate[1] for estimate in results[key]])
+        plt.errorbar(percentages, L, yerr=[L - bounds[:, 0], bounds[:, 1] - L], fmt=style, label=label, capsize=3, **kwargs)
+    
     plt.figure(figsize=(8, 5))
-    plt.plot(percentages, results['Inter'], 'r-o', label='Coupe Inter-Domaines (Ponts)', linewidth=3)
-    plt.plot(percentages, results['Intra'], 'g--o', label='Coupe Intra-Domaines (Communautés)')
+    errorbar('Inter', 'r-o', 'Coupe Inter-Domaines (Ponts)', linewidth=3)
+    errorbar('Intra', 'g--o', 'Coupe Intra-Domaines (Communautés)')
     plt.title("Impact de la suppression des liens sur la Distance Moyenne (L)")
     plt.xlabel("% de liens supprimés")
     plt.ylabel("Distance Moyenne (L)")
@@ -126,4 +75,34 @@ def run_attack():
     plt.grid(True)
     plt.show()
 
-run_attack()
\ No newline at end of file
+def run_percolation():
+    """ Taille de la composante géante pour toute fraction supprimée (Newman-Ziff, une passe par ordre). """
+    graph, node_domains = load_data()
+    print(f"Graphe initial : {graph.n_nodes} noeuds, {graph.n_edges} liens.")
+    is_inter = classify_edges(graph, node_domains)
+    
+    labels = {
+        'inter': ('r-', 'Liens Inter-Domaines (Ponts)'),
+        'intra': ('g--', 'Liens Intra-Domaines (Communautés)'),
+        'random': ('b:', 'Liens au hasard'),
+        'hub': ('k-.', 'Noeuds par degré décroissant (hubs)'),
+    }
+    plt.figure(figsize=(8, 5))
+    for kind in PERCOLATION_ORDERS:
+        fractions, giant = percolation_curve(graph, kind, is_inter)
+        summary = ", ".join(f"{int(p*100)}% -> {size:.3f}" for p, size in zip(PERCENTAGES, sample_curve(giant, PERCENTAGES)))
+        print(f"{kind:>6} : {summary}")
+        style, label = labels[kind]
+        plt.plot(fractions, giant, style, label=label)
+    plt.title("Taille de la composante géante selon la fraction supprimée")
+    plt.xlabel("Fraction supprimée")
+    plt.ylabel("Fraction des noeuds dans la composante géante")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+if __name__ == "__main__":
+    if MODE == "percolation":
+        run_percolation()
+    else:
+        run_attack()
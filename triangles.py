@@ -0,0 +1,77 @@
+import numpy as np
+from csr_graph import CSRGraph, neighbor_slots
+
+# --- Comptage de triangles sur tout le graphe ---
+#
+# Orientation par degré : chaque lien est orienté du noeud de plus petit rang
+# (degré, puis ID) vers le plus grand. Chaque triangle {u, v, w} est alors vu
+# exactement une fois, depuis son sommet de plus petit rang, et aucun noeud
+# n'a plus de O(sqrt(m)) voisins sortants : les hubs ne coûtent plus k².
+#
+# Pour chaque lien orienté (u, v) on parcourt les voisins sortants w de v et
+# on teste si (u, w) existe par recherche dichotomique dans la liste triée
+# des liens orientés. Les paires (u, v) sont traitées par blocs vectorisés
+# dont la taille (en nombre de "coins" u-v-w testés) est bornée.
+
+BLOCK_WEDGES = 1 << 22
+
+
+def _oriented_adjacency(graph: CSRGraph) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ (indptr, src, dst) des liens orientés vers le rang croissant, triés par (src, dst). """
+    n = graph.n_nodes
+    degrees = graph.degrees()
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degrees))] = np.arange(n)
+    rows = np.repeat(np.arange(n, dtype=np.int64), degrees)
+    cols = np.asarray(graph.indices, dtype=np.int64)
+    keep = rank[rows] < rank[cols]
+    src, dst = rows[keep], cols[keep]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, src, dst
+
+
+def count_triangles(graph: CSRGraph, block_wedges: int = BLOCK_WEDGES) -> np.ndarray:
+    """ Nombre de triangles auxquels participe chaque noeud. """
+    n = graph.n_nodes
+    triangles = np.zeros(n, dtype=np.int64)
+    indptr, src, dst = _oriented_adjacency(graph)
+    if len(src) == 0:
+        return triangles
+    # Les liens orientés triés par (src, dst) forment une table de clés triée
+    keys = src * n + dst
+    oriented = CSRGraph(indptr, dst, graph.names)
+    out_degrees = np.diff(indptr)
+
+    # Découpage des liens orientés en blocs d'au plus block_wedges coins
+    wedges = np.cumsum(out_degrees[dst])
+    bounds = np.searchsorted(wedges, np.arange(block_wedges, wedges[-1], block_wedges))
+    bounds = np.unique(np.concatenate([[0], bounds, [len(src)]]))
+
+    for e0, e1 in zip(bounds[:-1], bounds[1:]):
+        u, v = src[e0:e1], dst[e0:e1]
+        counts = out_degrees[v]
+        w = dst[neighbor_slots(oriented, v)]
+        u = np.repeat(u, counts)
+        v = np.repeat(v, counts)
+        query = u * n + w
+        pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        hit = keys[pos] == query
+        for corner in (u, v, w):
+            triangles += np.bincount(corner[hit], minlength=n)
+    return triangles
+
+
+def local_clustering_coefficients(graph: CSRGraph, triangles: np.ndarray = None) -> np.ndarray:
+    """
+    Coefficient de clustering local de tous les noeuds, calculé avec les mêmes
+    opérations flottantes que calculate_local_clustering_coefficient (Liste_adj)
+    pour que les résultats soient identiques.
+    """
+    if triangles is None:
+        triangles = count_triangles(graph)
+    k = graph.degrees().astype(np.float64)
+    possible_links = k * (k - 1) / 2
+    clustering = np.zeros(graph.n_nodes)
+    np.divide(triangles, possible_links, out=clustering, where=k >= 2)
+    return clustering